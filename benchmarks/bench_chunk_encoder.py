@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for sending Wyoming audio chunks.
+
+Compares the stock path (WyomingAudioChunk -> Event -> write_event over a buffered
+socket file, flushed every chunk) with AudioChunkEncoder and a single vectored sendmsg.
+Both write to a local socket pair drained by a background thread, and the encode-only
+cost is reported separately.
+
+Usage:
+    uv run python benchmarks/bench_chunk_encoder.py [--chunks 20000] [--block-ms 20 100 1000]
+"""
+
+import argparse
+import io
+import socket
+import threading
+import time
+
+from wyoming.audio import AudioChunk as WyomingAudioChunk
+from wyoming.event import write_event
+
+from lmnop_transcribe.chunk_encoder import AudioChunkEncoder, send_buffers
+
+RATE, WIDTH, CHANNELS = 16000, 2, 1
+
+
+def drain(sock: socket.socket) -> None:
+  while sock.recv(1 << 20):
+    pass
+
+
+def timed(send, chunks: int) -> float:
+  """Seconds per chunk for `send`, run `chunks` times"""
+  start = time.perf_counter()
+  for _ in range(chunks):
+    send()
+  return (time.perf_counter() - start) / chunks
+
+
+def bench(payload: bytes, chunks: int) -> dict[str, float]:
+  """Microseconds per chunk for each path"""
+  encoder = AudioChunkEncoder(RATE, WIDTH, CHANNELS)
+  sink = io.BytesIO()
+
+  def stock_encode():
+    sink.seek(0)
+    write_event(WyomingAudioChunk(rate=RATE, width=WIDTH, channels=CHANNELS, audio=payload).event(), sink)
+
+  results = {
+    "stock encode": timed(stock_encode, chunks),
+    "fast encode": timed(lambda: encoder.buffers(payload), chunks),
+  }
+
+  sender, receiver = socket.socketpair()
+  reader = threading.Thread(target=drain, args=(receiver,), daemon=True)
+  reader.start()
+  writer = sender.makefile("wb")
+
+  results["stock send"] = timed(
+    lambda: write_event(
+      WyomingAudioChunk(rate=RATE, width=WIDTH, channels=CHANNELS, audio=payload).event(), writer
+    ),
+    chunks,
+  )
+  results["fast send"] = timed(lambda: send_buffers(sender, encoder.buffers(payload)), chunks)
+
+  writer.close()
+  sender.close()
+  reader.join()
+  receiver.close()
+  return {name: seconds * 1e6 for name, seconds in results.items()}
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--chunks", type=int, default=20000)
+  parser.add_argument("--block-ms", type=int, nargs="+", default=[20, 100, 1000])
+  args = parser.parse_args()
+
+  columns = ["stock encode", "fast encode", "stock send", "fast send", "speedup"]
+  print(f"{'block':>8} " + " ".join(f"{column:>{len(column) + 2}}" for column in columns))
+  for block_ms in args.block_ms:
+    payload = bytes(RATE * WIDTH * CHANNELS * block_ms // 1000)
+    us = bench(payload, args.chunks)
+    print(
+      f"{block_ms:>6}ms {us['stock encode']:>12.2f}us {us['fast encode']:>11.2f}us "
+      f"{us['stock send']:>10.2f}us {us['fast send']:>9.2f}us {us['stock send'] / us['fast send']:>8.1f}x"
+    )
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the `transcribe` entry point.
+
+Starts a fresh interpreter for every run and measures the time until the pipeline is
+ready for the first key press, along with which heavy modules had been loaded by then.
+Each run reports the whole process (interpreter startup included) and the part spent
+in-process after `import lmnop_transcribe.pipeline` begins.
+
+Usage:
+    uv run python benchmarks/bench_cold_start.py [--runs 10] [--mock-audio] [--keyboard]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ["numpy", "sounddevice", "wyoming", "evdev", "matplotlib", "soundfile"]
+
+# Runs in the child process: start the pipeline, report once it's ready, then shut down
+CHILD = """
+import asyncio, json, sys, time
+
+started = time.perf_counter()
+from lmnop_transcribe import pipeline
+
+async def run():
+  ready = asyncio.Event()
+  report = {{}}
+
+  def on_ready():
+    # Snapshot before any background preloading starts
+    report["in_process"] = time.perf_counter() - started
+    report["loaded"] = [name for name in {heavy!r} if name in sys.modules]
+    ready.set()
+
+  task = asyncio.create_task(
+    pipeline.async_main(use_real_audio={real_audio}, use_keyboard_bridge={keyboard}, on_ready=on_ready)
+  )
+  await ready.wait()
+  task.cancel()
+  print("READY " + json.dumps(report), flush=True)
+
+asyncio.run(run())
+"""
+
+
+def run_once(real_audio: bool, keyboard: bool) -> tuple[float, float, list[str]]:
+  """Start one cold process, returning (process seconds, in-process seconds, modules loaded at ready)"""
+  code = CHILD.format(real_audio=real_audio, keyboard=keyboard, heavy=HEAVY_MODULES)
+  started = time.perf_counter()
+  process = subprocess.Popen(
+    [sys.executable, "-c", code], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+  )
+  assert process.stdout is not None
+  for line in process.stdout:
+    if line.startswith("READY "):
+      elapsed = time.perf_counter() - started
+      report = json.loads(line[len("READY ") :])
+      process.kill()
+      process.wait()
+      return elapsed, report["in_process"], report["loaded"]
+
+  process.wait()
+  raise RuntimeError(f"Pipeline exited with status {process.returncode} before becoming ready")
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--runs", type=int, default=10)
+  parser.add_argument("--mock-audio", action="store_true", help="Start without the real audio source")
+  parser.add_argument("--keyboard", action="store_true", help="Include the evdev keyboard bridge")
+  args = parser.parse_args()
+
+  run_once(not args.mock_audio, args.keyboard)  # Warm the OS file cache; "cold" means a fresh process
+
+  process_times, in_process_times = [], []
+  loaded: list[str] = []
+  for _ in range(args.runs):
+    process_time, in_process_time, loaded = run_once(not args.mock_audio, args.keyboard)
+    process_times.append(process_time * 1000)
+    in_process_times.append(in_process_time * 1000)
+
+  print(f"{'':>12} {'median':>9} {'min':>9} {'max':>9}")
+  for label, times in [("process", process_times), ("in-process", in_process_times)]:
+    print(f"{label:>12} {statistics.median(times):>7.1f}ms {min(times):>7.1f}ms {max(times):>7.1f}ms")
+  print(f"Heavy modules loaded at ready: {', '.join(loaded) or 'none'}")
+
+
+if __name__ == "__main__":
+  main()
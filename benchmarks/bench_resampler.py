@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the polyphase resampling stage.
+
+Feeds blocks of synthetic multi-channel audio at common device rates through
+PolyphaseResampler and reports chunks/sec and how many times faster than real time
+that is.
+
+Usage:
+    uv run python benchmarks/bench_resampler.py [--block-ms 20] [--seconds 60] [--channels 2]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from lmnop_transcribe.audio_processing import PolyphaseResampler
+from lmnop_transcribe.common import AudioChunk
+
+
+def bench(in_rate: int, channels: int, block_ms: int, seconds: int) -> tuple[float, float]:
+  """Run one configuration, returning (chunks per second, real-time factor)"""
+  frames = in_rate * block_ms // 1000
+  rng = np.random.default_rng(0)
+  block = (rng.standard_normal((frames, channels)) * 3000).astype(np.int16)
+  chunk = AudioChunk(data=block.tobytes(), timestamp_delta=0.0)
+  count = seconds * 1000 // block_ms
+
+  resampler = PolyphaseResampler(in_rate, out_rate=16000, channels=channels)
+  resampler.process(chunk)  # Warm up
+
+  start = time.perf_counter()
+  for _ in range(count):
+    resampler.process(chunk)
+  elapsed = time.perf_counter() - start
+
+  return count / elapsed, seconds / elapsed
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Benchmark the polyphase resampler")
+  parser.add_argument("--block-ms", type=int, default=20, help="Chunk duration in milliseconds")
+  parser.add_argument("--seconds", type=int, default=60, help="Seconds of audio per configuration")
+  parser.add_argument("--channels", type=int, default=2, help="Input channels (downmixed to mono)")
+  args = parser.parse_args()
+
+  print(f"{'input':>10} {'block':>7} {'chunks/sec':>12} {'x realtime':>11}")
+  for in_rate in (44100, 48000, 96000):
+    chunks_per_sec, realtime = bench(in_rate, args.channels, args.block_ms, args.seconds)
+    print(f"{in_rate:>8}Hz {args.block_ms:>5}ms {chunks_per_sec:>12.0f} {realtime:>10.0f}x")
+
+
+if __name__ == "__main__":
+  main()
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """Plot the live microphone signal(s) with matplotlib.
 
-Matplotlib and NumPy have to be installed.
+Matplotlib and NumPy have to be installed (`uv sync --group docs`).
 
 """
 
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Recording archives written while the audio arrives.
+Sessions hand each chunk to a queue drained by a writer thread, so saving recordings never
+holds all of the audio in memory, and never puts disk writes in front of the transcript.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import wave
+
+from .telemetry import DEPTH_BUCKETS, metrics
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FORMATS = ("wav", "flac")
+
+_OPEN = object()
+_CLOSE = object()
+_DISCARD = object()
+_CONTROL = (_OPEN, _CLOSE, _DISCARD)
+
+
+class ArchiveFile:
+  """
+  One recording being archived. Creating it, `write` and `close` only queue work for the
+  writer thread, so none of them touch the disk on the caller's thread.
+
+  WAV files are written with the stdlib `wave` module, which keeps the header up to date
+  after every write; with a flush after each, a partly written recording can still be read.
+  FLAC archives are written with soundfile and need 16-bit samples.
+  """
+
+  def __init__(self, archiver: "AudioArchiver", path: str, rate: int, sample_width: int, channels: int):
+    if path.endswith(".flac") and sample_width != 2:
+      raise ValueError(f"FLAC archives need 16-bit samples, not {sample_width * 8}-bit")
+
+    self.archiver = archiver
+    self.path = path
+    self.rate = rate
+    self.sample_width = sample_width
+    self.channels = channels
+    self.chunks_written = 0
+    self.bytes_written = 0
+    self.dropped_chunks = 0
+    self.opened = threading.Event()  # Set once the file exists, with its header written
+    self.closed = threading.Event()  # Set once the file is complete, or has been given up on
+    self._flac = None
+    self._wav = None
+    self._file = None
+
+  def _open(self) -> None:
+    if self.path.endswith(".flac"):
+      import soundfile as sf
+
+      self._flac = sf.SoundFile(
+        self.path, "w", samplerate=self.rate, channels=self.channels, subtype="PCM_16", format="FLAC"
+      )
+    else:
+      self._file = open(self.path, "wb")
+      self._wav = wave.open(self._file, "wb")
+      self._wav.setnchannels(self.channels)
+      self._wav.setsampwidth(self.sample_width)
+      self._wav.setframerate(self.rate)
+      self._wav.writeframes(b"")  # Writes the header
+      self._file.flush()
+    self.opened.set()
+
+  def write(self, data: bytes) -> None:
+    """Queue audio to be appended; dropped, and counted, if the writer is too far behind"""
+    if self.closed.is_set():
+      return
+    if not self.archiver._put(self, data):
+      self.dropped_chunks += 1
+      metrics.counter("archive.dropped_chunks").inc()
+
+  def close(self, discard: bool = False) -> None:
+    """Queue the file to be finished, or deleted with `discard`, once what's queued is written"""
+    if not self.closed.is_set():
+      self.archiver._put(self, _DISCARD if discard else _CLOSE)
+
+  def _write(self, data: bytes) -> None:
+    if self._flac is not None:
+      self._flac.buffer_write(data, dtype="int16")
+    elif self._wav is not None and self._file is not None:
+      self._wav.writeframes(data)
+      self._file.flush()
+    self.chunks_written += 1
+    self.bytes_written += len(data)
+
+  def _finish(self, discard: bool = False) -> None:
+    try:
+      if self._flac is not None:
+        self._flac.close()
+      elif self._wav is not None and self._file is not None:
+        self._wav.close()
+        self._file.close()
+    finally:
+      self.closed.set()
+
+    if not self.opened.is_set():
+      return
+    if discard:
+      os.unlink(self.path)
+      logger.debug(f"Discarded archive {self.path}")
+      return
+
+    message = f"Saved {self.chunks_written} chunks ({self.bytes_written} bytes) to {self.path}"
+    if self.dropped_chunks:
+      message += f", {self.dropped_chunks} chunks dropped"
+    logger.info(message)
+
+
+class AudioArchiver:
+  """
+  Archives recordings from any number of sessions on one writer thread.
+
+  At most `max_queued` chunks wait to be written. A chunk that arrives past that is left out
+  of the archive rather than blocking the session. Opening and finishing files are always
+  queued, behind the file's chunks, and never wait either.
+  """
+
+  def __init__(self, max_queued: int = 1024):
+    self.max_queued = max_queued
+    self._queue: queue.SimpleQueue[tuple[ArchiveFile, object]] = queue.SimpleQueue()
+    self._thread: threading.Thread | None = None
+    self._lock = threading.Lock()
+
+  def open(self, path: str, rate: int, sample_width: int, channels: int) -> ArchiveFile:
+    """Start archiving a recording to `path`; a `.flac` path is FLAC-compressed, anything else is WAV"""
+    archive = ArchiveFile(self, path, rate, sample_width, channels)
+    self._put(archive, _OPEN)
+    with self._lock:
+      if self._thread is None:
+        self._thread = threading.Thread(target=self._run, name="audio-archiver", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+    return archive
+
+  def close(self, timeout: float | None = None) -> None:
+    """Write out everything queued and stop the writer thread"""
+    with self._lock:
+      thread, self._thread = self._thread, None
+    if thread is None:
+      return
+    atexit.unregister(self.close)
+    self._queue.put((None, None))  # type: ignore[arg-type]
+    thread.join(timeout)
+
+  def _put(self, archive: ArchiveFile, item: object) -> bool:
+    """Queue work for the writer; chunks are refused once `max_queued` items are waiting"""
+    depth = self._queue.qsize()
+    if item not in _CONTROL and depth >= self.max_queued:
+      return False
+    self._queue.put((archive, item))
+    metrics.histogram("archive.queue_depth", DEPTH_BUCKETS).observe(depth + 1)
+    return True
+
+  def _run(self) -> None:
+    while True:
+      archive, item = self._queue.get()
+      if archive is None:
+        return
+      if archive.closed.is_set():
+        continue
+
+      try:
+        if item is _OPEN:
+          archive._open()
+        elif item is _CLOSE or item is _DISCARD:
+          archive._finish(discard=item is _DISCARD)
+        else:
+          archive._write(item)  # type: ignore[arg-type]
+      except Exception:
+        logger.exception(f"Error archiving audio to {archive.path}, giving up on it")
+        try:
+          archive._finish()
+        except Exception:
+          pass
+
+
+_shared_archiver: AudioArchiver | None = None
+
+
+def shared_archiver() -> AudioArchiver:
+  """The archiver used by sessions that weren't given one"""
+  global _shared_archiver
+  if _shared_archiver is None:
+    _shared_archiver = AudioArchiver()
+  return _shared_archiver
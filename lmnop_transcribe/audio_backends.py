@@ -0,0 +1,373 @@
+"""
+AudioSource backends that don't need a sound card.
+FileAudioSource replays a WAV or FLAC file and SyntheticAudioSource generates test signals.
+Both drive the regular AudioSource callback from a paced thread, so they emit exactly the
+same AudioChunk stream as a live microphone, at real time or faster.
+"""
+
+import os
+import struct
+import threading
+import time
+from abc import ABC, abstractmethod
+from types import SimpleNamespace
+from typing import Callable
+
+import numpy as np
+from loguru import logger
+from reactivex.scheduler.eventloop import AsyncIOScheduler
+
+from .audio_source import AudioSource
+from .common import AudioConfig
+
+DEFAULT_BLOCK_MS = 20  # Block size used when the config leaves it to the "device"
+
+SIGNALS = ("speech", "tone", "noise", "silence")
+
+
+class SimulatedInputStream:
+  """
+  Stand-in for `sounddevice.InputStream` that calls the callback from a thread.
+
+  Blocks are produced on a virtual clock that advances by one block duration per callback,
+  and are delivered at `speed` times real time (as fast as possible if `speed` is None).
+  `stream.time` and the callback's ADC times are on the virtual clock. Like a live
+  stream, the thread keeps running between recordings; it only holds while `gate` is
+  false, so replayed audio isn't consumed while nobody is listening.
+  """
+
+  def __init__(
+    self,
+    read: Callable[[int], np.ndarray],
+    callback: Callable,
+    samplerate: float,
+    blocksize: int,
+    speed: float | None = 1.0,
+    gate: Callable[[], bool] = lambda: True,
+  ):
+    self.samplerate = samplerate
+    self.blocksize = blocksize
+    self.speed = speed
+    self._read = read
+    self._callback = callback
+    self._gate = gate
+    self._frames = 0
+    self._active = False
+    self.closed = False
+    self._thread: threading.Thread | None = None
+
+  @property
+  def active(self) -> bool:
+    return self._active
+
+  @property
+  def time(self) -> float:
+    return self._frames / self.samplerate
+
+  def _run(self) -> None:
+    block_seconds = self.blocksize / self.samplerate
+    deadline = time.perf_counter()
+    while self._active:
+      if not self._gate():
+        time.sleep(0.001)
+        deadline = time.perf_counter()
+        continue
+
+      block = self._read(self.blocksize)
+      # A block is delivered once its last sample has been "captured"
+      if self.speed is not None:
+        deadline += block_seconds / self.speed
+        delay = deadline - time.perf_counter()
+        if delay > 0:
+          time.sleep(delay)
+      if not self._active:
+        break
+
+      time_info = SimpleNamespace(inputBufferAdcTime=self.time, currentTime=self.time + block_seconds)
+      self._frames += len(block)
+      self._callback(block, len(block), time_info, None)
+
+  def start(self) -> None:
+    if self._active:
+      return
+    self._active = True
+    self._thread = threading.Thread(target=self._run, name="simulated-audio", daemon=True)
+    self._thread.start()
+
+  def stop(self) -> None:
+    self._active = False
+    if self._thread is not None and self._thread is not threading.current_thread():
+      self._thread.join()
+    self._thread = None
+
+  def close(self) -> None:
+    self.stop()
+    self.closed = True
+
+
+class SimulatedAudioSource(AudioSource, ABC):
+  """Base for backends that produce samples in-process instead of through PortAudio"""
+
+  def __init__(
+    self,
+    config: AudioConfig | None = None,
+    scheduler: AsyncIOScheduler | None = None,
+    speed: float | None = 1.0,
+  ):
+    super().__init__(config, scheduler)
+    self.speed = speed
+
+  @property
+  @abstractmethod
+  def native_samplerate(self) -> float:
+    """Rate the backend produces samples at"""
+
+  @property
+  @abstractmethod
+  def device_name(self) -> str:
+    """Shown in place of the sound card's name"""
+
+  @abstractmethod
+  def _read_frames(self, frames: int) -> np.ndarray:
+    """Produce the next `frames` frames as a (frames, channels) array of `config.dtype`"""
+
+  def rewind(self) -> None:
+    """Go back to the start of the signal"""
+
+  def _get_device_info(self) -> dict:
+    """Get information about the audio device"""
+    return {
+      "name": self.device_name,
+      "index": -1,
+      "hostapi": -1,
+      "max_input_channels": self.config.channels,
+      "default_samplerate": self.native_samplerate,
+      "default_low_input_latency": 0.0,
+      "default_high_input_latency": 0.0,
+    }
+
+  def _open_stream(self, samplerate: float, blocksize: int | None) -> SimulatedInputStream:
+    if samplerate != self.native_samplerate:
+      raise ValueError(
+        f"{self.device_name} runs at {self.native_samplerate}Hz but {samplerate}Hz was requested; "
+        "set AudioConfig.samplerate to match or resample with AudioConfig.resample_to"
+      )
+    logger.info(f"Opening simulated audio stream for {self.device_name} at {self.speed or 'max'}x speed")
+    return SimulatedInputStream(
+      self._read_frames,
+      self._audio_callback,
+      samplerate,
+      blocksize or int(samplerate * DEFAULT_BLOCK_MS / 1000),
+      speed=self.speed,
+      gate=lambda: self._is_recording or self.config.keep_stream_open,
+    )
+
+  def start_recording(self):
+    if not self._is_recording and not self.config.keep_stream_open:
+      # Each recording replays the signal from the start
+      self.rewind()
+    super().start_recording()
+
+  def _fit(self, samples: np.ndarray) -> np.ndarray:
+    """Convert a (frames, channels) float block in [-1, 1] or int16 block to the configured format"""
+    if samples.shape[1] != self.config.channels:
+      if self.config.channels == 1:
+        mixed = samples.mean(axis=1, keepdims=True)
+        samples = np.rint(mixed).astype(samples.dtype) if samples.dtype.kind == "i" else mixed
+      else:
+        samples = np.repeat(samples[:, :1], self.config.channels, axis=1)
+
+    dtype = np.dtype(self.config.dtype)
+    if samples.dtype == dtype:
+      return np.ascontiguousarray(samples)
+    if np.issubdtype(dtype, np.integer):
+      if np.issubdtype(samples.dtype, np.floating):
+        info = np.iinfo(dtype)
+        samples = np.clip(np.rint(samples * info.max), info.min, info.max)
+      return samples.astype(dtype)
+    if np.issubdtype(samples.dtype, np.integer):
+      return (samples / np.iinfo(samples.dtype).max).astype(dtype)
+    return samples.astype(dtype)
+
+
+def _wav_data_layout(path: str) -> tuple[int, int, int, int]:
+  """
+  Find the sample data in a 16-bit PCM WAV file.
+
+  Returns:
+      (channels, samplerate, data offset, data length in bytes)
+  """
+  with open(path, "rb") as f:
+    riff, _, wave = struct.unpack("<4sI4s", f.read(12))
+    if riff != b"RIFF" or wave != b"WAVE":
+      raise ValueError(f"{path} is not a WAV file")
+
+    fmt = None
+    while True:
+      header = f.read(8)
+      if len(header) < 8:
+        raise ValueError(f"{path} has no data chunk")
+      chunk_id, size = struct.unpack("<4sI", header)
+      if chunk_id == b"fmt ":
+        fmt = struct.unpack("<HHIIHH", f.read(16))
+        f.seek(size - 16 + (size & 1), 1)
+      elif chunk_id == b"data":
+        if fmt is None:
+          raise ValueError(f"{path} has data before its format chunk")
+        format_tag, channels, samplerate, _, _, bits = fmt
+        # 0xFFFE is WAVE_FORMAT_EXTENSIBLE, which Python's wave module writes for >2 channels
+        if format_tag not in (1, 0xFFFE) or bits != 16:
+          raise ValueError(f"{path} is not 16-bit PCM")
+        # Streaming writers may leave the length unset; trust the file size instead
+        offset = f.tell()
+        size = min(size, os.path.getsize(path) - offset)
+        return channels, samplerate, offset, size
+      else:
+        f.seek(size + (size & 1), 1)
+
+
+class FileAudioSource(SimulatedAudioSource):
+  """
+  Replays an audio file as if it were being captured live.
+
+  16-bit PCM WAV files are memory-mapped, so replaying a long file costs no up-front reads
+  and no more memory than the pages being streamed. Other formats (FLAC and anything else
+  soundfile can decode) are decoded into memory once. After the end of the file, silence
+  is produced until the recording is stopped, or the file starts over if `loop` is set.
+  """
+
+  def __init__(
+    self,
+    path: str,
+    config: AudioConfig | None = None,
+    scheduler: AsyncIOScheduler | None = None,
+    speed: float | None = 1.0,
+    loop: bool = False,
+  ):
+    super().__init__(config, scheduler, speed)
+    self.path = path
+    self.loop = loop
+    self._samples, self._samplerate_native = self._load(path)
+    self._position = 0
+
+  @staticmethod
+  def _load(path: str) -> tuple[np.ndarray, float]:
+    if path.lower().endswith(".wav"):
+      try:
+        channels, samplerate, offset, size = _wav_data_layout(path)
+        frames = size // (2 * channels)
+        samples = np.memmap(path, dtype="<i2", mode="r", offset=offset, shape=(frames, channels))
+        logger.info(f"Memory-mapped {path}: {frames} frames, {channels} channels, {samplerate}Hz")
+        return samples, float(samplerate)
+      except ValueError as e:
+        logger.debug(f"Can't memory-map {path} ({e}), decoding instead")
+
+    import soundfile as sf
+
+    samples, samplerate = sf.read(path, dtype="int16", always_2d=True)
+    logger.info(f"Decoded {path}: {len(samples)} frames, {samples.shape[1]} channels, {samplerate}Hz")
+    return samples, float(samplerate)
+
+  @property
+  def native_samplerate(self) -> float:
+    return self._samplerate_native
+
+  @property
+  def device_name(self) -> str:
+    return f"file:{self.path}"
+
+  @property
+  def duration_ms(self) -> float:
+    """Length of the file"""
+    return len(self._samples) * 1000 / self._samplerate_native
+
+  def rewind(self) -> None:
+    self._position = 0
+
+  def _read_frames(self, frames: int) -> np.ndarray:
+    parts = []
+    remaining = frames
+    while remaining > 0:
+      if self._position >= len(self._samples):
+        if not self.loop or len(self._samples) == 0:
+          parts.append(np.zeros((remaining, self._samples.shape[1]), dtype=np.int16))
+          break
+        self._position = 0
+      part = self._samples[self._position : self._position + remaining]
+      self._position += len(part)
+      remaining -= len(part)
+      parts.append(part)
+
+    return self._fit(parts[0] if len(parts) == 1 else np.concatenate(parts))
+
+
+class SyntheticAudioSource(SimulatedAudioSource):
+  """
+  Generates test signals in place of a microphone.
+
+  Signals:
+      speech: a voiced harmonic series with syllable-rate amplitude modulation, in bursts of
+          `burst_ms` separated by `pause_ms` of silence
+      tone: a sine at `frequency`
+      noise: white noise
+      silence: digital silence
+  """
+
+  def __init__(
+    self,
+    signal: str = "speech",
+    config: AudioConfig | None = None,
+    scheduler: AsyncIOScheduler | None = None,
+    speed: float | None = 1.0,
+    samplerate: float | None = None,
+    frequency: float = 440.0,
+    amplitude: float = 0.3,
+    burst_ms: int = 1200,
+    pause_ms: int = 600,
+    seed: int = 0,
+  ):
+    if signal not in SIGNALS:
+      raise ValueError(f"Unknown signal {signal!r}, expected one of {', '.join(SIGNALS)}")
+    super().__init__(config, scheduler, speed)
+    self.signal = signal
+    self._samplerate_native = float(samplerate or self.config.samplerate)
+    self.frequency = frequency
+    self.amplitude = amplitude
+    self.burst_ms = burst_ms
+    self.pause_ms = pause_ms
+    self.seed = seed
+    self.rewind()
+
+  @property
+  def native_samplerate(self) -> float:
+    return self._samplerate_native
+
+  @property
+  def device_name(self) -> str:
+    return f"synthetic:{self.signal}"
+
+  def rewind(self) -> None:
+    self._position = 0
+    self._rng = np.random.default_rng(self.seed)
+
+  def _generate(self, t: np.ndarray) -> np.ndarray:
+    if self.signal == "silence":
+      return np.zeros_like(t)
+    if self.signal == "tone":
+      return self.amplitude * np.sin(2 * np.pi * self.frequency * t)
+    if self.signal == "noise":
+      return self.amplitude * self._rng.uniform(-1.0, 1.0, len(t))
+
+    # Speech-like: ~120Hz voice with slight vibrato, harmonics rolling off at 1/k
+    phase = 2 * np.pi * (120 * t + 0.8 * np.sin(2 * np.pi * 5 * t))
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 11))
+    breath = 0.05 * self._rng.standard_normal(len(t))
+    syllables = 0.5 * (1 - np.cos(2 * np.pi * 4 * t))
+    period = (self.burst_ms + self.pause_ms) / 1000
+    in_burst = (t % period) < self.burst_ms / 1000
+    return self.amplitude * 0.5 * (voiced + breath) * syllables * in_burst
+
+  def _read_frames(self, frames: int) -> np.ndarray:
+    t = (self._position + np.arange(frames)) / self._samplerate_native
+    self._position += frames
+    return self._fit(self._generate(t)[:, None])
@@ -0,0 +1,547 @@
+"""
+Audio processing stages for the transcription pipeline.
+Each stage is a small stateful object that turns incoming AudioChunks into outgoing ones,
+and can be applied to an observable of chunks with `audio_stage`.
+"""
+
+from collections import deque
+from math import gcd
+from typing import Callable, Protocol
+
+import numpy as np
+import reactivex as rx
+from loguru import logger
+
+from .common import AudioChunk
+
+
+class AudioStage(Protocol):
+  """A per-recording processing step over a stream of AudioChunks"""
+
+  def process(self, chunk: AudioChunk) -> list[AudioChunk]:
+    """Consume one chunk, returning any chunks ready to go downstream"""
+    ...
+
+  def flush(self) -> list[AudioChunk]:
+    """Return whatever is still held back once the input has ended"""
+    ...
+
+
+def audio_stage(factory: Callable[[], AudioStage]) -> Callable[[rx.Observable], rx.Observable]:
+  """
+  Create an Rx operator that runs chunks through an AudioStage.
+
+  A fresh stage is created for every subscription, so per-recording state never leaks
+  between recordings. The stage is flushed when the source completes.
+  """
+
+  def _operator(source: rx.Observable) -> rx.Observable:
+    def subscribe(observer, scheduler=None):
+      stage = factory()
+
+      def on_next(chunk: AudioChunk):
+        try:
+          outputs = stage.process(chunk)
+        except Exception as e:
+          logger.exception(f"Error in audio stage {type(stage).__name__}")
+          observer.on_error(e)
+          return
+        for output in outputs:
+          observer.on_next(output)
+
+      def on_completed():
+        try:
+          outputs = stage.flush()
+        except Exception as e:
+          logger.exception(f"Error flushing audio stage {type(stage).__name__}")
+          observer.on_error(e)
+          return
+        for output in outputs:
+          observer.on_next(output)
+        observer.on_completed()
+
+      return source.subscribe(on_next, observer.on_error, on_completed, scheduler=scheduler)
+
+    return rx.create(subscribe)
+
+  return _operator
+
+
+class AudioReframer:
+  """
+  Regroups audio of any block size into frames of a fixed duration.
+
+  Lets the device run with small blocks for low capture latency while the network sees
+  fewer, larger events. Each frame is stamped with the time of its last sample, matching
+  the convention used for captured chunks.
+  """
+
+  def __init__(self, frame_ms: int, rate: int = 16000, sample_width: int = 2, channels: int = 1):
+    self.bytes_per_frame = sample_width * channels
+    self.bytes_per_ms = rate * self.bytes_per_frame / 1000
+    self.frame_bytes = max(1, int(rate * frame_ms / 1000)) * self.bytes_per_frame
+    self._pending = bytearray()
+    self._pending_end_ms = 0.0
+
+  def process(self, chunk: AudioChunk) -> list[AudioChunk]:
+    self._pending += chunk.data
+    self._pending_end_ms = chunk.timestamp_delta
+
+    frames = []
+    while len(self._pending) >= self.frame_bytes:
+      # Whatever stays pending after this frame was captured after it
+      end_ms = self._pending_end_ms - (len(self._pending) - self.frame_bytes) / self.bytes_per_ms
+      frames.append(AudioChunk(data=bytes(self._pending[: self.frame_bytes]), timestamp_delta=end_ms))
+      del self._pending[: self.frame_bytes]
+    return frames
+
+  def flush(self) -> list[AudioChunk]:
+    if not self._pending:
+      return []
+    frame = AudioChunk(data=bytes(self._pending), timestamp_delta=self._pending_end_ms)
+    self._pending.clear()
+    return [frame]
+
+
+def reframe_audio_chunks(
+  frame_ms: int, rate: int = 16000, sample_width: int = 2, channels: int = 1
+) -> Callable[[rx.Observable], rx.Observable]:
+  """Rx operator that regroups audio chunks into frames of `frame_ms` milliseconds"""
+  return audio_stage(lambda: AudioReframer(frame_ms, rate, sample_width, channels))
+
+
+class SampleTrimmer:
+  """
+  Cuts audio at exact sample offsets on the recording timeline.
+
+  Everything before `head_ms` is dropped, splitting the chunk that straddles it, so the
+  cut lands in the same place whatever the block size. With `tail_ms`, the most recent
+  audio is held back and discarded when the recording ends, which removes the key-release
+  click at the cost of `tail_ms` of extra streaming latency.
+  """
+
+  def __init__(
+    self, head_ms: float, tail_ms: float = 0, rate: int = 16000, sample_width: int = 2, channels: int = 1
+  ):
+    self.head_ms = head_ms
+    self.rate = rate
+    self.bytes_per_frame = sample_width * channels
+    self.tail_bytes = int(rate * tail_ms / 1000) * self.bytes_per_frame
+    self._held = bytearray()
+    self._held_end_ms = 0.0
+
+  def _head_cut(self, chunk: AudioChunk) -> bytes:
+    """The part of a chunk at or after `head_ms`"""
+    frames = len(chunk.data) // self.bytes_per_frame
+    start_ms = chunk.timestamp_delta - frames * 1000 / self.rate
+    if start_ms >= self.head_ms:
+      return chunk.data
+    skip = min(frames, round((self.head_ms - start_ms) * self.rate / 1000))
+    return chunk.data[skip * self.bytes_per_frame :]
+
+  def process(self, chunk: AudioChunk) -> list[AudioChunk]:
+    data = self._head_cut(chunk)
+    if not data:
+      return []
+    if not self.tail_bytes:
+      return [
+        chunk
+        if len(data) == len(chunk.data)
+        else AudioChunk(data=data, timestamp_delta=chunk.timestamp_delta)
+      ]
+
+    self._held += data
+    self._held_end_ms = chunk.timestamp_delta
+    release = len(self._held) - self.tail_bytes
+    if release <= 0:
+      return []
+
+    end_ms = self._held_end_ms - self.tail_bytes / self.bytes_per_frame * 1000 / self.rate
+    released = AudioChunk(data=bytes(self._held[:release]), timestamp_delta=end_ms)
+    del self._held[:release]
+    return [released]
+
+  def flush(self) -> list[AudioChunk]:
+    # Whatever is still held is the tail being trimmed
+    self._held.clear()
+    return []
+
+
+def trim_audio_samples(
+  head_ms: float, tail_ms: float = 0, rate: int = 16000, sample_width: int = 2, channels: int = 1
+) -> Callable[[rx.Observable], rx.Observable]:
+  """Rx operator that trims `head_ms` from the start and `tail_ms` from the end of a recording"""
+  return audio_stage(lambda: SampleTrimmer(head_ms, tail_ms, rate, sample_width, channels))
+
+
+def downmix(block: np.ndarray) -> np.ndarray:
+  """Average a (frames, channels) block down to mono float32"""
+  if block.ndim == 1:
+    return block.astype(np.float32)
+  if block.shape[1] == 1:
+    return block[:, 0].astype(np.float32)
+  return block.mean(axis=1, dtype=np.float32)
+
+
+class PolyphaseResampler:
+  """
+  Streaming rational-ratio resampler that converts captured audio to 16-bit mono.
+
+  Implements upsample-by-L, low-pass, downsample-by-M as a polyphase FIR: each output
+  sample only evaluates the L-th slice of the filter that lines up with real input
+  samples. All outputs of a block are computed at once with a strided window gather and
+  an einsum. Filter history and phase carry across blocks, so chunk boundaries are seamless.
+  """
+
+  def __init__(
+    self,
+    in_rate: float,
+    out_rate: int = 16000,
+    channels: int = 1,
+    zero_crossings: int = 16,
+    rolloff: float = 0.9,
+  ):
+    in_rate = int(round(in_rate))
+    divisor = gcd(in_rate, out_rate)
+    self.in_rate = in_rate
+    self.out_rate = out_rate
+    self.channels = channels
+    self.up = out_rate // divisor
+    self.down = in_rate // divisor
+
+    # Windowed-sinc low-pass at the narrower of the two Nyquist limits, designed at the
+    # upsampled rate. Taps per phase is the filter's length in input samples.
+    cutoff = rolloff * 0.5 / max(self.up, self.down)
+    taps_per_phase = int(np.ceil(2 * zero_crossings * max(1.0, self.down / self.up)))
+    num_taps = taps_per_phase * self.up
+    n = np.arange(num_taps) - (num_taps - 1) / 2
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(num_taps, 8.0)
+    kernel *= self.up / kernel.sum()
+
+    # phases[p, k] multiplies input sample (i - (taps - 1) + k) for output phase p, i.e. the
+    # polyphase components reversed so they line up with a forward-looking input window
+    self._phases = kernel.reshape(taps_per_phase, self.up).T[:, ::-1].astype(np.float32)
+    self._taps = taps_per_phase
+    self.reset()
+
+  def reset(self) -> None:
+    """Forget filter history, e.g. between recordings"""
+    self._history = np.zeros(self._taps - 1, dtype=np.float32)
+    self._in_count = 0  # Input samples consumed so far
+    self._out_count = 0  # Output samples produced so far
+
+  def resample(self, block: np.ndarray) -> np.ndarray:
+    """
+    Resample one block of captured audio.
+
+    Args:
+        block: (frames, channels) or (frames,) array of input samples
+
+    Returns:
+        int16 mono samples at `out_rate`
+    """
+    samples = downmix(block)
+    if self.up == self.down:
+      return np.clip(np.rint(samples), -32768, 32767).astype(np.int16)
+
+    extended = np.concatenate((self._history, samples))
+    base = self._in_count - (self._taps - 1)  # Input index of extended[0]
+    self._in_count += len(samples)
+
+    # Every output whose newest input sample has now arrived
+    end = -(-self._in_count * self.up // self.down)
+    positions = np.arange(self._out_count, end, dtype=np.int64) * self.down
+    self._out_count = max(self._out_count, end)
+    self._history = extended[len(extended) - (self._taps - 1) :]
+    if len(positions) == 0:
+      return np.empty(0, dtype=np.int16)
+
+    starts = positions // self.up - base - (self._taps - 1)
+    windows = np.lib.stride_tricks.sliding_window_view(extended, self._taps)[starts]
+    output = np.einsum("nk,nk->n", windows, self._phases[positions % self.up])
+    return np.clip(np.rint(output), -32768, 32767).astype(np.int16)
+
+  def process(self, chunk: AudioChunk) -> list[AudioChunk]:
+    block = np.frombuffer(chunk.data, dtype=np.int16).reshape(-1, self.channels)
+    output = self.resample(block)
+    if len(output) == 0:
+      return []
+    return [AudioChunk(data=output.tobytes(), timestamp_delta=chunk.timestamp_delta)]
+
+  def flush(self) -> list[AudioChunk]:
+    return []
+
+
+def resample_audio_chunks(
+  in_rate: float, out_rate: int = 16000, channels: int = 1
+) -> Callable[[rx.Observable], rx.Observable]:
+  """Rx operator that converts int16 chunks captured at `in_rate` to 16-bit mono at `out_rate`"""
+  return audio_stage(lambda: PolyphaseResampler(in_rate, out_rate, channels))
+
+
+class VoiceActivityDetector:
+  """
+  Drops the silence around and between utterances before it's uploaded.
+
+  Works on 16-bit mono audio in fixed frames. Frame energy, zero-crossing rate and
+  spectral flatness are computed for every frame of a chunk at once. A frame is speech
+  when it's louder than both `threshold_db` and the tracked noise floor plus `margin_db`,
+  its spectrum is peaky rather than flat like noise, and its zero-crossing rate is in the
+  voiced range. Unvoiced sounds at the edges of words are covered by the hangover and
+  padding: speech keeps the detector open for `hangover_ms`, and `padding_ms` of audio is
+  kept on either side of each stretch of speech.
+
+  Kept audio keeps its original timestamps, so downstream timing is unchanged.
+  """
+
+  def __init__(
+    self,
+    rate: int = 16000,
+    frame_ms: int = 20,
+    threshold_db: float = -50.0,
+    margin_db: float = 10.0,
+    flatness_max: float = 0.3,
+    zcr_max: float = 0.35,
+    hangover_ms: int = 300,
+    padding_ms: int = 200,
+  ):
+    self.rate = rate
+    self.frame_len = rate * frame_ms // 1000
+    self.threshold_db = threshold_db
+    self.margin_db = margin_db
+    self.flatness_max = flatness_max
+    self.zcr_max = zcr_max
+    self.hangover_frames = hangover_ms // frame_ms
+    self.padding_frames = padding_ms // frame_ms
+
+    self._pending = np.empty(0, dtype=np.int16)
+    self._noise_floor_db = threshold_db
+    self._lead: deque[tuple[int, np.ndarray, float]] = deque(maxlen=self.padding_frames or None)
+    self._trail = 0  # Frames still kept after the last speech frame
+    self._frame_index = 0
+    self._last_ms = 0.0
+    self.kept_samples = 0
+    self.dropped_samples = 0
+
+  @property
+  def kept_ms(self) -> float:
+    return self.kept_samples * 1000 / self.rate
+
+  @property
+  def dropped_ms(self) -> float:
+    return self.dropped_samples * 1000 / self.rate
+
+  def classify(self, frames: np.ndarray) -> np.ndarray:
+    """Decide which rows of a (n, frame_len) int16 array are speech, updating the noise floor"""
+    x = frames.astype(np.float32) / 32768
+    energy_db = 10 * np.log10(np.mean(x * x, axis=1) + 1e-10)
+    zcr = np.mean(np.signbit(x[:, 1:]) != np.signbit(x[:, :-1]), axis=1)
+    power = np.abs(np.fft.rfft(x, axis=1)) ** 2 + 1e-12
+    flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+    voiced = (flatness < self.flatness_max) & (zcr < self.zcr_max)
+
+    speech = np.zeros(len(frames), dtype=bool)
+    for i, level in enumerate(energy_db):
+      floor = self._noise_floor_db
+      speech[i] = level > max(self.threshold_db, floor + self.margin_db) and voiced[i]
+      if not speech[i]:
+        # Falls quickly, rises slowly, so speech doesn't drag the floor up
+        self._noise_floor_db = float(level) if level < floor else 0.95 * floor + 0.05 * float(level)
+    return speech
+
+  def _emit(self, kept: list[tuple[int, np.ndarray, float]]) -> list[AudioChunk]:
+    """Join consecutive kept frames into chunks"""
+    chunks = []
+    run: list[np.ndarray] = []
+    for i, (index, samples, end_ms) in enumerate(kept):
+      run.append(samples)
+      if i + 1 == len(kept) or kept[i + 1][0] != index + 1:
+        chunks.append(AudioChunk(data=np.concatenate(run).tobytes(), timestamp_delta=end_ms))
+        run = []
+    return chunks
+
+  def process(self, chunk: AudioChunk) -> list[AudioChunk]:
+    samples = np.concatenate((self._pending, np.frombuffer(chunk.data, dtype=np.int16)))
+    self._last_ms = chunk.timestamp_delta
+    count = len(samples) // self.frame_len
+    self._pending = samples[count * self.frame_len :]
+    if count == 0:
+      return []
+
+    frames = samples[: count * self.frame_len].reshape(count, self.frame_len)
+    # The chunk's timestamp is the end of its last sample, which may still be pending
+    first_end_ms = chunk.timestamp_delta - (len(samples) - self.frame_len) * 1000 / self.rate
+    frame_ms = self.frame_len * 1000 / self.rate
+
+    kept = []
+    for i, is_speech in enumerate(self.classify(frames)):
+      frame = (self._frame_index, frames[i], first_end_ms + i * frame_ms)
+      self._frame_index += 1
+      if is_speech:
+        kept.extend(self._lead)
+        self._lead.clear()
+        kept.append(frame)
+        self._trail = self.hangover_frames + self.padding_frames
+      elif self._trail > 0:
+        kept.append(frame)
+        self._trail -= 1
+      else:
+        if self.padding_frames:
+          if len(self._lead) == self._lead.maxlen:
+            self.dropped_samples += self.frame_len
+          self._lead.append(frame)
+        else:
+          self.dropped_samples += self.frame_len
+
+    self.kept_samples += len(kept) * self.frame_len
+    return self._emit(kept)
+
+  def flush(self) -> list[AudioChunk]:
+    # Leading padding that never met any speech is dropped
+    self.dropped_samples += len(self._lead) * self.frame_len
+    self._lead.clear()
+    if len(self._pending) == 0:
+      return []
+
+    tail, self._pending = self._pending, np.empty(0, dtype=np.int16)
+    if self._trail == 0:
+      self.dropped_samples += len(tail)
+      return []
+    self.kept_samples += len(tail)
+    return [AudioChunk(data=tail.tobytes(), timestamp_delta=self._last_ms)]
+
+
+def detect_voice_activity(**kwargs) -> Callable[[rx.Observable], rx.Observable]:
+  """Rx operator that drops non-speech audio; see VoiceActivityDetector for the arguments"""
+  return audio_stage(lambda: VoiceActivityDetector(**kwargs))
+
+
+def chunk_levels(chunk: AudioChunk) -> tuple[float, float]:
+  """RMS and peak level of a 16-bit chunk, in dBFS"""
+  x = np.frombuffer(chunk.data, dtype=np.int16).astype(np.float32) / 32768
+  if len(x) == 0:
+    return -100.0, -100.0
+  rms = float(np.sqrt(np.mean(x * x)))
+  peak = float(np.max(np.abs(x)))
+  return 20 * np.log10(rms + 1e-5), 20 * np.log10(peak + 1e-5)
+
+
+class SilenceGate:
+  """
+  Holds a recording back until something speech-like has been captured.
+
+  A chunk counts when both its RMS and peak levels reach their thresholds and the peak
+  isn't more than `max_crest_db` above the RMS, so steady hum (no peaks) and a lone key
+  click (one spike in an otherwise quiet chunk) don't open the gate. Once open, the held
+  chunks are released and everything after passes through; a recording that never opens
+  it is dropped on flush.
+  """
+
+  def __init__(
+    self, rms_threshold_db: float = -45.0, peak_threshold_db: float = -30.0, max_crest_db: float = 30.0
+  ):
+    self.rms_threshold_db = rms_threshold_db
+    self.peak_threshold_db = peak_threshold_db
+    self.max_crest_db = max_crest_db
+    self.is_open = False
+    self.max_rms_db = -100.0
+    self.max_peak_db = -100.0
+    self._held: list[AudioChunk] = []
+
+  def process(self, chunk: AudioChunk) -> list[AudioChunk]:
+    rms_db, peak_db = chunk_levels(chunk)
+    self.max_rms_db = max(self.max_rms_db, rms_db)
+    self.max_peak_db = max(self.max_peak_db, peak_db)
+    if self.is_open:
+      return [chunk]
+
+    self._held.append(chunk)
+    if (
+      rms_db >= self.rms_threshold_db
+      and peak_db >= self.peak_threshold_db
+      and peak_db - rms_db <= self.max_crest_db
+    ):
+      self.is_open = True
+      held, self._held = self._held, []
+      return held
+    return []
+
+  def flush(self) -> list[AudioChunk]:
+    self._held.clear()
+    return []
+
+
+class Endpointer:
+  """
+  Detects the end of an utterance from sustained silence after speech.
+
+  Speech is found with the same frame classifier as VoiceActivityDetector. Silence is
+  measured on the chunk timestamps, from the end of the last speech frame to the end of
+  the latest chunk.
+  """
+
+  def __init__(
+    self, silence_ms: int, rate: int = 16000, threshold_db: float = -50.0, min_speech_ms: int = 200
+  ):
+    self.silence_ms = silence_ms
+    self.min_speech_ms = min_speech_ms
+    self._vad = VoiceActivityDetector(rate=rate, threshold_db=threshold_db, hangover_ms=0, padding_ms=0)
+    self._last_speech_ms: float | None = None
+
+  @property
+  def speech_ms(self) -> float:
+    return self._vad.kept_ms
+
+  def update(self, chunk: AudioChunk) -> bool:
+    """Feed the next chunk, returning whether the recording is now at an endpoint"""
+    for speech in self._vad.process(chunk):
+      self._last_speech_ms = speech.timestamp_delta
+
+    if self._last_speech_ms is None or self.speech_ms < self.min_speech_ms:
+      return False
+    return chunk.timestamp_delta - self._last_speech_ms >= self.silence_ms
+
+
+class Segmenter:
+  """
+  Picks where to cut a long recording into windows that are transcribed separately.
+
+  A window closes at the first pause of `pause_ms` once it's at least `min_segment_ms` long,
+  or regardless at `max_segment_ms`. Pauses are found the way Endpointer finds trailing
+  silence, and the cut is made after the chunk where the pause is long enough.
+  """
+
+  def __init__(
+    self,
+    max_segment_ms: int,
+    min_segment_ms: int = 5000,
+    pause_ms: int = 500,
+    rate: int = 16000,
+    threshold_db: float = -50.0,
+  ):
+    self.max_segment_ms = max_segment_ms
+    self.min_segment_ms = min(min_segment_ms, max_segment_ms)
+    self.pause_ms = pause_ms
+    self.rate = rate
+    self.threshold_db = threshold_db
+    self.segments = 0  # Windows closed so far
+    self._start_ms: float | None = None
+    self._endpointer = self._new_endpointer()
+
+  def _new_endpointer(self) -> Endpointer:
+    return Endpointer(self.pause_ms, rate=self.rate, threshold_db=self.threshold_db)
+
+  def update(self, chunk: AudioChunk) -> bool:
+    """Feed the next chunk, returning whether the current window closes after it"""
+    if self._start_ms is None:
+      self._start_ms = chunk.timestamp_delta - len(chunk.data) / 2 / self.rate * 1000
+    at_pause = self._endpointer.update(chunk)
+
+    length_ms = chunk.timestamp_delta - self._start_ms
+    if length_ms < self.max_segment_ms and not (at_pause and length_ms >= self.min_segment_ms):
+      return False
+
+    self.segments += 1
+    self._start_ms = chunk.timestamp_delta
+    self._endpointer = self._new_endpointer()
+    return True
@@ -8,17 +8,25 @@ import asyncio
 import logging
 import queue
 import time
-from typing import cast
+import weakref
+from typing import TYPE_CHECKING, Callable
 
 import numpy as np
 import reactivex as rx
-import sounddevice as sd
 
 # Set up logging
 from loguru import logger
 from reactivex.scheduler.eventloop import AsyncIOScheduler
 
+from .audio_processing import PolyphaseResampler, audio_stage
 from .common import AudioChunk, AudioConfig
+from .device_registry import AudioDeviceRegistry, get_device_registry
+from .ring_buffer import AudioRingBuffer
+from .telemetry import CaptureTelemetry
+
+if TYPE_CHECKING:
+  # Loading sounddevice initializes PortAudio, which is deferred until a stream is opened
+  import sounddevice as sd
 
 
 def find_default_audio_device() -> int:
@@ -26,13 +34,10 @@ def find_default_audio_device() -> int:
   Find the default audio input device.
   Returns the device index or None if no default device is found.
   """
-  devices = sd.query_devices()
-  for i, d in enumerate(devices):
-    device = cast(dict, d)
-    if "ALC295" in device["name"]:
-      return i
-
-  raise EnvironmentError("No default audio input device found")
+  try:
+    return get_device_registry().find("ALC295").index
+  except ValueError:
+    raise EnvironmentError("No default audio input device found")
 
 
 class AudioSource:
@@ -41,76 +46,280 @@ class AudioSource:
 
   Provides observables for audio chunks with proper lifecycle management.
   Uses callback-based approach for better control over recording sessions.
+
+  When `AudioConfig.ring_buffer_ms` is set, the callback copies samples into a preallocated
+  ring buffer instead of allocating a chunk per block, and chunks are cut from the ring on
+  the consumer side, and timestamped from the number of frames consumed.
+
+  When `AudioConfig.keep_stream_open` is set, the stream is opened once and left running
+  between recordings. While idle the callback keeps the most recent `preroll_ms` of audio,
+  which is prepended to the next recording so the start of the first word isn't lost.
+
+  When `AudioConfig.resample_to` is set, the device is opened at its native rate and the
+  observable downmixes and resamples chunks to that rate on the event loop.
   """
 
-  def __init__(self, config: AudioConfig | None = None, scheduler: AsyncIOScheduler | None = None):
+  def __init__(
+    self,
+    config: AudioConfig | None = None,
+    scheduler: AsyncIOScheduler | None = None,
+    device_registry: AudioDeviceRegistry | None = None,
+  ):
     self.config = config or AudioConfig()
     self.scheduler = scheduler
+    self.device_registry = device_registry or get_device_registry()
+    self._device_index: int | None = None
     self._audio_queue = queue.Queue()
-    self._stream: sd.InputStream | None = None
+    self._stream: "sd.InputStream | None" = None
     self._recording_start_time: float | None = None
     self._is_recording = False
+    self._ring: AudioRingBuffer | None = None
+    self._ring_frames_read = 0
+    self._samplerate: float | None = None
+    self._loop: asyncio.AbstractEventLoop | None = None
+    self._push_consumers: list[Callable[[], bool]] = []
+    self._wakeup_pending = False
+    self._preroll: AudioRingBuffer | None = None
+    self._anchor_pending = False
+    self._frames_captured = 0
+    self._timeline_origin_ms = 0.0
+    self._stream_start_time: float | None = None
+    self._resamplers: weakref.WeakSet[PolyphaseResampler] = weakref.WeakSet()
+    self.telemetry = CaptureTelemetry()
 
     logger.info(f"AudioSource initialized with config: {self.config}")
 
-  def _audio_callback(self, indata: np.ndarray, _frames: int, _time_info, status):
+  def _audio_callback(self, indata: np.ndarray, _frames: int, time_info, status):
     """
     Audio callback called from separate thread by sounddevice.
     Puts audio data into queue with timestamp information.
+
+    Timestamps come from a running count of captured frames rather than the wall clock, so
+    they're exact and don't pick up scheduling jitter. The count is anchored once per
+    recording to the ADC time of the first block, relative to the stream time at key press.
     """
-    if status:
-      logger.warning(f"Audio callback status: {status}")
+    started = time.perf_counter()
+    # Only stored here; counted up and logged on the consumer side by _collect_telemetry
+    self.telemetry.record_callback(started, len(indata), self._samplerate or self.config.samplerate, status)
+    try:
+      self._capture_block(indata, time_info)
+    finally:
+      self.telemetry.record_duration(started)
+
+  def _collect_telemetry(self) -> None:
+    """Fold the audio thread's callback records into the capture stats. Not for the audio thread."""
+    overflows, underflows = self.telemetry.collect()
+    if overflows or underflows:
+      logger.warning(f"Audio input overflowed {overflows} times and underflowed {underflows} times")
+
+  def _capture_block(self, indata: np.ndarray, time_info) -> None:
+    """Hand one block to the consumer side. Called from the audio thread."""
+    if not self._is_recording:
+      # Warm stream between recordings: keep only the latest pre-roll
+      if self._preroll is not None:
+        self._preroll.write_latest(indata)
+      return
 
-    logger.trace("audio packet received, {frames}", frames=_frames)
+    if self._anchor_pending:
+      # First block of a recording
+      self._anchor_pending = False
+      if self._preroll is not None:
+        # Hand over the pre-roll ahead of it. Done here on the audio thread so the pre-roll
+        # ring only ever has one reader and one writer. The pre-roll starts the timeline.
+        self._capture_preroll()
+      else:
+        self._anchor_timeline(time_info)
+
+    if self._ring is not None:
+      # Lock-free, allocation-free hand-off; overflow is counted by the ring
+      written = self._ring.write(indata)
+      if written < len(indata):
+        self.telemetry.record_dropped(len(indata) - written)
+      self.telemetry.record_queue_depth(self._ring.available // max(1, len(indata)))
+      self._wake_consumers()
+      return
 
-    if self._is_recording and self._recording_start_time is not None:
-      # Calculate delta time from recording start
-      current_time = time.time() * 1000  # Convert to milliseconds
-      timestamp_delta = current_time - self._recording_start_time
+    self._frames_captured += len(indata)
+    self._enqueue_block(indata, self._frames_to_ms(self._frames_captured))
+    self.telemetry.record_queue_depth(self._audio_queue.qsize())
+    self._wake_consumers()
 
-      # Convert numpy array to bytes
-      audio_bytes = indata.copy()
+  def _anchor_timeline(self, time_info) -> None:
+    """
+    Offset the sample-count timeline by the ADC time of the first captured sample.
+    Called from the audio thread.
+    """
+    adc_time = getattr(time_info, "inputBufferAdcTime", 0.0)
+    if adc_time and self._stream_start_time is not None:
+      # Negative when a warm stream's first block began before the key press
+      self._timeline_origin_ms = (adc_time - self._stream_start_time) * 1000
+
+  def _frames_to_ms(self, frames: int) -> float:
+    """Convert a frame count since recording start to a timestamp delta"""
+    samplerate = self._samplerate or self.config.samplerate
+    return self._timeline_origin_ms + frames * 1000 / samplerate
+
+  def _stream_time(self) -> float | None:
+    """Current time on the stream's clock (the same clock as the callback's ADC times)"""
+    try:
+      return float(self._stream.time) if self._stream is not None else None
+    except Exception:
+      # PortAudioError once the stream has gone away; not imported here, as simulated
+      # streams never load sounddevice
+      return None
 
-      chunk = AudioChunk(data=audio_bytes.tobytes(), timestamp_delta=timestamp_delta)
+  def _enqueue_block(self, block: np.ndarray, timestamp_delta: float) -> None:
+    """Copy a block into a new AudioChunk on the capture queue"""
+    # Convert numpy array to bytes
+    audio_bytes = block.copy()
 
-      try:
-        self._audio_queue.put_nowait(chunk)
-        logger.debug(f"Audio chunk queued: {len(audio_bytes)} bytes at {timestamp_delta:.1f}ms")
-      except queue.Full:
-        logger.warning("Audio queue full, dropping chunk")
+    chunk = AudioChunk(data=audio_bytes.tobytes(), timestamp_delta=timestamp_delta)
+
+    try:
+      self._audio_queue.put_nowait(chunk)
+    except queue.Full:
+      self.telemetry.record_dropped(len(block))
+      logger.warning("Audio queue full, dropping chunk")
+
+  def _capture_preroll(self) -> None:
+    """Move the pre-roll into the capture path. Called from the audio thread."""
+    if self._preroll is None:
+      return
+
+    views = self._preroll.peek()
+    preroll_frames = sum(len(view) for view in views)
+    if preroll_frames == 0:
+      return
+
+    if self._ring is not None:
+      for view in views:
+        self._ring.write(view)
+    else:
+      self._frames_captured += preroll_frames
+      block = views[0] if len(views) == 1 else np.concatenate(views)
+      self._enqueue_block(block, self._frames_to_ms(self._frames_captured))
+
+    self._preroll.advance(preroll_frames)
+    logger.debug(f"Prepended {self._frames_to_ms(preroll_frames):.0f}ms of pre-roll")
+
+  def _attach_loop(self) -> bool:
+    """Bind push delivery to the running event loop, returning False if there isn't one"""
+    try:
+      self._loop = asyncio.get_running_loop()
+    except RuntimeError:
+      logger.warning("Push delivery requires a running event loop, falling back to polling")
+      return False
+    return True
+
+  def _wake_consumers(self) -> None:
+    """
+    Ask the event loop to drain captured audio. Called from the audio thread.
+
+    At most one wake-up is in flight at a time, so a burst of blocks costs a single
+    loop iteration rather than one per block.
+    """
+    if self._loop is None or self._wakeup_pending:
+      return
+
+    self._wakeup_pending = True
+    try:
+      self._loop.call_soon_threadsafe(self._drain_push_consumers)
+    except RuntimeError:
+      # Event loop already closed
+      self._wakeup_pending = False
+
+  def _drain_push_consumers(self) -> None:
+    """Emit everything captured so far to push subscribers. Runs on the event loop."""
+    # Clear first so a block that lands mid-drain schedules another pass
+    self._wakeup_pending = False
+    for drain in list(self._push_consumers):
+      drain()
 
   def _get_device_info(self) -> dict:
     """Get information about the audio device"""
     try:
-      device_info = cast(dict, sd.query_devices(self.config.device, "input"))
-      logger.info(f"Using audio device: {device_info['name']}")
-      return device_info
+      if self._stream is None:
+        # Re-enumerating restarts PortAudio, so only pick up hot-plugged devices while closed
+        self.device_registry.refresh()
+      device = self.device_registry.select(self.config.device_patterns, fallback=self.config.device)
+      if device.index != self._device_index:
+        logger.info(f"Using audio device: {device.name}")
+        self._device_index = device.index
+      return device.as_dict()
     except Exception:
       logger.exception("Error querying audio device")
       raise
 
-  def _create_stream(self) -> sd.InputStream:
+  def _capture_samplerate(self, device_info: dict | None = None) -> float:
+    """Rate the device is opened at: its native rate when resampling, else the configured one"""
+    if self.config.resample_to is None and self.config.samplerate:
+      return self.config.samplerate
+    device_info = device_info or self._get_device_info()
+    return device_info["default_samplerate"]
+
+  def _create_stream(self) -> "sd.InputStream":
     """Create and configure the audio input stream"""
     device_info = self._get_device_info()
 
-    # Use device default samplerate if not specified
-    samplerate = self.config.samplerate or device_info["default_samplerate"]
+    # Use device default samplerate if not specified (or when resampling)
+    samplerate = self._capture_samplerate(device_info)
+    blocksize = self.config.blocksize
+    if blocksize and self.config.resample_to is not None:
+      # Block size is configured in output frames; keep the same duration at the native rate
+      blocksize = round(blocksize * samplerate / self.config.resample_to)
 
     logger.info(
-      f"Creating audio stream: {self.config.channels} channels, "
-      f"{samplerate}Hz, blocksize={self.config.blocksize}"
+      f"Creating audio stream: {self.config.channels} channels, {samplerate}Hz, blocksize={blocksize}"
     )
 
-    stream = sd.InputStream(
-      device=self.config.device,
+    self._samplerate = samplerate
+    if self.config.ring_buffer_ms is not None:
+      self._ensure_ring_buffer(samplerate)
+    if self.config.keep_stream_open and self.config.preroll_ms > 0:
+      preroll_frames = int(samplerate * self.config.preroll_ms / 1000)
+      self._preroll = AudioRingBuffer(preroll_frames, channels=self.config.channels, dtype=self.config.dtype)
+
+    return self._open_stream(samplerate, blocksize)
+
+  def _open_stream(self, samplerate: float, blocksize: int | None) -> "sd.InputStream":
+    """Open the underlying input stream. Backends that don't use PortAudio override this."""
+    import sounddevice as sd
+
+    return sd.InputStream(
+      device=self._device_index,
       channels=self.config.channels,
       samplerate=samplerate,
-      blocksize=self.config.blocksize,
+      blocksize=blocksize,
       dtype=self.config.dtype,
       callback=self._audio_callback,
     )
 
-    return stream
+  def _ensure_ring_buffer(self, samplerate: float) -> None:
+    """Allocate the capture ring buffer, reusing the existing one if it's already the right size"""
+    assert self.config.ring_buffer_ms is not None
+    capacity = int(samplerate * self.config.ring_buffer_ms / 1000)
+    if self._ring is not None and self._ring.capacity == capacity:
+      return
+
+    self._ring = AudioRingBuffer(capacity, channels=self.config.channels, dtype=self.config.dtype)
+    logger.info(f"Allocated capture ring buffer: {capacity} frames ({self.config.ring_buffer_ms}ms)")
+
+  def _drain_ring(self, observer) -> int:
+    """Cut chunks from the ring buffer and emit them. Runs on the consumer side only."""
+    if self._ring is None or self._samplerate is None:
+      return 0
+
+    views = self._ring.peek()
+    frames = 0
+    for view in views:
+      # Copy out of the ring here, off the audio thread, since chunks outlive their slot
+      self._ring_frames_read += len(view)
+      frames += len(view)
+      timestamp_delta = self._frames_to_ms(self._ring_frames_read)
+      observer.on_next(AudioChunk(data=view.tobytes(), timestamp_delta=timestamp_delta))
+
+    self._ring.advance(frames)
+    return len(views)
 
   def start_recording(self):
     """Start audio recording session"""
@@ -131,14 +340,29 @@ class AudioSource:
           self._audio_queue.get_nowait()
         except queue.Empty:
           break
+      if self._ring is not None:
+        self._ring.clear()
+        self._ring_frames_read = 0
+      for resampler in self._resamplers:
+        resampler.reset()
 
       # Mark recording start time
       self._recording_start_time = time.time() * 1000  # milliseconds
-      self._is_recording = True
+      self._frames_captured = 0
+      self._timeline_origin_ms = 0.0
+      self._collect_telemetry()
+      self.telemetry.begin_recording()
 
-      # Start the audio stream
+      # Start the audio stream (a warm stream is already running)
       assert self._stream is not None, "Audio stream should be initialized"
-      self._stream.start()
+      if not self._stream.active:
+        self.telemetry.stream_restarted()
+        self._stream.start()
+
+      # Key press on the stream clock; the first callback anchors the timeline against it
+      self._stream_start_time = self._stream_time()
+      self._anchor_pending = True
+      self._is_recording = True
       logger.info(f"Audio recording started at {self._recording_start_time:.0f}ms")
 
     except Exception:
@@ -147,6 +371,32 @@ class AudioSource:
       self._recording_start_time = None
       raise
 
+  def prepare(self):
+    """
+    Load PortAudio and look up the device ahead of the first recording, so the first key
+    press doesn't pay for it. Safe to call from a worker thread.
+    """
+    try:
+      self._get_device_info()
+    except Exception:
+      logger.exception("Failed to prepare audio device")
+
+  def warm_up(self):
+    """Open and start the stream ahead of the first recording (keep_stream_open mode only)"""
+    if not self.config.keep_stream_open:
+      return
+
+    try:
+      if self._stream is None:
+        self._stream = self._create_stream()
+      if not self._stream.active:
+        self.telemetry.stream_restarted()
+        self._stream.start()
+        logger.info(f"Warm audio stream started with {self.config.preroll_ms}ms pre-roll")
+    except Exception:
+      logger.exception("Failed to warm up audio stream")
+      raise
+
   def stop_recording(self):
     """Stop audio recording session and close the stream to release microphone access"""
     if not self._is_recording:
@@ -157,9 +407,10 @@ class AudioSource:
 
     try:
       self._is_recording = False
+      self._anchor_pending = False
 
-      # Close the stream completely to release microphone access
-      if self._stream:
+      # Close the stream completely to release microphone access, unless it's kept warm
+      if self._stream and not self.config.keep_stream_open:
         if self._stream.active:
           self._stream.stop()
           logger.info("Audio stream stopped")
@@ -170,10 +421,21 @@ class AudioSource:
       # Log final statistics
       if self._recording_start_time:
         duration = (time.time() * 1000) - self._recording_start_time
+        captured_frames = self._ring_frames_read + (self._ring.available if self._ring else 0)
+        captured_frames += self._frames_captured
         logger.info(
-          f"Recording session ended. Duration: {duration:.0f}ms, Queue size: {self._audio_queue.qsize()}"
+          f"Recording session ended. Duration: {duration:.0f}ms, "
+          f"captured {self._frames_to_ms(captured_frames) - self._timeline_origin_ms:.0f}ms of audio, "
+          f"Queue size: {self._audio_queue.qsize()}"
         )
 
+      self._collect_telemetry()
+      stats = self.telemetry.recording
+      if stats.input_overflows or stats.dropped_frames:
+        logger.warning(f"Audio was lost during this recording. Capture stats: {stats.summary()}")
+      else:
+        logger.info(f"Capture stats: {stats.summary()}")
+
     except Exception:
       logger.exception("Error stopping recording")
 
@@ -206,17 +468,19 @@ class AudioSource:
     """
     Create an observable that emits audio chunks from the queue.
 
-    This observable polls the audio queue at regular intervals and emits
-    AudioChunk objects when they're available.
+    With `delivery="poll"` this observable polls the audio queue (or ring buffer) at regular
+    intervals. With `delivery="push"` the audio callback wakes the event loop whenever a block
+    arrives, so chunks are emitted immediately and nothing runs while no audio is flowing.
     """
 
     def audio_generator(observer, scheduler):
       logger.info("Audio observable started")
 
-      def poll_audio(*args):
+      def drain_audio() -> bool:
         try:
+          self._collect_telemetry()
           # Get all available chunks from queue
-          chunks_emitted = 0
+          chunks_emitted = self._drain_ring(observer)
           while not self._audio_queue.empty():
             try:
               chunk = self._audio_queue.get_nowait()
@@ -227,38 +491,75 @@ class AudioSource:
 
           if chunks_emitted > 0:
             logger.debug(f"Emitted {chunks_emitted} audio chunks")
+          return True
 
         except Exception as e:
           logger.exception("Error in audio polling")
           observer.on_error(e)
-          return
+          return False
+
+      if self.config.delivery == "push" and self._attach_loop():
+        self._push_consumers.append(drain_audio)
+        # Pick up anything this recording captured before we subscribed. Between recordings
+        # the queue only holds the previous recording's tail, which start_recording discards.
+        if self._is_recording:
+          drain_audio()
 
-        # Schedule next poll
-        if scheduler:
-          scheduler.schedule_relative(self.config.chunk_poll_interval_ms / 1000.0, poll_audio)
+        def cleanup():
+          logger.info("Audio observable cleanup called")
+          if drain_audio in self._push_consumers:
+            self._push_consumers.remove(drain_audio)
 
-      # Start polling
-      poll_audio()
+      else:
 
-      # Return cleanup function
-      def cleanup():
-        logger.info("Audio observable cleanup called")
+        def poll_audio(*args):
+          if not drain_audio():
+            return
+
+          # Schedule next poll
+          if scheduler:
+            scheduler.schedule_relative(self.config.chunk_poll_interval_ms / 1000.0, poll_audio)
+
+        # Start polling
+        poll_audio()
+
+        # Return cleanup function
+        def cleanup():
+          logger.info("Audio observable cleanup called")
 
       from reactivex.disposable import Disposable
 
       return Disposable(cleanup)
 
-    return rx.create(audio_generator)
+    observable = rx.create(audio_generator)
+    if self.config.resample_to is not None:
+      observable = observable.pipe(audio_stage(self._create_resampler))
+    return observable
+
+  def _create_resampler(self) -> PolyphaseResampler:
+    """Build the native-rate to output-rate conversion stage for one subscription"""
+    assert self.config.resample_to is not None
+    resampler = PolyphaseResampler(
+      self._capture_samplerate(), out_rate=self.config.resample_to, channels=self.config.channels
+    )
+    logger.info(
+      f"Resampling {resampler.in_rate}Hz x{self.config.channels} to {resampler.out_rate}Hz mono "
+      f"(L={resampler.up}, M={resampler.down})"
+    )
+    self._resamplers.add(resampler)
+    return resampler
 
 
 def list_audio_devices():
   """Utility function to list available audio devices"""
   print("Available audio devices:")
-  devices = sd.query_devices()
-  for i, d in enumerate(devices):
-    device = cast(dict, d)
-    if device["max_input_channels"] > 0:
-      print(f"  {i}: {device['name']} (max {device['max_input_channels']} input channels)")
+  registry = get_device_registry()
+  for device in registry.devices():
+    rates = ", ".join(str(rate) for rate in registry.supported_samplerates(device))
+    print(
+      f"  {device.index}: {device.name} (max {device.max_input_channels} input channels, "
+      f"{device.default_low_input_latency * 1000:.1f}ms latency, rates: {rates})"
+    )
 
 
 # Example usage and testing
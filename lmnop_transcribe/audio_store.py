@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Per-session audio storage with a memory ceiling.
+Keeps a session's audio in one contiguous buffer, and moves it to a temporary file once it
+outgrows the ceiling, so long recordings don't grow the process. Chunks stay addressable by
+index either way, for replays and retries.
+"""
+
+import logging
+import mmap
+import tempfile
+from array import array
+
+logger = logging.getLogger(__name__)
+
+
+class SessionAudioStore:
+  """
+  The audio chunks of one session, in the order they were added.
+
+  Up to `max_memory_bytes` is held in a single bytearray. Past that, everything is moved to
+  an unlinked temporary file in `spill_dir`; later chunks are appended to the file, and reads
+  go through a memory map of it, so only the pages read are brought in.
+  """
+
+  def __init__(self, max_memory_bytes: int = 16 * 1024 * 1024, spill_dir: str | None = None):
+    self.max_memory_bytes = max_memory_bytes
+    self.spill_dir = spill_dir
+    self._offsets = array("Q", [0])  # Where each chunk starts, and where the next one will
+    self._memory: bytearray | None = bytearray()
+    self._file = None
+    self._map: mmap.mmap | None = None
+
+  @property
+  def nbytes(self) -> int:
+    return self._offsets[-1]
+
+  @property
+  def spilled(self) -> bool:
+    """Whether the audio has moved to disk"""
+    return self._file is not None
+
+  def __len__(self) -> int:
+    return len(self._offsets) - 1
+
+  def append(self, data: bytes) -> None:
+    if self._memory is not None and self.nbytes + len(data) > self.max_memory_bytes:
+      self._spill()
+
+    if self._memory is not None:
+      self._memory += data
+    else:
+      assert self._file is not None
+      self._file.write(data)
+    self._offsets.append(self.nbytes + len(data))
+
+  def __getitem__(self, index: int) -> bytes:
+    if index < 0:
+      index += len(self)
+    if not 0 <= index < len(self):
+      raise IndexError("chunk index out of range")
+    return self.read(self._offsets[index], self._offsets[index + 1])
+
+  def __iter__(self):
+    for index in range(len(self)):
+      yield self[index]
+
+  def read(self, start: int, stop: int) -> bytes:
+    """The bytes from `start` to `stop`, across chunk boundaries"""
+    if self._memory is not None:
+      return bytes(self._memory[start:stop])
+    if stop <= start:
+      return b""
+    return self._mapped()[start:stop]
+
+  def _spill(self) -> None:
+    assert self._memory is not None
+    logger.debug(f"Session audio passed {self.max_memory_bytes} bytes, moving it to a temporary file")
+    self._file = tempfile.TemporaryFile(dir=self.spill_dir, buffering=0)
+    self._file.write(self._memory)
+    self._memory = None
+
+  def _mapped(self) -> mmap.mmap:
+    """A map of the whole file, remapped if it has grown since the last read"""
+    assert self._file is not None
+    if self._map is None or len(self._map) < self.nbytes:
+      if self._map is not None:
+        self._map.close()
+      self._map = mmap.mmap(self._file.fileno(), self.nbytes, access=mmap.ACCESS_READ)
+    return self._map
+
+  def close(self) -> None:
+    """Release the audio; the temporary file is deleted"""
+    if self._map is not None:
+      self._map.close()
+      self._map = None
+    if self._file is not None:
+      self._file.close()
+      self._file = None
+    self._memory = bytearray()
+    self._offsets = array("Q", [0])
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Fast encoding of Wyoming audio-chunk events.
+Every chunk in a session has the same rate, width and channels, so everything but the
+payload length is encoded once, and the PCM payload is sent as-is next to the header.
+"""
+
+import io
+import json
+import socket
+
+from wyoming.audio import AudioChunk as WyomingAudioChunk
+from wyoming.event import write_event
+
+
+class AudioChunkEncoder:
+  """
+  Encodes audio-chunk events for one audio format, byte-for-byte as `write_event` would.
+
+  The constant parts are taken from an event encoded by `write_event` itself, so they
+  always match the installed wyoming version.
+  """
+
+  def __init__(self, rate: int, width: int, channels: int):
+    template = io.BytesIO()
+    write_event(WyomingAudioChunk(rate=rate, width=width, channels=channels, audio=b"\0").event(), template)
+    header_line, rest = template.getvalue().split(b"\n", 1)
+    header = json.loads(header_line)
+    data = rest[: header["data_length"]]
+
+    header["payload_length"] = 0
+    line = json.dumps(header, ensure_ascii=False).encode()
+    if not line.endswith(b'"payload_length": 0}'):
+      raise ValueError(f"Unexpected Wyoming event header layout: {line!r}")
+
+    self._prefix = line[: -len(b"0}")]
+    self._suffix = b"}\n" + data
+
+  def header(self, payload_length: int) -> bytes:
+    """Everything that goes on the wire before a payload of this length"""
+    return b"%s%d%s" % (self._prefix, payload_length, self._suffix)
+
+  def buffers(self, payload: bytes) -> list[bytes]:
+    """The event as buffers to send in order, with the payload left uncopied"""
+    return [self.header(len(payload)), payload]
+
+
+def send_buffers(sock: socket.socket, buffers: list[bytes]) -> None:
+  """Send buffers with vectored writes, picking up after any partial send"""
+  views = [memoryview(buffer) for buffer in buffers]
+  while views:
+    sent = sock.sendmsg(views)
+    while views and sent >= len(views[0]):
+      sent -= len(views.pop(0))
+    if views and sent:
+      views[0] = views[0][sent:]
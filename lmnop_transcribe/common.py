@@ -29,6 +29,14 @@ class TranscriptionResult:
   timestamp_delta: float  # milliseconds from recording start
 
 
+@dataclass
+class TranscriptUpdate:
+  recording_id: float
+  text: str  # Everything transcribed so far
+  is_final: bool  # False for interim results, which later updates may revise
+  segment: int = 0  # Which window of a segmented recording the text is from
+
+
 @dataclass
 class CancelEvent:
   recording_id: float
@@ -55,11 +63,44 @@ class ProcessedRecording(TypedDict):
 class Config:
   save_wav_files: bool = False
   wav_output_path: str | None = None
-  wyoming_server_address: str = "localhost:10300"
+  archive_format: str = "wav"  # Format saved recordings are written in | 'flac'
+  wyoming_server_address: str = "localhost:10300"  # Comma-separated to spread sessions over several servers
+  wyoming_connect_timeout_s: float = 5.0
+  wyoming_write_timeout_s: float = 5.0  # Per event; a server this far behind is treated as gone
+  wyoming_read_timeout_s: float = 30.0  # Wait for the transcript after the audio ends
+  wyoming_routing: str = "least_outstanding"  # How sessions are spread over several servers | 'latency'
+  hedge_quantile: float = 0.0  # Replay to another server when a transcript is later than this quantile; 0 off
+  fast_chunk_encoder: bool = False  # Send pre-serialized chunk headers with the PCM in one vectored write
+  wyoming_pool_size: int = 1  # Connections kept open ahead of the next recording; 0 connects on key press
+  session_audio_memory_mb: float = 16.0  # Audio kept per session for replays before it spills to disk
+  send_queue_depth: int = 64  # Chunks held in memory per session while they wait to be sent
+  send_queue_overflow: str = "spill"  # Past the depth: 'spill' to disk | 'drop_oldest' | 'drop_newest'
+  max_sessions: int = 4  # Recordings transcribed at once, including those waiting on their transcript
   trim_duration_ms: int = 500
+  trim_mode: str = "chunk"  # 'chunk' drops whole chunks | 'sample' cuts at the exact sample
+  trim_tail_ms: int = 0  # Audio cut from the end of each recording in 'sample' mode (key-release click)
   minimum_recording_ms: int = 2000
   start_trigger_type: str = "caps_lock"
   stop_trigger_type: str = "caps_lock"
+  warm_stream: bool = False  # Keep the microphone open and prepend pre-roll to each recording
+  preroll_ms: int = 300
+  ring_buffer_ms: int = 0  # Capture into a preallocated ring of this length; 0 uses a queue
+  capture_block_ms: int = 1000  # Device block size; e.g. 10-20 for low-latency capture
+  network_frame_ms: int = 0  # Regroup blocks into frames this long before sending; 0 sends blocks as-is
+  native_rate_capture: bool = False  # Capture at the device's own rate and resample to 16kHz
+  capture_channels: int = 1  # Channels captured in native-rate mode (downmixed to mono)
+  audio_device_patterns: tuple[str, ...] = ()  # Input device name regexes, in order of preference
+  vad_enabled: bool = False  # Drop non-speech audio before it's sent for transcription
+  vad_threshold_db: float = -50.0  # Frames quieter than this (dBFS) are never speech
+  vad_hangover_ms: int = 300  # How long speech keeps the detector open after it stops
+  vad_padding_ms: int = 200  # Audio kept on either side of detected speech
+  skip_silent_recordings: bool = False  # Cancel locally instead of sending recordings with nothing in them
+  silence_rms_db: float = -45.0  # A chunk must reach this RMS level (dBFS) to count as speech-like
+  silence_peak_db: float = -30.0  # ...and this peak level (dBFS)
+  endpoint_silence_ms: int = 0  # Finish the audio after this much trailing silence; 0 waits for the key
+  segment_max_ms: int = 0  # Cut recordings into windows this long at most, transcribed concurrently; 0 off
+  segment_min_ms: int = 5000  # Windows are only cut at a pause once they're this long
+  segment_pause_ms: int = 500  # Silence that counts as a pause to cut at
 
 
 @dataclass
@@ -67,8 +108,14 @@ class AudioConfig:
   """Configuration for audio streaming"""
 
   device: str = "default"  # "default" for default device
+  device_patterns: tuple[str, ...] = ()  # Name regexes tried in order before falling back to `device`
   channels: int = 1  # Mono recording
   samplerate: float = 16000  # Whisper uses 16kHz internally
   blocksize: int | None = None  # None for device default
   chunk_poll_interval_ms: int = 10  # How often to poll audio queue
+  delivery: str = "poll"  # 'poll' | 'push' (callback wakes the event loop)
   dtype: str = "int16"  # Data type for audio samples
+  ring_buffer_ms: int | None = None  # Capture into a preallocated ring of this length; None uses a queue
+  keep_stream_open: bool = False  # Leave the stream running between recordings
+  preroll_ms: int = 300  # Audio kept from before the key press when the stream is warm
+  resample_to: int | None = None  # Capture at the device's native rate and resample to mono at this rate
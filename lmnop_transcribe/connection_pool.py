@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Pre-connected Wyoming connections.
+Keeps idle, health-checked TCP connections to a Wyoming server open so a new transcription
+session can start sending straight away, instead of connecting when the key is pressed.
+"""
+
+import asyncio
+import logging
+import time
+
+from wyoming.event import Event, async_read_event, async_write_event
+
+logger = logging.getLogger(__name__)
+
+
+class WyomingConnection:
+  """An open connection to a Wyoming server, used by a single session"""
+
+  def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    self.reader = reader
+    self.writer = writer
+    self.opened_at = time.monotonic()
+
+  @property
+  def is_usable(self) -> bool:
+    """Whether the connection still looks open from our side"""
+    return not self.writer.is_closing() and not self.reader.at_eof()
+
+  async def probe(self, timeout: float | None) -> bool:
+    """Round-trip a Describe event, returning whether the server answered with its Info"""
+    try:
+      await asyncio.wait_for(async_write_event(Event(type="describe"), self.writer), timeout=timeout)
+      event = await asyncio.wait_for(async_read_event(self.reader), timeout=timeout)
+    except (OSError, asyncio.TimeoutError):
+      return False
+    except Exception as e:
+      # A malformed or truncated answer; whatever is on the other end isn't usable
+      logger.warning(f"Bad answer to a Wyoming probe from {self.writer.get_extra_info('peername')}: {e!r}")
+      return False
+    return event is not None and event.type == "info"
+
+  async def close(self) -> None:
+    try:
+      self.writer.close()
+      await asyncio.wait_for(self.writer.wait_closed(), timeout=1.0)
+    except Exception:
+      pass
+
+
+class WyomingConnectionPool:
+  """
+  A pool of idle connections to one Wyoming server.
+
+  Connections are single-use: `acquire` hands one out (connecting directly if none is idle)
+  and a replacement is opened in the background. Idle connections are probed every
+  `health_check_interval` seconds and replaced if the server doesn't answer, or once they
+  are older than `max_idle`.
+  """
+
+  def __init__(
+    self,
+    wyoming_server_address: str,
+    size: int = 1,
+    connect_timeout: float | None = 5.0,
+    health_check_interval: float = 30.0,
+    probe_timeout: float = 2.0,
+    max_idle: float = 300.0,
+    max_retry_delay: float = 30.0,
+  ):
+    host, port = wyoming_server_address.split(":")
+    self.host = host
+    self.port = int(port)
+    self.size = size
+    self.connect_timeout = connect_timeout
+    self.health_check_interval = health_check_interval
+    self.probe_timeout = probe_timeout
+    self.max_idle = max_idle
+    self.max_retry_delay = max_retry_delay
+
+    self._idle: list[WyomingConnection] = []
+    self._wake = asyncio.Event()
+    self._task: asyncio.Task | None = None
+    self.hits = 0
+    self.misses = 0
+
+  @property
+  def idle_count(self) -> int:
+    return len(self._idle)
+
+  async def start(self) -> None:
+    """Start keeping connections open in the background"""
+    if self._task is None:
+      self._task = asyncio.create_task(self._maintain())
+
+  async def close(self) -> None:
+    """Stop the background task and close every idle connection"""
+    if self._task:
+      self._task.cancel()
+      try:
+        await self._task
+      except asyncio.CancelledError:
+        pass
+      self._task = None
+
+    idle, self._idle = self._idle, []
+    await asyncio.gather(*(connection.close() for connection in idle))
+
+  async def connect(self) -> WyomingConnection:
+    """Open a new connection, bypassing the pool"""
+    reader, writer = await asyncio.wait_for(
+      asyncio.open_connection(self.host, self.port), timeout=self.connect_timeout
+    )
+    return WyomingConnection(reader, writer)
+
+  async def acquire(self) -> WyomingConnection:
+    """Take an idle connection, or connect now if there isn't a usable one"""
+    while self._idle:
+      connection = self._idle.pop(0)
+      if connection.is_usable:
+        self.hits += 1
+        self._wake.set()  # Replace it
+        return connection
+      await connection.close()
+
+    self.misses += 1
+    self._wake.set()
+    return await self.connect()
+
+  async def _maintain(self) -> None:
+    """Keep `size` healthy connections idle until closed"""
+    retry_delay = 0.5
+    last_check = time.monotonic()
+    while True:
+      try:
+        while len(self._idle) < self.size:
+          self._idle.append(await self.connect())
+        retry_delay = 0.5
+      except (OSError, asyncio.TimeoutError) as e:
+        logger.warning(f"Could not pre-connect to Wyoming server {self.host}:{self.port}: {e}")
+        await self._sleep(retry_delay)
+        retry_delay = min(retry_delay * 2, self.max_retry_delay)
+        continue
+
+      await self._sleep(self.health_check_interval - (time.monotonic() - last_check))
+      if time.monotonic() - last_check >= self.health_check_interval:
+        try:
+          await self._check_idle()
+        except Exception:
+          # Keep maintaining the pool; a failed check is retried at the next interval
+          logger.exception(f"Error checking connections to Wyoming server {self.host}:{self.port}")
+        last_check = time.monotonic()
+
+  async def _check_idle(self) -> None:
+    """Drop idle connections that are too old or that the server no longer answers on"""
+    for connection in list(self._idle):
+      # Out of the pool while it's probed, so a session can't take it mid-exchange
+      self._idle.remove(connection)
+      healthy = (
+        connection.is_usable
+        and time.monotonic() - connection.opened_at < self.max_idle
+        and await connection.probe(self.probe_timeout)
+      )
+      if healthy:
+        self._idle.append(connection)
+      else:
+        logger.debug(f"Replacing stale connection to Wyoming server {self.host}:{self.port}")
+        await connection.close()
+
+  async def _sleep(self, seconds: float) -> None:
+    """Sleep, waking early when a connection is taken"""
+    self._wake.clear()
+    try:
+      await asyncio.wait_for(self._wake.wait(), timeout=max(seconds, 0))
+    except asyncio.TimeoutError:
+      pass
@@ -0,0 +1,227 @@
+"""
+Cached registry of audio input devices.
+Enumerates PortAudio devices once and only re-enumerates when the set of sound devices
+on the system changes, keeping device queries off the key-press path.
+"""
+
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import cast
+
+from loguru import logger
+
+# Sample rates probed when a device's capabilities are first requested
+PROBE_SAMPLERATES = (8000, 16000, 22050, 32000, 44100, 48000, 96000)
+
+
+def _reinitialize_portaudio() -> bool:
+  """
+  Have PortAudio rebuild its device list, returning whether it could.
+
+  PortAudio lists the system's devices once, in Pa_Initialize, so the only way to see devices
+  plugged in or removed since is to terminate and initialize it again. sounddevice has no
+  public API for that; its private `_terminate` and `_initialize` do exactly this while
+  keeping its own bookkeeping straight, so they're used when this version still has them.
+  Without them, the devices found at startup are all that will be seen until a restart.
+  """
+  import sounddevice as sd
+
+  terminate = getattr(sd, "_terminate", None)
+  initialize = getattr(sd, "_initialize", None)
+  if not callable(terminate) or not callable(initialize):
+    logger.warning("This sounddevice can't re-initialize PortAudio; restart to pick up new audio devices")
+    return False
+
+  try:
+    terminate()
+  except Exception:
+    logger.exception("Could not terminate PortAudio")
+    return False
+  try:
+    initialize()
+  except Exception:
+    logger.exception("Could not re-initialize PortAudio")
+    return False
+  return True
+
+
+@dataclass(frozen=True)
+class AudioDeviceInfo:
+  """Capabilities of one audio input device, as reported by PortAudio"""
+
+  index: int
+  name: str
+  hostapi: int
+  max_input_channels: int
+  default_samplerate: float
+  default_low_input_latency: float
+  default_high_input_latency: float
+
+  def as_dict(self) -> dict:
+    """Return the same shape of dict as `sounddevice.query_devices`"""
+    return {
+      "index": self.index,
+      "name": self.name,
+      "hostapi": self.hostapi,
+      "max_input_channels": self.max_input_channels,
+      "default_samplerate": self.default_samplerate,
+      "default_low_input_latency": self.default_low_input_latency,
+      "default_high_input_latency": self.default_high_input_latency,
+    }
+
+
+class AudioDeviceRegistry:
+  """
+  Enumerates input devices once and caches their capabilities.
+
+  PortAudio has no hot-plug notifications and only sees new devices after being
+  re-initialized, so the registry watches the kernel's sound device nodes instead. A
+  listing of that directory is cheap enough to check on every lookup; PortAudio is only
+  re-initialized and re-enumerated when it changes. Re-initializing invalidates open
+  streams, so callers holding a stream open should not request a refresh.
+
+  Safe to use from several threads, e.g. to enumerate in the background at startup.
+  """
+
+  def __init__(self, hotplug_path: str = "/dev/snd"):
+    self.hotplug_path = hotplug_path
+    self._devices: list[AudioDeviceInfo] | None = None
+    self._signature: tuple[str, ...] | None = None
+    self._samplerates: dict[int, tuple[int, ...]] = {}
+    self._lock = threading.RLock()
+
+  def _hotplug_signature(self) -> tuple[str, ...] | None:
+    """Identify the current set of sound device nodes"""
+    try:
+      return tuple(sorted(os.listdir(self.hotplug_path)))
+    except OSError:
+      return None
+
+  def _enumerate(self) -> list[AudioDeviceInfo]:
+    import sounddevice as sd
+
+    devices = []
+    for i, d in enumerate(sd.query_devices()):
+      device = cast(dict, d)
+      if device["max_input_channels"] <= 0:
+        continue
+      devices.append(
+        AudioDeviceInfo(
+          index=device.get("index", i),
+          name=device["name"],
+          hostapi=device["hostapi"],
+          max_input_channels=device["max_input_channels"],
+          default_samplerate=device["default_samplerate"],
+          default_low_input_latency=device["default_low_input_latency"],
+          default_high_input_latency=device["default_high_input_latency"],
+        )
+      )
+
+    logger.info(f"Enumerated {len(devices)} audio input devices")
+    return devices
+
+  def refresh(self, force: bool = False) -> bool:
+    """
+    Re-enumerate devices if they may have changed since the last enumeration.
+
+    Returns:
+        True if the device list was (re)built
+    """
+    signature = self._hotplug_signature()
+    with self._lock:
+      if self._devices is not None and not force and signature == self._signature:
+        return False
+
+      if self._devices is not None:
+        logger.info("Audio devices changed, re-initializing PortAudio")
+        if not _reinitialize_portaudio():
+          # Not retried until the devices change again
+          self._signature = signature
+          return False
+
+      self._devices = self._enumerate()
+      self._signature = signature
+      self._samplerates.clear()
+      return True
+
+  def devices(self) -> list[AudioDeviceInfo]:
+    """All input devices, enumerating on first use"""
+    with self._lock:
+      if self._devices is None:
+        self.refresh()
+      return cast(list[AudioDeviceInfo], self._devices)
+
+  def find(self, device: int | str | None) -> AudioDeviceInfo:
+    """
+    Look up a device the way sounddevice does: by index, by exact name, or by a
+    case-insensitive substring of its name. None selects PortAudio's default input.
+    """
+    devices = self.devices()
+
+    if device is None:
+      import sounddevice as sd
+
+      device = cast(int, sd.default.device[0])
+
+    if isinstance(device, int):
+      for info in devices:
+        if info.index == device:
+          return info
+      raise ValueError(f"No audio input device with index {device}")
+
+    for info in devices:
+      if info.name == device:
+        return info
+    for info in devices:
+      if device.lower() in info.name.lower():
+        return info
+    raise ValueError(f"No audio input device matching {device!r}")
+
+  def select(self, patterns: tuple[str, ...] = (), fallback: int | str | None = None) -> AudioDeviceInfo:
+    """
+    Pick an input device by rules.
+
+    Args:
+        patterns: Regular expressions tried in order against device names; the first
+            pattern that matches any device wins
+        fallback: Device used when no pattern matches (see `find`)
+    """
+    for pattern in patterns:
+      regex = re.compile(pattern, re.IGNORECASE)
+      for info in self.devices():
+        if regex.search(info.name):
+          return info
+      logger.debug(f"No audio input device matches {pattern!r}")
+
+    return self.find(fallback)
+
+  def supported_samplerates(self, info: AudioDeviceInfo) -> tuple[int, ...]:
+    """Sample rates the device accepts, probed once per device and cached"""
+    with self._lock:
+      if info.index not in self._samplerates:
+        import sounddevice as sd
+
+        rates = []
+        for rate in PROBE_SAMPLERATES:
+          try:
+            sd.check_input_settings(device=info.index, samplerate=rate)
+            rates.append(rate)
+          except Exception:
+            pass
+        self._samplerates[info.index] = tuple(rates)
+      return self._samplerates[info.index]
+
+
+_registry: AudioDeviceRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_device_registry() -> AudioDeviceRegistry:
+  """Process-wide device registry"""
+  global _registry
+  with _registry_lock:
+    if _registry is None:
+      _registry = AudioDeviceRegistry()
+    return _registry
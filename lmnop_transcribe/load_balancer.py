@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Routing of transcription sessions across several Wyoming servers.
+Tracks how busy and how fast each server is, probes them in the background and takes
+failing servers out of rotation for a while.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Collection
+
+from .connection_pool import WyomingConnection
+from .telemetry import RESPONSE_BUCKETS_MS, Histogram, metrics
+
+logger = logging.getLogger(__name__)
+
+ROUTING_STRATEGIES = ("least_outstanding", "latency")
+
+
+class WyomingServer:
+  """One Wyoming server and what's known about it"""
+
+  def __init__(self, address: str, ewma_alpha: float = 0.3):
+    self.address = address
+    self.ewma_alpha = ewma_alpha
+    self.outstanding = 0
+    self.consecutive_failures = 0
+    self.ejected_until = 0.0
+    self.response_ms = metrics.histogram(f"wyoming.{address}.response_ms", RESPONSE_BUCKETS_MS)
+    self.probe_ms = Histogram(f"wyoming.{address}.probe_ms")
+    self.ewma_response_ms: float | None = None
+
+  @property
+  def is_ejected(self) -> bool:
+    return time.monotonic() < self.ejected_until
+
+  @property
+  def expected_response_ms(self) -> float:
+    """Smoothed time to a transcript, or the probe round trip before any have been seen"""
+    if self.ewma_response_ms is not None:
+      return self.ewma_response_ms
+    return self.probe_ms.mean
+
+  def observe_response(self, ms: float) -> None:
+    self.response_ms.observe(ms)
+    if self.ewma_response_ms is None:
+      self.ewma_response_ms = ms
+    else:
+      self.ewma_response_ms += self.ewma_alpha * (ms - self.ewma_response_ms)
+
+  def stats(self) -> dict:
+    return {
+      "outstanding": self.outstanding,
+      "ejected": self.is_ejected,
+      "consecutive_failures": self.consecutive_failures,
+      "expected_response_ms": self.expected_response_ms,
+      "response_ms": self.response_ms.summary(),
+      "probe_ms": self.probe_ms.summary(),
+    }
+
+
+class WyomingLoadBalancer:
+  """
+  Picks a server for each new session.
+
+  `least_outstanding` sends a session to the server with the fewest sessions in flight,
+  breaking ties on expected response time. `latency` weights each server's expected response
+  time by the sessions it would then have in flight. A server is ejected for `eject_for`
+  seconds after `eject_after` consecutive failures (sessions or probes), and a successful
+  probe puts it back. If every server is ejected, the one due back soonest is used.
+  """
+
+  def __init__(
+    self,
+    addresses: list[str],
+    strategy: str = "least_outstanding",
+    probe_interval: float = 10.0,
+    probe_timeout: float = 2.0,
+    eject_after: int = 3,
+    eject_for: float = 30.0,
+  ):
+    if not addresses:
+      raise ValueError("At least one Wyoming server is required")
+    if strategy not in ROUTING_STRATEGIES:
+      raise ValueError(f"Unknown routing strategy {strategy!r}, expected one of {ROUTING_STRATEGIES}")
+
+    self.servers = [WyomingServer(address) for address in addresses]
+    self.strategy = strategy
+    self.probe_interval = probe_interval
+    self.probe_timeout = probe_timeout
+    self.eject_after = eject_after
+    self.eject_for = eject_for
+    self._task: asyncio.Task | None = None
+
+  def choose(self, exclude: Collection[WyomingServer] = ()) -> WyomingServer | None:
+    """The server the next session should go to, or None if every server is excluded"""
+    servers = [server for server in self.servers if server not in exclude]
+    if not servers:
+      return None
+
+    candidates = [server for server in servers if not server.is_ejected]
+    if not candidates:
+      return min(servers, key=lambda server: server.ejected_until)
+
+    if self.strategy == "latency":
+      return min(
+        candidates, key=lambda server: (server.outstanding + 1) * (server.expected_response_ms or 1.0)
+      )
+    return min(candidates, key=lambda server: (server.outstanding, server.expected_response_ms))
+
+  def session_started(self, server: WyomingServer) -> None:
+    server.outstanding += 1
+
+  def session_finished(self, server: WyomingServer, ok: bool, response_ms: float | None = None) -> None:
+    """Record how a session on `server` went; a failure counts towards ejecting it"""
+    server.outstanding = max(server.outstanding - 1, 0)
+    if response_ms is not None:
+      server.observe_response(response_ms)
+    self._record_result(server, ok)
+
+  def _record_result(self, server: WyomingServer, ok: bool) -> None:
+    if ok:
+      if server.is_ejected:
+        logger.info(f"Wyoming server {server.address} is healthy again")
+      server.consecutive_failures = 0
+      server.ejected_until = 0.0
+      return
+
+    server.consecutive_failures += 1
+    if server.consecutive_failures >= self.eject_after and not server.is_ejected:
+      logger.warning(
+        f"Ejecting Wyoming server {server.address} for {self.eject_for:.0f}s "
+        f"after {server.consecutive_failures} failures"
+      )
+      metrics.counter("wyoming.ejections").inc()
+      server.ejected_until = time.monotonic() + self.eject_for
+
+  async def probe(self, server: WyomingServer) -> bool:
+    """Check that `server` answers a Describe with its Info, recording the round trip"""
+    host, port = server.address.split(":")
+    started = time.perf_counter()
+    connection = None
+    try:
+      reader, writer = await asyncio.wait_for(asyncio.open_connection(host, int(port)), self.probe_timeout)
+      connection = WyomingConnection(reader, writer)
+      ok = await connection.probe(self.probe_timeout)
+    except (OSError, asyncio.TimeoutError):
+      ok = False
+    except Exception as e:
+      # Counts against this server only; the others are still probed
+      logger.warning(f"Error probing Wyoming server {server.address}: {e!r}")
+      ok = False
+    finally:
+      if connection is not None:
+        await connection.close()
+
+    if ok:
+      server.probe_ms.observe((time.perf_counter() - started) * 1000)
+    self._record_result(server, ok)
+    return ok
+
+  async def start(self) -> None:
+    """Start probing the servers in the background"""
+    if self._task is None:
+      self._task = asyncio.create_task(self._probe_periodically())
+
+  async def close(self) -> None:
+    if self._task:
+      self._task.cancel()
+      try:
+        await self._task
+      except asyncio.CancelledError:
+        pass
+      self._task = None
+
+  async def _probe_periodically(self) -> None:
+    while True:
+      results = await asyncio.gather(*(self.probe(server) for server in self.servers), return_exceptions=True)
+      for server, result in zip(self.servers, results):
+        if isinstance(result, Exception):
+          logger.warning(f"Error probing Wyoming server {server.address}: {result!r}")
+          self._record_result(server, False)
+      await asyncio.sleep(self.probe_interval)
+
+  def stats(self) -> dict[str, dict]:
+    """Per-server routing state and latency summaries"""
+    return {server.address: server.stats() for server in self.servers}
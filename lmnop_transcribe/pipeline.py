@@ -7,19 +7,32 @@ This is a port of the TypeScript reference implementation with real audio source
 import argparse
 import asyncio
 import logging
-from typing import cast
+from typing import TYPE_CHECKING, Callable, cast
 
 import reactivex as rx
 from reactivex import operators as ops
 from reactivex.scheduler.eventloop import AsyncIOScheduler
 from reactivex.subject import Subject
 
-from .audio_source import AudioConfig, AudioSource
-from .common import AudioChunk, CancelEvent, Config, ControlEvent, KeyPressEvent, RecordingState
-from .transcription_service import TranscriptionService
-
-# Active transcription sessions tracking
-active_sessions = {}
+from .common import (
+  AudioChunk,
+  AudioConfig,
+  CancelEvent,
+  Config,
+  ControlEvent,
+  KeyPressEvent,
+  RecordingState,
+  TranscriptUpdate,
+)
+from .send_queue import OVERFLOW_POLICIES, SessionSendQueue
+from .session_manager import ManagedSession, SessionManager
+from .telemetry import RESPONSE_BUCKETS_MS, metrics
+
+if TYPE_CHECKING:
+  # Imported where they're used: the audio stack pulls in numpy and the wyoming client
+  # isn't needed until the first recording
+  from .audio_source import AudioSource
+  from .transcription_service import TranscriptionService
 
 
 class MockDBusService:
@@ -27,6 +40,10 @@ class MockDBusService:
     """Simulate publishing transcription via D-Bus"""
     print(f"📢 D-Bus: {text}")
 
+  def publish_partial_transcription(self, recording_id: float, text: str):
+    """Simulate publishing interim transcription text via D-Bus"""
+    print(f"📢 D-Bus: … {text}")
+
   def publish_cancel(self, recording_id: float):
     """Simulate publishing cancel message via D-Bus"""
     print(f"📢 D-Bus: Cancelled recording {recording_id}")
@@ -62,11 +79,27 @@ key_press_events = Subject()
 audio_chunks = Subject()
 
 
+def create_audio_config(audio_rate: int = 16000) -> AudioConfig:
+  """Build the capture configuration from the global config"""
+  native_rate = cast(Config, config).native_rate_capture
+  return AudioConfig(
+    device_patterns=cast(Config, config).audio_device_patterns,
+    channels=cast(Config, config).capture_channels if native_rate else 1,
+    samplerate=audio_rate,
+    resample_to=audio_rate if native_rate else None,
+    blocksize=audio_rate * cast(Config, config).capture_block_ms // 1000,
+    delivery="push",  # Callback wakes the loop as soon as a block arrives
+    keep_stream_open=cast(Config, config).warm_stream,
+    preroll_ms=cast(Config, config).preroll_ms,
+    ring_buffer_ms=cast(Config, config).ring_buffer_ms or None,
+  )
+
+
 def create_pipeline(
   scheduler: AsyncIOScheduler,
-  transcription_service: TranscriptionService,
+  transcription_service: "TranscriptionService",
   key_events_source=None,
-  audio_source_instance: AudioSource | None = None,
+  audio_source_instance: "AudioSource | None" = None,
   use_real_audio: bool = True,
 ):
   """
@@ -82,20 +115,16 @@ def create_pipeline(
 
   # Use provided sources or fall back to global subjects for testing
   key_source = key_events_source if key_events_source is not None else key_press_events
+  audio_rate = 16000  # Whisper uses 16kHz internally
 
   # Audio source setup
   if use_real_audio:
     if audio_source_instance is None:
+      from .audio_source import AudioSource
+
       logger.info("Creating default AudioSource instance")
 
-      audio_config = AudioConfig(
-        # device = find_default_audio_device(),
-        channels=1,
-        samplerate=16000,
-        blocksize=16000,  # 1 second of audio at 16kHz
-        chunk_poll_interval_ms=20,  # Poll every 20ms for responsive audio
-      )
-      audio_source_instance = AudioSource(audio_config, scheduler)
+      audio_source_instance = AudioSource(create_audio_config(audio_rate), scheduler)
 
     audio_source = audio_source_instance.create_audio_observable().pipe(ops.share())
     logger.info("Using real audio source")
@@ -174,7 +203,10 @@ def create_pipeline(
         if chunk.timestamp_delta >= cast(Config, config).minimum_recording_ms:
           # Release buffer
           logger.info(f"📤 Releasing buffer: {len(buffer)} chunks for transcription")
-          trimmed_buffer = trim_audio_chunks(buffer, cast(Config, config).trim_duration_ms)
+          if cast(Config, config).trim_mode == "sample":
+            trimmed_buffer = buffer  # Already trimmed to the sample
+          else:
+            trimmed_buffer = trim_audio_chunks(buffer, cast(Config, config).trim_duration_ms)
           buffer_released = True
 
           # Emit buffer release event
@@ -206,11 +238,7 @@ def create_pipeline(
           }
         )
 
-    return audio_source.pipe(
-      ops.do_action(
-        lambda chunk: logger.info(f"🎵 Audio chunk: {chunk.timestamp_delta:.0f}ms, {len(chunk.data)} bytes")
-      ),
-      ops.flat_map(process_chunk),
+    recording_chunks = audio_source.pipe(
       ops.take_until(
         recording_state.pipe(
           ops.filter(
@@ -221,17 +249,165 @@ def create_pipeline(
       ),
     )
 
+    if cast(Config, config).trim_mode == "sample":
+      from .audio_processing import trim_audio_samples
+
+      recording_chunks = recording_chunks.pipe(
+        trim_audio_samples(
+          cast(Config, config).trim_duration_ms, cast(Config, config).trim_tail_ms, rate=audio_rate
+        )
+      )
+
+    # Hold the audio back until something speech-like turns up, so silent recordings send nothing
+    level_events = rx.empty()
+    if cast(Config, config).skip_silent_recordings:
+      from .audio_processing import SilenceGate, audio_stage
+
+      gate = SilenceGate(cast(Config, config).silence_rms_db, cast(Config, config).silence_peak_db)
+      recording_chunks = recording_chunks.pipe(audio_stage(lambda: gate))
+      level_events = rx.defer(
+        lambda _: rx.just(
+          {
+            "type": "level_summary",
+            "speech_like": gate.is_open,
+            "max_rms_db": gate.max_rms_db,
+            "max_peak_db": gate.max_peak_db,
+            "recording_id": recording_start_time,
+          }
+        )
+      )
+
+    # Stop streaming once the speaker has gone quiet, so the server can start transcribing
+    endpoint_events = rx.empty()
+    if cast(Config, config).endpoint_silence_ms > 0:
+      from .audio_processing import Endpointer
+
+      endpointer = Endpointer(
+        cast(Config, config).endpoint_silence_ms,
+        rate=audio_rate,
+        threshold_db=cast(Config, config).vad_threshold_db,
+      )
+      endpoint: list[AudioChunk] = []
+
+      def before_endpoint(chunk: AudioChunk) -> bool:
+        at_endpoint = endpointer.update(chunk)
+        # Never cut a recording short of the minimum, its buffer hasn't been released yet
+        if at_endpoint and chunk.timestamp_delta >= cast(Config, config).minimum_recording_ms:
+          endpoint.append(chunk)
+          return False
+        return True
+
+      recording_chunks = recording_chunks.pipe(ops.take_while(before_endpoint))
+      endpoint_events = rx.defer(
+        lambda _: rx.from_(
+          [
+            {
+              "type": "endpoint",
+              "timestamp_delta": chunk.timestamp_delta,
+              "speech_ms": endpointer.speech_ms,
+              "recording_id": recording_start_time,
+            }
+            for chunk in endpoint
+          ]
+        )
+      )
+
+    # Leave leading, trailing and mid-recording silence out of the upload
+    summary_events = rx.empty()
+    if cast(Config, config).vad_enabled:
+      from .audio_processing import VoiceActivityDetector, audio_stage
+
+      vad = VoiceActivityDetector(
+        rate=audio_rate,
+        threshold_db=cast(Config, config).vad_threshold_db,
+        hangover_ms=cast(Config, config).vad_hangover_ms,
+        padding_ms=cast(Config, config).vad_padding_ms,
+      )
+      recording_chunks = recording_chunks.pipe(audio_stage(lambda: vad))
+
+      # Once the recording ends, report how much audio the detector left out
+      summary_events = rx.defer(
+        lambda _: rx.just(
+          {
+            "type": "vad_summary",
+            "kept_ms": vad.kept_ms,
+            "dropped_ms": vad.dropped_ms,
+            "recording_id": recording_start_time,
+          }
+        )
+      )
+
+    # Small capture blocks keep latency down; regroup them so each network event is worthwhile
+    if cast(Config, config).network_frame_ms > 0:
+      from .audio_processing import reframe_audio_chunks
+
+      recording_chunks = recording_chunks.pipe(
+        reframe_audio_chunks(cast(Config, config).network_frame_ms, rate=audio_rate)
+      )
+
+    transcription_events = recording_chunks.pipe(
+      ops.do_action(
+        lambda chunk: logger.info(f"🎵 Audio chunk: {chunk.timestamp_delta:.0f}ms, {len(chunk.data)} bytes")
+      ),
+      ops.flat_map(process_chunk),
+    )
+
+    # Cut long recordings at pauses, so each window can be transcribed while the next is recorded
+    if cast(Config, config).segment_max_ms > 0:
+      from .audio_processing import Segmenter
+
+      segmenter = Segmenter(
+        cast(Config, config).segment_max_ms,
+        min_segment_ms=cast(Config, config).segment_min_ms,
+        pause_ms=cast(Config, config).segment_pause_ms,
+        rate=audio_rate,
+        threshold_db=cast(Config, config).vad_threshold_db,
+      )
+
+      def mark_segments(event: dict):
+        chunks = event["chunks"] if event["type"] == "buffer_release" else [event["chunk"]]
+        # A buffer release is far shorter than a window, so it holds one cut at most
+        closes = [segmenter.update(chunk) for chunk in chunks]
+        if not any(closes):
+          return rx.just(event)
+        return rx.from_(
+          [
+            event,
+            {
+              "type": "segment_boundary",
+              "segment": segmenter.segments,
+              "timestamp_delta": chunks[-1].timestamp_delta,
+              "recording_id": recording_start_time,
+            },
+          ]
+        )
+
+      transcription_events = transcription_events.pipe(ops.flat_map(mark_segments))
+
+    # Last of all, once every stage has flushed what it was holding back
+    end_events = rx.just({"type": "recording_end", "recording_id": recording_start_time})
+
+    return transcription_events.pipe(ops.concat(summary_events, level_events, endpoint_events, end_events))
+
   transcription_stream = recording_state.pipe(
     ops.filter(lambda state: cast(RecordingState, state)["is_recording"]),
     ops.flat_map(lambda state: create_transcription_stream(cast(RecordingState, state)["start_time_delta"])),
     ops.share(),
   )
 
+  # Partial and final transcripts (TranscriptUpdate), pushed by the sessions as the server sends them
+  transcripts = Subject()
+
+  # Every recording's transcription session, from key press to transcript
+  sessions = SessionManager(cast(Config, config).max_sessions)
+
   return {
     "control_events": control_events,
     "recording_state": recording_state,
     "cancel_events": cancel_events,
     "transcription_stream": transcription_stream,
+    "transcripts": transcripts,
+    "sessions": sessions,
     "audio_source_instance": audio_source_instance if use_real_audio else None,
   }
 
@@ -240,9 +416,41 @@ async def async_main(
   use_real_audio: bool = False,
   use_keyboard_bridge: bool = False,
   wav_output_path: str | None = None,
+  archive_format: str = "wav",
   wyoming_server: str = "localhost:10300",
+  wyoming_pool_size: int = 1,
+  wyoming_routing: str = "least_outstanding",
+  hedge_quantile: float = 0.0,
+  fast_chunk_encoder: bool = False,
+  warm_stream: bool = False,
+  preroll_ms: int = 300,
+  ring_buffer_ms: int = 0,
+  capture_block_ms: int = 1000,
+  network_frame_ms: int = 0,
+  native_rate_capture: bool = False,
+  capture_channels: int = 1,
+  audio_device_patterns: tuple[str, ...] = (),
+  audio_file: str | None = None,
+  synthetic_audio: str | None = None,
+  audio_speed: float | None = 1.0,
+  trim_mode: str = "chunk",
+  trim_tail_ms: int = 0,
+  vad: bool = False,
+  vad_padding_ms: int = 200,
+  vad_hangover_ms: int = 300,
+  skip_silent: bool = False,
+  endpoint_silence_ms: int = 0,
+  segment_max_ms: int = 0,
+  send_queue_depth: int = 64,
+  send_queue_overflow: str = "spill",
+  max_sessions: int = 4,
+  on_ready: Callable[[], None] | None = None,
 ):
-  """Main function to run the pipeline"""
+  """
+  Main function to run the pipeline
+
+  `on_ready` is called once the pipeline is listening for key presses.
+  """
   # Set up logging
   logging.basicConfig(
     level=logging.INFO,
@@ -254,9 +462,38 @@ async def async_main(
   global config
   config.save_wav_files = wav_output_path is not None
   config.wav_output_path = wav_output_path
+  config.archive_format = archive_format
   config.wyoming_server_address = wyoming_server
+  config.wyoming_pool_size = wyoming_pool_size
+  config.wyoming_routing = wyoming_routing
+  config.hedge_quantile = hedge_quantile
+  config.fast_chunk_encoder = fast_chunk_encoder
+  config.warm_stream = warm_stream
+  config.preroll_ms = preroll_ms
+  config.ring_buffer_ms = ring_buffer_ms
+  config.capture_block_ms = capture_block_ms
+  config.network_frame_ms = network_frame_ms
+  config.native_rate_capture = native_rate_capture
+  config.capture_channels = capture_channels
+  config.audio_device_patterns = audio_device_patterns
+  config.trim_mode = trim_mode
+  config.trim_tail_ms = trim_tail_ms
+  config.vad_enabled = vad
+  config.vad_padding_ms = vad_padding_ms
+  config.vad_hangover_ms = vad_hangover_ms
+  config.skip_silent_recordings = skip_silent
+  config.endpoint_silence_ms = endpoint_silence_ms
+  config.segment_max_ms = segment_max_ms
+  config.send_queue_depth = send_queue_depth
+  config.send_queue_overflow = send_queue_overflow
+  config.max_sessions = max_sessions
+  if warm_stream:
+    # The pre-roll is the start of the recording, so trimming it away would defeat the point
+    config.trim_duration_ms = 0
 
   # Initialize transcription service
+  from .transcription_service import TranscriptionService
+
   transcription_service = TranscriptionService(
     # TODO(shyndman): These should be config supplied
     channels=1,
@@ -265,6 +502,15 @@ async def async_main(
     wyoming_server_address=wyoming_server,
     save_wav_files=config.save_wav_files,
     wav_output_path=wav_output_path,
+    archive_format=config.archive_format,
+    connect_timeout=config.wyoming_connect_timeout_s,
+    write_timeout=config.wyoming_write_timeout_s,
+    read_timeout=config.wyoming_read_timeout_s,
+    pool_size=config.wyoming_pool_size,
+    routing=config.wyoming_routing,
+    hedge_quantile=config.hedge_quantile or None,
+    fast_encoder=config.fast_chunk_encoder,
+    max_audio_memory=int(config.session_audio_memory_mb * 1024 * 1024),
   )
 
   loop = asyncio.get_event_loop()
@@ -298,11 +544,33 @@ async def async_main(
       logger.warning(f"❌ Keyboard bridge not available: {e}")
       logger.info("💡 Falling back to simulated keyboard events")
 
+  # Replace the microphone with a file or generated signal, e.g. for headless load tests
+  audio_source_instance: "AudioSource | None" = None
+  if use_real_audio and (audio_file or synthetic_audio):
+    from .audio_backends import FileAudioSource, SyntheticAudioSource
+
+    audio_config = create_audio_config()
+    if audio_file:
+      audio_source_instance = FileAudioSource(audio_file, audio_config, scheduler, speed=audio_speed)
+      if audio_source_instance.native_samplerate != audio_config.samplerate:
+        audio_config.resample_to = int(audio_config.samplerate)
+    else:
+      audio_source_instance = SyntheticAudioSource(
+        cast(str, synthetic_audio), audio_config, scheduler, speed=audio_speed
+      )
+
   # Create pipeline
   pipeline = create_pipeline(
-    scheduler, transcription_service, key_events_source=key_events_source, use_real_audio=use_real_audio
+    scheduler,
+    transcription_service,
+    key_events_source=key_events_source,
+    audio_source_instance=audio_source_instance,
+    use_real_audio=use_real_audio,
   )
-  audio_source_instance = cast(AudioSource, pipeline["audio_source_instance"])
+  audio_source_instance = cast("AudioSource", pipeline["audio_source_instance"])
+  if audio_source_instance:
+    # Opens the microphone up front in warm-stream mode, no-op otherwise
+    audio_source_instance.warm_up()
 
   # Subscribe to control events to control audio recording
   def on_control_event(event: ControlEvent):
@@ -317,87 +585,234 @@ async def async_main(
 
   pipeline["control_events"].subscribe(on_control_event, scheduler=scheduler)
 
+  # Everything sent on a recording's current session goes through its send queue, starting with
+  # the session start, so chunks can't overtake each other, or the AudioStop, while a send is waiting
+  sessions = cast(SessionManager, pipeline["sessions"])
+
+  def open_session(managed: ManagedSession, segment: int = 0) -> None:
+    """Create the session for a recording, or for its next window, and queue its start"""
+    name = f"{managed.id}-{segment}" if segment else str(managed.id)
+    managed.segment = segment
+
+    def on_session_transcript(text: str, is_final: bool) -> None:
+      if not is_final:
+        managed.partial_received()
+      pipeline["transcripts"].on_next(
+        TranscriptUpdate(recording_id=managed.recording_id, text=text, is_final=is_final, segment=segment)
+      )
+
+    # Create the session now so chunks and the key release always find it; it connects in the background
+    logger.info(f"🎤 Creating new transcription session {name} (recording {managed.recording_id})")
+    session = transcription_service.create_async_session(name, on_transcript=on_session_transcript)
+
+    async def start_new_session():
+      try:
+        await session.begin_session()
+        managed.connected()
+        logger.info(f"✅ Transcription session {name} started")
+      except Exception:
+        logger.exception(f"❌ Error starting transcription session {name}")
+
+    managed.queue = SessionSendQueue(
+      session,
+      max_depth=config.send_queue_depth,
+      overflow=config.send_queue_overflow,
+      begin=start_new_session,
+    )
+
+  def end_recording(managed: ManagedSession, cancelled: bool = False) -> None:
+    """Queue the end of a recording's session behind its last audio, or cancel it straight away"""
+    queue = cast(SessionSendQueue, managed.queue)
+    session = queue.session  # The last window's, if the recording was segmented
+    skipped = False
+
+    async def end_streaming_session():
+      nonlocal skipped
+      try:
+        if not cancelled:
+          last_result = None
+          if config.skip_silent_recordings and not session.chunks_sent:
+            # Too short, or nothing speech-like in it; don't make the server transcribe silence
+            logger.info(f"🔕 Nothing to transcribe, cancelling session {managed.id} locally")
+            await session.cancel_session()
+            if not managed.segment_results:
+              metrics.counter("transcription.sessions_skipped").inc()
+              skipped = True
+              return
+          else:
+            logger.info(f"⏹️ Ending transcription session {managed.id}")
+            metrics.counter("transcription.sessions_sent").inc()
+            last_result = await (managed.early_result or session.end_session())
+
+          result = last_result
+          if managed.segment_results:
+            # The earlier windows have been transcribing all along; join them in order
+            texts = [await segment for segment in managed.segment_results] + [last_result]
+            result = " ".join(text for text in texts if text)
+            logger.info(f"🧩 Joined {len(texts)} windows of session {managed.id}")
+
+          if result:
+            logger.info(f"📝 Transcription result: {result}")
+            dbus_service.publish_transcription(result)
+          else:
+            logger.warning("❌ No transcription result")
+        else:
+          logger.info(f"❌ Cancelling transcription session {managed.id}")
+          for pending in [managed.early_result, *managed.segment_results]:
+            if pending:
+              pending.cancel()
+          await session.cancel_session()
+          dbus_service.publish_cancel(managed.recording_id)
+      except Exception:
+        logger.exception(f"❌ Error ending transcription session {managed.id}")
+      finally:
+        sessions.close(managed, cancelled=cancelled, skipped=skipped)
+
+    if cancelled:
+      # Nothing still queued matters; don't wait for it to be sent
+      queue.cancel()
+      asyncio.ensure_future(end_streaming_session())
+    else:
+      # Queued behind everything already sent to the session
+      queue.call(end_streaming_session)
+      queue.close()
+
   # Subscribe to recording state changes for debugging and session management
   def on_recording_state_change(state: RecordingState):
     logger.info(f"📊 State: {state}")
 
     # Start transcription session immediately when recording begins
     if state["is_recording"] and state["action"] == "play":
-      session_id = str(state.get("start_time_delta"))
-
-      # Create and start new transcription session
-      async def start_new_session():
-        try:
-          logger.info(f"🎤 Creating new transcription session {session_id}")
-          session = transcription_service.create_session(session_id)
-          active_sessions[session_id] = session
-          logger.info(f"📝 Session {session_id} added to active_sessions. Total: {len(active_sessions)}")
-          session.begin_session()
-          logger.info(f"✅ Transcription session {session_id} started")
-        except Exception:
-          logger.exception(f"❌ Error starting transcription session {session_id}")
-
-      # Schedule the session start
-      asyncio.create_task(start_new_session())
+      managed = sessions.open(cast(float, state["start_time_delta"]))
+      if managed:
+        open_session(managed)
+        logger.info(f"📝 Session {managed.id} opened. Total: {len(sessions)}")
+      else:
+        # Already logged by the session manager; let the user know this one won't be transcribed
+        dbus_service.publish_cancel(cast(float, state["start_time_delta"]))
 
     # End transcription session when recording stops
     elif not state["is_recording"] and state["action"] in ["stop", "cancel"]:
-      session_id = str(state.get("start_time_delta"))
-      if session_id in active_sessions:
-        session = active_sessions[session_id]
+      managed = sessions.for_recording(state.get("start_time_delta"))
+      if managed:
+        if state["action"] == "cancel":
+          end_recording(managed, cancelled=True)
+        else:
+          managed.finishing()
+          managed.stopped = True
+          if managed.endpoint_ms is not None:
+            # Whatever was said after the endpoint, while the key was still held, wasn't sent
+            recorded_ms = cast(float, state["end_time_delta"]) - cast(float, state["start_time_delta"])
+            left_out_ms = max(recorded_ms - managed.endpoint_ms, 0.0)
+            metrics.histogram("transcription.after_endpoint_ms", RESPONSE_BUCKETS_MS).observe(left_out_ms)
+            logger.info(f"🔚 Left out {left_out_ms:.0f}ms recorded after the endpoint (session {managed.id})")
+          # Stages may still flush audio as the recording's stream completes; end the session
+          # once that has been queued too
+          if managed.audio_ended:
+            end_recording(managed)
 
-        async def end_streaming_session():
-          try:
-            if state["action"] == "stop":
-              logger.info(f"⏹️ Ending transcription session {session_id}")
-              result = session.end_session()
-              if result:
-                logger.info(f"📝 Transcription result: {result}")
-                dbus_service.publish_transcription(result)
-              else:
-                logger.warning("❌ No transcription result")
-            else:  # cancel
-              logger.info(f"❌ Cancelling transcription session {session_id}")
-              session.cancel_session()
-              dbus_service.publish_cancel(float(session_id))
-          except Exception:
-            logger.exception(f"❌ Error ending transcription session {session_id}")
-          finally:
-            # Clean up session
-            if session_id in active_sessions:
-              del active_sessions[session_id]
+  pipeline["recording_state"].subscribe(on_recording_state_change, scheduler=scheduler)
 
-        # Schedule the session end
-        asyncio.create_task(end_streaming_session())
+  # Show interim text while the user is still talking; final transcripts are published when the session ends
+  def on_transcript(update: TranscriptUpdate):
+    if not update.is_final:
+      logger.info(f"💬 Partial transcript (recording {update.recording_id}): {update.text}")
+      dbus_service.publish_partial_transcription(update.recording_id, update.text)
 
-  pipeline["recording_state"].subscribe(on_recording_state_change, scheduler=scheduler)
+  pipeline["transcripts"].subscribe(on_transcript, scheduler=scheduler)
 
   # Subscribe to transcription stream
   def on_transcription_event(event):
+    managed = sessions.for_recording(event["recording_id"])
+    queue = managed.queue if managed else None
+
     if event["type"] == "buffer_release":
       logger.info(
         f"📤 Buffer released to transcription: {len(event['chunks'])} chunks "
         f"(recording {event['recording_id']})"
       )
 
-      # Send buffered chunks to existing session
-      session_id = str(event["recording_id"])
-      if session_id in active_sessions:
-        session = active_sessions[session_id]
+      # Queue the buffered chunks on the existing session, ahead of anything streamed after them
+      if managed and queue:
+        managed.released()
+        for chunk in event["chunks"]:
+          queue.put_nowait(chunk)
+      elif not sessions.rejected(event["recording_id"]):
+        logger.warning(f"⚠️ No active session found for recording {event['recording_id']}")
+
+    elif event["type"] == "vad_summary":
+      total_ms = event["kept_ms"] + event["dropped_ms"]
+      logger.info(
+        f"🔇 Voice activity detection left out {event['dropped_ms']:.0f}ms of "
+        f"{total_ms:.0f}ms (recording {event['recording_id']})"
+      )
+
+    elif event["type"] == "level_summary":
+      logger.info(
+        f"🔊 Recording {event['recording_id']} peaked at {event['max_rms_db']:.1f}dBFS RMS, "
+        f"{event['max_peak_db']:.1f}dBFS peak: "
+        f"{'speech-like' if event['speech_like'] else 'nothing speech-like captured'}"
+      )
+
+    elif event["type"] == "endpoint":
+      logger.info(
+        f"🔚 Trailing silence at {event['timestamp_delta']:.0f}ms after "
+        f"{event['speech_ms']:.0f}ms of speech, finishing audio (recording {event['recording_id']})"
+      )
+
+      if managed and queue:
+        session = queue.session
+        managed.endpoint_ms = event["timestamp_delta"]
+        managed.finishing()
 
-        # Send all buffered chunks to the existing session
-        async def send_buffered_chunks():
+        # Queued behind any buffered chunks still being sent
+        async def finish_session_audio():
           try:
-            for chunk in event["chunks"]:
-              session.add_chunk(chunk)
-            logger.info(f"📤 Sent {len(event['chunks'])} buffered chunks to session {session_id}")
+            await session.finish_audio()
+            # Wait for the transcript in the background; the key release picks it up
+            managed.early_result = asyncio.ensure_future(session.end_session())
           except Exception:
-            logger.exception(f"❌ Error sending buffered chunks to session {session_id}")
+            logger.exception(f"❌ Error finishing audio for session {managed.id}")
 
-        # Schedule the chunk sending
-        asyncio.create_task(send_buffered_chunks())
-      else:
-        logger.warning(f"⚠️ No active session found for recording {session_id}")
+        queue.call(finish_session_audio)
+
+    elif event["type"] == "segment_boundary":
+      if managed and queue:
+        session = queue.session
+        logger.info(
+          f"✂️ Closing window {event['segment']} at {event['timestamp_delta']:.0f}ms "
+          f"(recording {event['recording_id']})"
+        )
+
+        # Queued behind the window's last chunks; the next window's chunks go to a new session
+        async def close_segment():
+          try:
+            await session.finish_audio()
+          except Exception:
+            logger.exception(f"❌ Error finishing audio for session {session.session_id}")
+          # Transcribed while the next window is recorded
+          return await session.end_session()
+
+        def on_segment_done(result: asyncio.Future, queue: SessionSendQueue = queue) -> None:
+          if result.cancelled():
+            # The recording was cancelled; drop whatever this window still had to send
+            queue.cancel()
+            asyncio.ensure_future(queue.session.cancel_session())
+
+        # Registered now rather than when the window's queue gets to it, so the key release
+        # always finds it and joins it in order
+        segment_result = queue.call(close_segment)
+        segment_result.add_done_callback(on_segment_done)
+        managed.segment_results.append(segment_result)
+        queue.close()
+        open_session(managed, event["segment"])
+
+    elif event["type"] == "recording_end":
+      # All of the recording's audio has been queued; the session ends once the key is released
+      if managed:
+        managed.audio_ended = True
+        if managed.stopped:
+          end_recording(managed)
 
     elif event["type"] == "stream_chunk":
       logger.debug(
@@ -405,18 +820,11 @@ async def async_main(
         f"(recording {event['recording_id']})"
       )
 
-      # Add chunk to active session if exists
-      session_id = str(event["recording_id"])
-      if session_id in active_sessions:
-        try:
-          active_sessions[session_id].add_chunk(event["chunk"])
-          logger.info(
-            f"📡 Sent streaming chunk to session {session_id}: {event['chunk'].timestamp_delta:.0f}ms"
-          )
-        except Exception:
-          logger.exception(f"❌ Error adding chunk to session {session_id}")
-      else:
-        logger.warning(f"⚠️ No active session found for streaming chunk (recording {session_id})")
+      # Queue the chunk on the active session if it exists
+      if queue:
+        queue.put_nowait(event["chunk"])
+      elif not sessions.rejected(event["recording_id"]):
+        logger.warning(f"⚠️ No active session found for streaming chunk (recording {event['recording_id']})")
 
   pipeline["transcription_stream"].subscribe(
     on_transcription_event,
@@ -425,6 +833,15 @@ async def async_main(
   )
 
   print(f"🚀 Pipeline started with {'real' if use_real_audio else 'mock'} audio source")
+  if on_ready:
+    on_ready()
+
+  if audio_source_instance and not warm_stream:
+    # Load PortAudio and find the device now that we're ready, rather than on the first key press
+    loop.run_in_executor(None, audio_source_instance.prepare)
+
+  # Likewise connect to the Wyoming server ahead of the first recording
+  await transcription_service.start()
 
   try:
     if use_real_audio or use_keyboard_bridge:
@@ -470,6 +887,7 @@ async def async_main(
       keyboard_bridge.stop_monitoring()
     if audio_source_instance:
       audio_source_instance.cleanup()
+    await transcription_service.close()
 
 
 def parse_args():
@@ -487,11 +905,171 @@ def parse_args():
     metavar="PATH",
     help="Path to save recorded audio as WAV files",
   )
+  parser.add_argument(
+    "--archive-format",
+    choices=["wav", "flac"],
+    default="wav",
+    help="Format of the files saved with --save-wav (default: wav)",
+  )
   parser.add_argument(
     "--wyoming-server",
     type=str,
     default="localhost:10300",
-    help="Wyoming ASR server address (default: localhost:10300)",
+    help="Wyoming ASR server address, or several separated by commas (default: localhost:10300)",
+  )
+  parser.add_argument(
+    "--wyoming-routing",
+    choices=["least_outstanding", "latency"],
+    default="least_outstanding",
+    help="How sessions are spread over several Wyoming servers (default: least_outstanding)",
+  )
+  parser.add_argument(
+    "--hedge-quantile",
+    type=float,
+    default=0.0,
+    metavar="Q",
+    help="Replay a recording to a second server once its transcript is later than this quantile "
+    "of the first server's response times, e.g. 0.95 (default: 0, off)",
+  )
+  parser.add_argument(
+    "--fast-chunk-encoder",
+    action="store_true",
+    help="Send audio chunks with pre-serialized headers and vectored writes",
+  )
+  parser.add_argument(
+    "--wyoming-pool-size",
+    type=int,
+    default=1,
+    help="Connections to the Wyoming server kept open for upcoming recordings; 0 disables (default: 1)",
+  )
+  parser.add_argument(
+    "--warm-stream",
+    action="store_true",
+    help="Keep the microphone stream open between recordings and prepend pre-roll audio",
+  )
+  parser.add_argument(
+    "--preroll-ms",
+    type=int,
+    default=300,
+    help="Pre-roll kept from before the key press in warm-stream mode (default: 300)",
+  )
+  parser.add_argument(
+    "--ring-buffer-ms",
+    type=int,
+    default=0,
+    help="Capture into a preallocated ring buffer this long instead of a queue; 0 disables (default: 0)",
+  )
+  parser.add_argument(
+    "--capture-block-ms",
+    type=int,
+    default=1000,
+    help="Audio device block size in milliseconds (default: 1000)",
+  )
+  parser.add_argument(
+    "--network-frame-ms",
+    type=int,
+    default=0,
+    help="Regroup captured blocks into frames of this length before sending (default: 0, off)",
+  )
+  parser.add_argument(
+    "--native-rate",
+    action="store_true",
+    help="Capture at the device's native sample rate and resample to 16kHz",
+  )
+  parser.add_argument(
+    "--capture-channels",
+    type=int,
+    default=1,
+    help="Channels to capture in native-rate mode, downmixed to mono (default: 1)",
+  )
+  parser.add_argument(
+    "--device",
+    dest="devices",
+    action="append",
+    default=[],
+    metavar="PATTERN",
+    help="Regex matched against input device names; repeat to list devices in order of preference",
+  )
+  parser.add_argument(
+    "--audio-file",
+    type=str,
+    metavar="PATH",
+    help="Replay a WAV or FLAC file instead of capturing from the microphone",
+  )
+  parser.add_argument(
+    "--synthetic-audio",
+    choices=["speech", "tone", "noise", "silence"],
+    help="Capture a generated test signal instead of the microphone",
+  )
+  parser.add_argument(
+    "--audio-speed",
+    type=float,
+    default=1.0,
+    help="Pacing of --audio-file/--synthetic-audio relative to real time; 0 for as fast as possible",
+  )
+  parser.add_argument(
+    "--trim-mode",
+    choices=["chunk", "sample"],
+    default="chunk",
+    help="Trim the start of recordings by whole chunks or at the exact sample (default: chunk)",
+  )
+  parser.add_argument(
+    "--trim-tail-ms",
+    type=int,
+    default=0,
+    help="Audio cut from the end of each recording in sample trim mode (default: 0)",
+  )
+  parser.add_argument(
+    "--vad",
+    action="store_true",
+    help="Drop silence before and between utterances instead of sending it for transcription",
+  )
+  parser.add_argument(
+    "--vad-padding-ms",
+    type=int,
+    default=200,
+    help="Audio kept on either side of detected speech (default: 200)",
+  )
+  parser.add_argument(
+    "--vad-hangover-ms",
+    type=int,
+    default=300,
+    help="How long detected speech keeps the detector open after it stops (default: 300)",
+  )
+  parser.add_argument(
+    "--skip-silent",
+    action="store_true",
+    help="Cancel recordings with nothing speech-like in them locally instead of transcribing them",
+  )
+  parser.add_argument(
+    "--endpoint-silence-ms",
+    type=int,
+    default=0,
+    help="Finish the recording's audio after this much trailing silence (default: 0, wait for the key)",
+  )
+  parser.add_argument(
+    "--segment-max-ms",
+    type=int,
+    default=0,
+    help="Cut recordings at pauses into windows this long at most, sent concurrently (default: 0, off)",
+  )
+  parser.add_argument(
+    "--send-queue-depth",
+    type=int,
+    default=64,
+    help="Chunks held in memory per session while waiting to be sent (default: 64)",
+  )
+  parser.add_argument(
+    "--send-queue-overflow",
+    choices=OVERFLOW_POLICIES,
+    default="spill",
+    help="What happens to chunks past the send queue depth (default: spill, to disk)",
+  )
+  parser.add_argument(
+    "--max-sessions",
+    type=int,
+    default=4,
+    help="Recordings transcribed at once; a recording started past this isn't transcribed (default: 4)",
   )
   return parser.parse_args()
 
@@ -504,7 +1082,34 @@ def main():
         use_real_audio=not args.mock_audio,
         use_keyboard_bridge=not args.no_keyboard,
         wav_output_path=args.save_wav,
+        archive_format=args.archive_format,
         wyoming_server=args.wyoming_server,
+        wyoming_pool_size=args.wyoming_pool_size,
+        wyoming_routing=args.wyoming_routing,
+        hedge_quantile=args.hedge_quantile,
+        fast_chunk_encoder=args.fast_chunk_encoder,
+        warm_stream=args.warm_stream,
+        preroll_ms=args.preroll_ms,
+        ring_buffer_ms=args.ring_buffer_ms,
+        capture_block_ms=args.capture_block_ms,
+        network_frame_ms=args.network_frame_ms,
+        native_rate_capture=args.native_rate,
+        capture_channels=args.capture_channels,
+        audio_device_patterns=tuple(args.devices),
+        audio_file=args.audio_file,
+        synthetic_audio=args.synthetic_audio,
+        audio_speed=args.audio_speed or None,
+        trim_mode=args.trim_mode,
+        trim_tail_ms=args.trim_tail_ms,
+        vad=args.vad,
+        vad_padding_ms=args.vad_padding_ms,
+        vad_hangover_ms=args.vad_hangover_ms,
+        skip_silent=args.skip_silent,
+        endpoint_silence_ms=args.endpoint_silence_ms,
+        segment_max_ms=args.segment_max_ms,
+        send_queue_depth=args.send_queue_depth,
+        send_queue_overflow=args.send_queue_overflow,
+        max_sessions=args.max_sessions,
       )
     )
   except KeyboardInterrupt:
@@ -0,0 +1,116 @@
+"""
+Preallocated single-producer/single-consumer ring buffer for audio frames.
+Lets the PortAudio callback hand samples to the event loop without allocating or locking.
+"""
+
+import numpy as np
+
+
+class AudioRingBuffer:
+  """
+  Fixed-size ring of audio frames shared between one producer and one consumer.
+
+  The producer (the PortAudio callback thread) only ever advances the write position and
+  the consumer (the event loop) only ever advances the read position. Both positions are
+  monotonically increasing frame counters, so each side can read the other's position
+  without a lock. Frames that don't fit are dropped rather than growing the buffer, which
+  puts a hard ceiling on the memory used by the capture path.
+  """
+
+  def __init__(self, capacity_frames: int, channels: int = 1, dtype: str = "int16"):
+    if capacity_frames <= 0:
+      raise ValueError(f"Ring buffer capacity must be positive, got {capacity_frames}")
+
+    self.capacity = capacity_frames
+    self.channels = channels
+    self.dtype = np.dtype(dtype)
+    self._buffer = np.zeros((capacity_frames, channels), dtype=self.dtype)
+    self._write_pos = 0
+    self._read_pos = 0
+    self.dropped_frames = 0
+
+  @property
+  def available(self) -> int:
+    """Number of frames written but not yet consumed"""
+    return self._write_pos - self._read_pos
+
+  @property
+  def free(self) -> int:
+    """Number of frames that can be written before the buffer is full"""
+    return self.capacity - self.available
+
+  def write(self, frames: np.ndarray) -> int:
+    """
+    Copy frames into the ring. Producer side only.
+
+    Args:
+        frames: Array of shape (n, channels) in the buffer's dtype
+
+    Returns:
+        Number of frames written. Frames that don't fit are dropped and counted.
+    """
+    count = min(len(frames), self.capacity - (self._write_pos - self._read_pos))
+    if count < len(frames):
+      self.dropped_frames += len(frames) - count
+    if count <= 0:
+      return 0
+
+    start = self._write_pos % self.capacity
+    first = min(count, self.capacity - start)
+    self._buffer[start : start + first] = frames[:first]
+    if first < count:
+      self._buffer[: count - first] = frames[first:count]
+
+    # Publish only after the samples are in place
+    self._write_pos += count
+    return count
+
+  def write_latest(self, frames: np.ndarray) -> None:
+    """
+    Copy frames into the ring, discarding the oldest frames to make room.
+
+    Moves the read position, so it's only safe when the producer is also the sole
+    consumer (e.g. a pre-roll buffer that's read from the audio thread).
+    """
+    if len(frames) >= self.capacity:
+      frames = frames[-self.capacity :]
+    overflow = len(frames) - self.free
+    if overflow > 0:
+      self._read_pos += overflow
+    self.write(frames)
+
+  def peek(self, max_frames: int | None = None) -> tuple[np.ndarray, ...]:
+    """
+    Return zero-copy views of the readable frames. Consumer side only.
+
+    Yields one view, or two when the readable region wraps around the end of the ring.
+    The views stay valid until `advance` is called for them.
+    """
+    count = self.available
+    if max_frames is not None:
+      count = min(count, max_frames)
+    if count <= 0:
+      return ()
+
+    start = self._read_pos % self.capacity
+    first = min(count, self.capacity - start)
+    if first == count:
+      return (self._buffer[start : start + count],)
+    return (self._buffer[start : start + first], self._buffer[: count - first])
+
+  def advance(self, frames: int) -> None:
+    """Mark frames as consumed, releasing their space to the producer. Consumer side only."""
+    self._read_pos += min(frames, self.available)
+
+  def read(self, max_frames: int | None = None) -> np.ndarray:
+    """Copy out and consume readable frames. Consumer side only."""
+    views = self.peek(max_frames)
+    if not views:
+      return np.empty((0, self.channels), dtype=self.dtype)
+    frames = views[0].copy() if len(views) == 1 else np.concatenate(views)
+    self.advance(len(frames))
+    return frames
+
+  def clear(self) -> None:
+    """Discard all readable frames. Consumer side only."""
+    self._read_pos = self._write_pos
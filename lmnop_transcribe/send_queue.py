@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Ordered delivery of a session's audio.
+Everything sent on a session — starting it, its chunks, finishing it — goes through one
+queue with a single writer task, so nothing can reach the server out of order.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+from .audio_store import SessionAudioStore
+from .common import AudioChunk
+from .telemetry import DEPTH_BUCKETS, metrics
+
+if TYPE_CHECKING:
+  from .transcription_service import AsyncStreamingTranscriptionSession
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("spill", "drop_oldest", "drop_newest")
+
+
+class SessionSendQueue:
+  """
+  Sends to one session, in the order things were queued, from a single writer task.
+
+  The session's start is always the first thing queued. At most `max_depth` chunks are held
+  in memory while they wait; past that, `overflow` decides what happens to the next one:
+  `spill` moves its audio to a disk-backed store, keeping everything in order; `drop_oldest`
+  and `drop_newest` lose audio but keep the queue short, for when staying live matters more.
+  Producers on the loop can `await put()` instead, which waits for room.
+
+  Once a chunk fails to send, the connection is taken to be gone: the chunks still waiting are
+  dropped rather than each waiting out the write timeout, and only queued calls still run.
+  `cancel()` drops everything at once, for when nothing queued matters any more.
+  """
+
+  def __init__(
+    self,
+    session: "AsyncStreamingTranscriptionSession",
+    max_depth: int = 64,
+    overflow: str = "spill",
+    begin: Callable[[], Awaitable] | None = None,
+    spill_memory_bytes: int = 0,
+  ):
+    if overflow not in OVERFLOW_POLICIES:
+      raise ValueError(f"Unknown overflow policy {overflow!r}, expected one of {OVERFLOW_POLICIES}")
+
+    self.session = session
+    self.max_depth = max(max_depth, 1)
+    self.overflow = overflow
+    self.spill_memory_bytes = spill_memory_bytes
+    self.depth = 0  # Chunks waiting in memory
+    self.dropped = 0
+    self.spilled = 0
+    self.failed = False  # A chunk failed to send; later chunks are dropped
+
+    # ("chunk", chunk) | ("spilled", index, timestamp_delta) | ("call", fn, future)
+    self._items: deque[tuple] = deque()
+    self._spill: SessionAudioStore | None = None
+    self._ready = asyncio.Event()
+    self._space = asyncio.Event()
+    self._space.set()
+    self._closed = False
+
+    self.begun = self.call(begin or session.begin_session)
+    self._writer = asyncio.create_task(self._run())
+
+  @property
+  def is_full(self) -> bool:
+    return self.depth >= self.max_depth
+
+  def put_nowait(self, chunk: AudioChunk) -> bool:
+    """Queue a chunk, applying the overflow policy if the queue is full; False if audio was dropped"""
+    if self._closed:
+      # Everything for the session should have been queued before it was closed
+      metrics.counter("send_queue.dropped").inc()
+      logger.warning(f"Session {self.session.session_id}: Send queue closed, dropping chunk")
+      return False
+
+    kept_all = True
+    if self.is_full:
+      if self.overflow == "spill":
+        self._spill_chunk(chunk)
+        return True
+      kept_all = self._dropped()
+      if self.overflow == "drop_newest":
+        return kept_all
+      oldest = next(item for item in self._items if item[0] == "chunk")
+      self._items.remove(oldest)
+      self.depth -= 1
+
+    self._items.append(("chunk", chunk))
+    self.depth += 1
+    if self.is_full:
+      self._space.clear()
+    metrics.histogram("send_queue.depth", DEPTH_BUCKETS).observe(self.depth)
+    self._ready.set()
+    return kept_all
+
+  async def put(self, chunk: AudioChunk) -> None:
+    """Queue a chunk, waiting while the queue is full"""
+    while self.is_full and not self._closed:
+      await self._space.wait()
+    self.put_nowait(chunk)
+
+  def call(self, fn: Callable[[], Awaitable]) -> asyncio.Future:
+    """Run `fn` once everything queued before it has been sent, returning its result"""
+    future = asyncio.get_running_loop().create_future()
+    if self._closed:
+      future.cancel()
+      return future
+    self._items.append(("call", fn, future))
+    self._ready.set()
+    return future
+
+  def close(self) -> None:
+    """Stop taking new work; the writer finishes what's queued, then exits"""
+    self._closed = True
+    self._ready.set()
+    self._space.set()
+
+  def cancel(self) -> None:
+    """Drop everything still queued and stop the writer, even mid-send; pending calls are cancelled"""
+    self.close()
+    for item in self._items:
+      if item[0] == "call":
+        item[2].cancel()
+    self._items.clear()
+    self.depth = 0
+    self._writer.cancel()
+    if self._spill is not None:
+      self._spill.close()
+
+  async def join(self) -> None:
+    """Wait for everything queued to be sent"""
+    self.close()
+    await self._writer
+
+  def _dropped(self) -> bool:
+    self.dropped += 1
+    metrics.counter("send_queue.dropped").inc()
+    if self.dropped == 1:
+      logger.warning(f"Session {self.session.session_id}: Send queue full, dropping audio")
+    return False
+
+  def _spill_chunk(self, chunk: AudioChunk) -> None:
+    if self._spill is None:
+      self._spill = SessionAudioStore(self.spill_memory_bytes)
+    self._spill.append(chunk.data)
+    self._items.append(("spilled", len(self._spill) - 1, chunk.timestamp_delta))
+    self.spilled += 1
+    metrics.counter("send_queue.spilled").inc()
+    self._ready.set()
+
+  async def _run(self) -> None:
+    while True:
+      while not self._items:
+        if self._closed:
+          if self._spill is not None:
+            self._spill.close()
+          return
+        self._ready.clear()
+        await self._ready.wait()
+
+      item = self._items.popleft()
+      if item[0] == "call":
+        await self._run_call(item[1], item[2])
+        continue
+
+      if item[0] == "chunk":
+        chunk = item[1]
+        self.depth -= 1
+        self._space.set()
+      else:
+        assert self._spill is not None
+        chunk = AudioChunk(data=self._spill[item[1]], timestamp_delta=item[2])
+
+      if self.failed:
+        self.dropped += 1
+        metrics.counter("send_queue.dropped").inc()
+        continue
+
+      try:
+        await self.session.add_chunk(chunk)
+      except Exception:
+        logger.exception(f"Error sending chunk to session {self.session.session_id}, dropping the rest")
+        self.failed = True
+
+  async def _run_call(self, fn: Callable[[], Awaitable], future: asyncio.Future) -> None:
+    try:
+      result: Any = await fn()
+    except asyncio.CancelledError:
+      future.cancel()
+      current = asyncio.current_task()
+      if current and current.cancelling():
+        raise
+    except Exception as e:
+      logger.exception(f"Error in queued call on session {self.session.session_id}")
+      if not future.done():
+        future.set_exception(e)
+        future.exception()  # Logged above; only raised for callers that await it
+    else:
+      if not future.done():
+        future.set_result(result)
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Lifecycle of the transcription sessions behind each recording.
+Every recording gets a ManagedSession that moves through an explicit set of states, and
+records when it entered each one, so overlapping and back-to-back recordings can be told
+apart and their latencies measured.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from itertools import count
+from typing import TYPE_CHECKING
+
+from .telemetry import RESPONSE_BUCKETS_MS, metrics
+
+if TYPE_CHECKING:
+  from .send_queue import SessionSendQueue
+  from .transcription_service import AsyncStreamingTranscriptionSession
+
+logger = logging.getLogger(__name__)
+
+SESSION_STATES = ("connecting", "buffering", "streaming", "finishing", "done", "skipped", "cancelled")
+
+# The states each state may move on to. Audio can be released while the connection is still
+# being made, and a recording can end at any point, so only the order is enforced.
+_TRANSITIONS = {
+  "connecting": ("buffering", "finishing", "cancelled"),
+  "buffering": ("streaming", "finishing", "cancelled"),
+  "streaming": ("finishing", "cancelled"),
+  "finishing": ("done", "skipped", "cancelled"),
+  "done": (),
+  "skipped": (),
+  "cancelled": (),
+}
+
+
+class ManagedSession:
+  """
+  One recording's trip from key press to transcript.
+
+  `connecting` until the server has accepted the session, then `buffering` until the recording
+  is long enough for its audio to be released, `streaming` while audio is sent, `finishing`
+  from the key release (or end-pointing) until the transcript arrives, and finally `done`,
+  `skipped` (nothing worth transcribing was recorded) or `cancelled`. A segmented recording
+  keeps its ManagedSession; `session` and `queue` are those of its current window.
+  """
+
+  def __init__(self, session_id: int, recording_id: float):
+    self.id = session_id
+    self.recording_id = recording_id
+    self.state = "connecting"
+    self.timestamps = {"connecting": time.perf_counter()}  # perf_counter() at entry to each state
+    self.first_partial_at: float | None = None
+
+    self.queue: "SessionSendQueue | None" = None
+    self.segment = 0
+    # Transcript already requested by end-pointing, awaited once the key is released
+    self.early_result: asyncio.Future | None = None
+    # Where in the recording end-pointing stopped the audio, in milliseconds
+    self.endpoint_ms: float | None = None
+    # Transcripts of the windows already cut from a segmented recording, in recording order
+    self.segment_results: list[asyncio.Future] = []
+    # The session is ended once the key has been released and the recording's last audio, stage
+    # flushes included, has been queued; either can happen first
+    self.stopped = False
+    self.audio_ended = False
+    self._released = False
+
+  @property
+  def session(self) -> "AsyncStreamingTranscriptionSession":
+    assert self.queue is not None, "Session has no send queue yet"
+    return self.queue.session
+
+  @property
+  def finished(self) -> bool:
+    return self.state in ("done", "skipped", "cancelled")
+
+  def connected(self) -> None:
+    """The server accepted the session"""
+    if self.state != "connecting":
+      return
+    self._advance("buffering")
+    if self._released:
+      self._advance("streaming")
+
+  def released(self) -> None:
+    """The recording's audio started flowing to the session"""
+    self._released = True
+    if self.state == "buffering":
+      self._advance("streaming")
+
+  def partial_received(self) -> None:
+    if self.first_partial_at is None:
+      self.first_partial_at = time.perf_counter()
+
+  def finishing(self) -> None:
+    """No more audio is coming; waiting for the transcript"""
+    if not self.finished and self.state != "finishing":
+      self._advance("finishing")
+
+  def end(self, cancelled: bool = False, skipped: bool = False) -> None:
+    """The transcript arrived, the recording had nothing to transcribe, or the session was abandoned"""
+    if self.finished:
+      return
+    if not cancelled:
+      self.finishing()
+    self._advance("cancelled" if cancelled else "skipped" if skipped else "done")
+
+  def _advance(self, state: str) -> None:
+    if state not in _TRANSITIONS[self.state]:
+      raise ValueError(f"Session {self.id} can't go from {self.state} to {state}")
+    logger.debug(f"Session {self.id}: {self.state} -> {state}")
+    self.state = state
+    self.timestamps[state] = time.perf_counter()
+
+  def elapsed_ms(self, start: str, end: str) -> float | None:
+    """Milliseconds between entering two states, None unless both were entered"""
+    if start not in self.timestamps or end not in self.timestamps:
+      return None
+    return (self.timestamps[end] - self.timestamps[start]) * 1000
+
+  def latencies(self) -> dict[str, float | None]:
+    """Where the time went, in milliseconds"""
+    ended = self.timestamps[self.state] if self.finished else None
+    opened = self.timestamps["connecting"]
+    return {
+      "connect_ms": self.elapsed_ms("connecting", "buffering"),
+      "first_partial_ms": (self.first_partial_at - opened) * 1000 if self.first_partial_at else None,
+      "finish_ms": self.elapsed_ms("finishing", "done"),
+      "total_ms": (ended - opened) * 1000 if ended else None,
+    }
+
+
+class SessionManager:
+  """
+  The live sessions, by id and by the recording they belong to.
+
+  At most `max_sessions` recordings are transcribed at once, counting those still waiting on
+  their transcript; a recording started past the limit gets no session, and is remembered as
+  rejected so its audio can be dropped without complaint. Sessions are dropped from the manager
+  once finished, and their latencies recorded in the metrics.
+  """
+
+  def __init__(self, max_sessions: int = 4):
+    self.max_sessions = max(max_sessions, 1)
+    self._sessions: dict[int, ManagedSession] = {}
+    self._by_recording: dict[float, int] = {}
+    self._ids = count(1)
+    # The latest recordings turned away; their audio keeps arriving until the key is released
+    self._rejected: deque[float] = deque(maxlen=16)
+
+  def __len__(self) -> int:
+    return len(self._sessions)
+
+  def __iter__(self):
+    return iter(list(self._sessions.values()))
+
+  def __contains__(self, session_id: int) -> bool:
+    return session_id in self._sessions
+
+  def get(self, session_id: int) -> ManagedSession | None:
+    return self._sessions.get(session_id)
+
+  def for_recording(self, recording_id: float | None) -> ManagedSession | None:
+    session_id = self._by_recording.get(recording_id)  # type: ignore[arg-type]
+    return self._sessions.get(session_id) if session_id is not None else None
+
+  def rejected(self, recording_id: float | None) -> bool:
+    """Whether the recording was turned away for being past the session limit"""
+    return recording_id in self._rejected
+
+  def open(self, recording_id: float) -> ManagedSession | None:
+    """Start tracking a recording, or return None if the session limit has been reached"""
+    if len(self._sessions) >= self.max_sessions:
+      metrics.counter("sessions.rejected").inc()
+      self._rejected.append(recording_id)
+      logger.warning(
+        f"{len(self._sessions)} sessions already in progress, not transcribing recording {recording_id}"
+      )
+      return None
+
+    managed = ManagedSession(next(self._ids), recording_id)
+    self._sessions[managed.id] = managed
+    self._by_recording[recording_id] = managed.id
+    metrics.counter("sessions.opened").inc()
+    return managed
+
+  def close(self, managed: ManagedSession, cancelled: bool = False, skipped: bool = False) -> None:
+    """Mark a session done, skipped or cancelled, record its latencies and stop tracking it"""
+    managed.end(cancelled, skipped)
+    if self._sessions.pop(managed.id, None) is None:
+      return
+    if self._by_recording.get(managed.recording_id) == managed.id:
+      del self._by_recording[managed.recording_id]
+
+    metrics.counter(f"sessions.{managed.state}").inc()
+    latencies = {name: value for name, value in managed.latencies().items() if value is not None}
+    for name, value in latencies.items():
+      metrics.histogram(f"sessions.{name}", RESPONSE_BUCKETS_MS).observe(value)
+    logger.info(
+      f"Session {managed.id} {managed.state}: "
+      + ", ".join(f"{name} {value:.0f}" for name, value in latencies.items())
+    )
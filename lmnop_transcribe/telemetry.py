@@ -0,0 +1,286 @@
+"""
+Lightweight in-process metrics.
+Counters and fixed-bucket histograms, plus a registry so any part of the app can look them up
+by name. The audio callback only fills preallocated slots; they're aggregated off its thread.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+
+import numpy as np
+
+# Bucket upper bounds in milliseconds, for callback intervals and durations
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+# Bucket upper bounds in milliseconds, for the wait between the end of the audio and its transcript
+RESPONSE_BUCKETS_MS = (50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000, 30000)
+# Bucket upper bounds for queue depths, in chunks
+DEPTH_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128)
+
+
+class Counter:
+  """A monotonically increasing count"""
+
+  def __init__(self, name: str):
+    self.name = name
+    self.value = 0
+
+  def inc(self, amount: int = 1) -> None:
+    self.value += amount
+
+  def reset(self) -> None:
+    self.value = 0
+
+
+class Histogram:
+  """
+  Distribution of observations over fixed buckets.
+
+  Observing is a bisect and a few additions with no allocation, so it's safe to call from
+  the audio thread. Quantiles are estimated from the buckets.
+  """
+
+  def __init__(self, name: str, buckets: tuple[float, ...] = LATENCY_BUCKETS_MS):
+    self.name = name
+    self.buckets = buckets
+    self.reset()
+
+  def reset(self) -> None:
+    self.counts = [0] * (len(self.buckets) + 1)  # Last bucket is the overflow
+    self.count = 0
+    self.sum = 0.0
+    self.min = float("inf")
+    self.max = float("-inf")
+
+  def observe(self, value: float) -> None:
+    self.counts[bisect_left(self.buckets, value)] += 1
+    self.count += 1
+    self.sum += value
+    if value < self.min:
+      self.min = value
+    if value > self.max:
+      self.max = value
+
+  @property
+  def mean(self) -> float:
+    return self.sum / self.count if self.count else 0.0
+
+  def quantile(self, q: float) -> float:
+    """Upper bound of the bucket holding the q-th quantile, capped at the largest observation"""
+    if not self.count:
+      return 0.0
+    rank = q * self.count
+    seen = 0
+    for bound, count in zip(self.buckets, self.counts):
+      seen += count
+      if seen >= rank:
+        return min(bound, self.max)
+    return self.max
+
+  def summary(self) -> dict:
+    return {
+      "count": self.count,
+      "mean": self.mean,
+      "p50": self.quantile(0.5),
+      "p99": self.quantile(0.99),
+      "max": self.max if self.count else 0.0,
+    }
+
+
+class MetricsRegistry:
+  """Named metrics shared across the app"""
+
+  def __init__(self):
+    self._metrics: dict[str, Counter | Histogram] = {}
+    self._lock = threading.Lock()
+
+  def counter(self, name: str) -> Counter:
+    """Get the counter called `name`, creating it on first use"""
+    with self._lock:
+      metric = self._metrics.setdefault(name, Counter(name))
+    assert isinstance(metric, Counter), f"{name} is not a counter"
+    return metric
+
+  def histogram(self, name: str, buckets: tuple[float, ...] = LATENCY_BUCKETS_MS) -> Histogram:
+    """Get the histogram called `name`, creating it on first use"""
+    with self._lock:
+      metric = self._metrics.setdefault(name, Histogram(name, buckets))
+    assert isinstance(metric, Histogram), f"{name} is not a histogram"
+    return metric
+
+  def snapshot(self) -> dict:
+    """Current value of every counter and summary of every histogram"""
+    with self._lock:
+      metrics = list(self._metrics.values())
+    return {m.name: m.value if isinstance(m, Counter) else m.summary() for m in metrics}
+
+
+metrics = MetricsRegistry()
+
+
+@dataclass
+class CaptureStats:
+  """Capture health over some period"""
+
+  input_overflows: int = 0
+  input_underflows: int = 0
+  dropped_frames: int = 0
+  callbacks: int = 0
+  frames: int = 0
+  callback_interval_ms: Histogram = field(default_factory=lambda: Histogram("callback_interval_ms"))
+  callback_jitter_ms: Histogram = field(default_factory=lambda: Histogram("callback_jitter_ms"))
+  callback_duration_ms: Histogram = field(default_factory=lambda: Histogram("callback_duration_ms"))
+  queue_depth: Histogram = field(default_factory=lambda: Histogram("queue_depth", DEPTH_BUCKETS))
+
+  def summary(self) -> str:
+    return (
+      f"{self.callbacks} callbacks, {self.input_overflows} overflows, {self.input_underflows} underflows, "
+      f"{self.dropped_frames} dropped frames, "
+      f"jitter p50/p99/max {self.callback_jitter_ms.quantile(0.5):.1f}/"
+      f"{self.callback_jitter_ms.quantile(0.99):.1f}/{max(self.callback_jitter_ms.max, 0):.1f}ms, "
+      f"callback p99 {self.callback_duration_ms.quantile(0.99):.2f}ms, "
+      f"max queue depth {max(self.queue_depth.max, 0):.0f}"
+    )
+
+
+# Status flags recorded per callback
+_OVERFLOW = 1
+_UNDERFLOW = 2
+
+
+class CaptureTelemetry:
+  """
+  Capture-thread health for one AudioSource.
+
+  Keeps stats for the current recording alongside process-wide totals in the metrics
+  registry. The `record_*` methods are called from the audio thread and only store each
+  callback's raw numbers in preallocated slots; `collect()` folds them into the stats and
+  histograms from the consumer side. Fewer than `capacity` callbacks are kept between
+  collections; older ones are overwritten.
+  """
+
+  def __init__(self, registry: MetricsRegistry = metrics, prefix: str = "capture", capacity: int = 4096):
+    self.recording = CaptureStats()
+    self._overflows = registry.counter(f"{prefix}.input_overflows")
+    self._underflows = registry.counter(f"{prefix}.input_underflows")
+    self._dropped = registry.counter(f"{prefix}.dropped_frames")
+    self._interval = registry.histogram(f"{prefix}.callback_interval_ms")
+    self._jitter = registry.histogram(f"{prefix}.callback_jitter_ms")
+    self._duration = registry.histogram(f"{prefix}.callback_duration_ms")
+    self._depth = registry.histogram(f"{prefix}.queue_depth", DEPTH_BUCKETS)
+
+    # One slot per callback, written by the audio thread
+    self.capacity = capacity
+    self._started_at = np.zeros(capacity)
+    self._frames = np.zeros(capacity, dtype=np.int64)
+    self._flags = np.zeros(capacity, dtype=np.uint8)
+    self._durations = np.zeros(capacity)
+    self._depths = np.zeros(capacity, dtype=np.int64)
+    self._drops = np.zeros(capacity, dtype=np.int64)
+    self._samplerate = 0.0
+    self._slot = 0
+    self._written = 0  # Callbacks finished; only the audio thread moves this on
+    self._collected = 0
+    self._last_callback: float | None = None
+
+  def begin_recording(self) -> None:
+    """Start a fresh set of per-recording stats"""
+    self.collect()
+    self.recording = CaptureStats()
+
+  def stream_restarted(self) -> None:
+    """Forget the previous callback so the gap across a stream restart isn't counted as jitter"""
+    self.collect()
+    self._last_callback = None
+
+  def record_callback(self, started: float, frames: int, samplerate: float, status) -> None:
+    """
+    Start recording one callback invocation; `record_duration` finishes it.
+
+    Args:
+        started: `time.perf_counter()` at callback entry
+        frames: Frames delivered
+        samplerate: Stream rate, for the expected interval
+        status: sounddevice CallbackFlags, or None
+    """
+    slot = self._written % self.capacity
+    self._slot = slot
+    self._samplerate = samplerate
+    self._started_at[slot] = started
+    self._frames[slot] = frames
+    self._flags[slot] = 0
+    if status:
+      if getattr(status, "input_overflow", False):
+        self._flags[slot] = _OVERFLOW
+      if getattr(status, "input_underflow", False):
+        self._flags[slot] |= _UNDERFLOW
+    self._depths[slot] = -1
+    self._drops[slot] = 0
+
+  def record_duration(self, started: float) -> None:
+    """Record how long the callback took, given its `time.perf_counter()` at entry"""
+    self._durations[self._slot] = time.perf_counter() - started
+    self._written += 1
+
+  def record_queue_depth(self, depth: int) -> None:
+    self._depths[self._slot] = depth
+
+  def record_dropped(self, frames: int) -> None:
+    self._drops[self._slot] += frames
+
+  def collect(self) -> tuple[int, int]:
+    """
+    Fold the callbacks finished since the last call into the stats. Not for the audio thread.
+
+    Returns:
+        The input overflows and underflows among them
+    """
+    written = self._written
+    # The oldest slot may already be taken by the callback in progress
+    first = max(self._collected, written - self.capacity + 1)
+    self._collected = written
+    if first == written:
+      return 0, 0
+
+    slots = np.arange(first, written) % self.capacity
+    started_at = self._started_at[slots]
+    frames = self._frames[slots]
+    flags = self._flags[slots]
+    stats = self.recording
+    stats.callbacks += len(slots)
+    stats.frames += int(frames.sum())
+
+    overflows = int(np.count_nonzero(flags & _OVERFLOW))
+    underflows = int(np.count_nonzero(flags & _UNDERFLOW))
+    stats.input_overflows += overflows
+    stats.input_underflows += underflows
+    self._overflows.inc(overflows)
+    self._underflows.inc(underflows)
+
+    dropped = int(self._drops[slots].sum())
+    stats.dropped_frames += dropped
+    self._dropped.inc(dropped)
+
+    if self._last_callback is not None:
+      intervals_ms = np.diff(started_at, prepend=self._last_callback) * 1000
+    else:
+      intervals_ms, frames = np.diff(started_at) * 1000, frames[1:]
+    if self._samplerate:
+      jitters_ms = np.abs(intervals_ms - frames * 1000 / self._samplerate)
+      for interval_ms, jitter_ms in zip(intervals_ms.tolist(), jitters_ms.tolist()):
+        stats.callback_interval_ms.observe(interval_ms)
+        stats.callback_jitter_ms.observe(jitter_ms)
+        self._interval.observe(interval_ms)
+        self._jitter.observe(jitter_ms)
+    self._last_callback = float(started_at[-1])
+
+    for duration_ms in (self._durations[slots] * 1000).tolist():
+      stats.callback_duration_ms.observe(duration_ms)
+      self._duration.observe(duration_ms)
+    for depth in self._depths[slots].tolist():
+      if depth >= 0:
+        stats.queue_depth.observe(depth)
+        self._depth.observe(depth)
+
+    return overflows, underflows
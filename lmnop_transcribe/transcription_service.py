@@ -4,25 +4,35 @@ Transcription service using Wyoming ASR protocol.
 Handles streaming audio transcription via TCP socket connection to Wyoming server.
 """
 
+import asyncio
 import io
 import logging
 import socket
-import wave
+import time
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
 
-from wyoming.asr import Transcribe, Transcript
+from wyoming.asr import Transcribe, Transcript, TranscriptChunk, TranscriptStart, TranscriptStop
 from wyoming.audio import AudioChunk as WyomingAudioChunk
 from wyoming.audio import AudioStart, AudioStop
-from wyoming.event import read_event, write_event
+from wyoming.event import Event, async_read_event, async_write_event, read_event, write_event
 
+from .archiver import ARCHIVE_FORMATS, ArchiveFile, AudioArchiver, shared_archiver
+from .audio_store import SessionAudioStore
+from .chunk_encoder import AudioChunkEncoder, send_buffers
 from .common import AudioChunk
+from .telemetry import metrics
+
+if TYPE_CHECKING:
+  from .connection_pool import WyomingConnectionPool
+  from .load_balancer import WyomingLoadBalancer, WyomingServer
 
 logger = logging.getLogger(__name__)
 
 
-class StreamingTranscriptionSession:
+class BaseTranscriptionSession:
   """
-  Manages a single streaming transcription session with Wyoming server.
-  Handles the full Wyoming protocol flow: Transcribe -> AudioStart -> AudioChunks -> AudioStop -> Transcript
+  State and protocol details shared by the blocking and asyncio sessions.
+  Subclasses own the connection and drive the Wyoming protocol flow over it.
   """
 
   def __init__(
@@ -34,6 +44,13 @@ class StreamingTranscriptionSession:
     channels: int = 1,
     save_wav: bool = False,
     wav_filepath: str | None = None,
+    connect_timeout: float | None = 5.0,
+    write_timeout: float | None = 5.0,
+    read_timeout: float | None = 30.0,
+    on_complete: Callable[[bool, float | None], None] | None = None,
+    fast_encoder: bool = False,
+    archiver: AudioArchiver | None = None,
+    max_audio_memory: int = 16 * 1024 * 1024,
   ):
     self.session_id = session_id
     self.wyoming_server_address = wyoming_server_address
@@ -42,14 +59,113 @@ class StreamingTranscriptionSession:
     self.channels = channels
     self.save_wav = save_wav
     self.wav_filepath = wav_filepath
+    self.connect_timeout = connect_timeout
+    self.write_timeout = write_timeout
+    self.read_timeout = read_timeout
+    # Told once whether the server did its job, and how long the transcript took after the audio ended
+    self.on_complete = on_complete
+    # Pre-serialized chunk headers, sent alongside the payload without copying it
+    self._encoder = AudioChunkEncoder(rate, sample_width, channels) if fast_encoder else None
+    # Writes the audio to `wav_filepath` as it's sent, when `save_wav` is set
+    self.archiver = archiver
+    self._archive: ArchiveFile | None = None
+
+    # The audio sent, when it's kept to be replayed; spills to disk past `max_audio_memory`
+    self.max_audio_memory = max_audio_memory
+    self._sent_audio: SessionAudioStore | None = None
+    self.keep_audio = False
+    self._session_started = False
+    self._audio_stopped = False
+    self._audio_stopped_at: float | None = None
+    self.chunks_sent = 0
+
+    logger.info(f"Created transcription session {session_id}")
+
+  def _server_host_port(self) -> tuple[str, int]:
+    host, port = self.wyoming_server_address.split(":")
+    return host, int(port)
+
+  def _audio_start_event(self) -> Event:
+    return AudioStart(rate=self.rate, width=self.sample_width, channels=self.channels).event()
+
+  def _audio_chunk_event(self, chunk: AudioChunk) -> Event:
+    return WyomingAudioChunk(
+      rate=self.rate, width=self.sample_width, channels=self.channels, audio=chunk.data
+    ).event()
+
+  def _chunk_sent(self, chunk: AudioChunk) -> None:
+    """Account for a chunk the server has been sent"""
+    self.chunks_sent += 1
+
+    if self._archive:
+      self._archive.write(chunk.data)
+    if self.keep_audio:
+      if self._sent_audio is None:
+        self._sent_audio = SessionAudioStore(self.max_audio_memory)
+      self._sent_audio.append(chunk.data)
+
+    logger.debug(
+      f"Session {self.session_id}: Added chunk {len(chunk.data)} bytes at {chunk.timestamp_delta:.0f}ms"
+    )
+
+  def _mark_audio_stopped(self) -> None:
+    self._audio_stopped = True
+    self._audio_stopped_at = time.perf_counter()
+
+  def _complete(self, ok: bool, responded: bool = False) -> None:
+    """Report the session's outcome to `on_complete`, the first time only"""
+    if self.on_complete is None:
+      return
+
+    on_complete, self.on_complete = self.on_complete, None
+    response_ms = None
+    if responded and self._audio_stopped_at is not None:
+      response_ms = (time.perf_counter() - self._audio_stopped_at) * 1000
+    on_complete(ok, response_ms)
+
+  def _parse_transcript(self, transcript_event: "Event | None") -> str | None:
+    if transcript_event and Transcript.is_type(transcript_event.type):
+      transcript_obj = Transcript.from_event(transcript_event)
+      transcript = transcript_obj.text.strip()
+      logger.info(f"Session {self.session_id}: Received transcript: '{transcript}'")
+      self._complete(True, responded=True)
+      return transcript
+
+    logger.warning(f"Session {self.session_id}: Unexpected event from Wyoming server: {transcript_event}")
+    self._complete(False)
+    return None
+
+  def _open_archive(self) -> None:
+    """Start writing the audio to `wav_filepath`, if the session saves it"""
+    if not self.save_wav or not self.wav_filepath or self._archive:
+      return
 
+    try:
+      archiver = self.archiver or shared_archiver()
+      self._archive = archiver.open(self.wav_filepath, self.rate, self.sample_width, self.channels)
+    except Exception:
+      logger.exception(f"Error creating audio file for session {self.session_id}")
+
+  def _close_archive(self, discard: bool = False) -> None:
+    """Let the archive finish in the background; a discarded one is deleted"""
+    if self._archive:
+      archive, self._archive = self._archive, None
+      archive.close(discard=discard)
+
+
+class StreamingTranscriptionSession(BaseTranscriptionSession):
+  """
+  Manages a single streaming transcription session with Wyoming server.
+  Handles the full Wyoming protocol flow: Transcribe -> AudioStart -> AudioChunks -> AudioStop -> Transcript
+
+  Uses a blocking socket; call it from a worker thread, or use AsyncStreamingTranscriptionSession on the loop.
+  """
+
+  def __init__(self, *args, **kwargs):
+    super().__init__(*args, **kwargs)
     self._socket: socket.socket | None = None
     self._write_io: io.BufferedWriter | None = None
     self._read_io: io.BufferedReader | None = None
-    self._wav_buffer: list[bytes] = []
-    self._session_started = False
-
-    logger.info(f"Created transcription session {session_id}")
 
   def begin_session(self) -> None:
     """Begin the transcription session - connect to Wyoming and send initial events"""
@@ -58,11 +174,13 @@ class StreamingTranscriptionSession:
       return
 
     try:
-      host, port = self.wyoming_server_address.split(":")
-      port = int(port)
+      host, port = self._server_host_port()
 
       logger.info(f"Connecting to Wyoming server at {host}:{port} for session {self.session_id}")
-      self._socket = socket.create_connection((host, port))
+      self._socket = socket.create_connection((host, port), timeout=self.connect_timeout)
+      # Replaces the connect timeout: bounds every later send and the wait for the transcript,
+      # or makes the socket blocking again with no read timeout
+      self._socket.settimeout(self.read_timeout)
       self._write_io = self._socket.makefile("wb")
       self._read_io = self._socket.makefile("rb")
 
@@ -71,18 +189,18 @@ class StreamingTranscriptionSession:
       logger.debug(f"Session {self.session_id}: Sent Transcribe event")
 
       # Send AudioStart event
-      write_event(
-        AudioStart(rate=self.rate, width=self.sample_width, channels=self.channels).event(), self._write_io
-      )
+      write_event(self._audio_start_event(), self._write_io)
       logger.debug(
         f"Session {self.session_id}: Sent AudioStart event (rate={self.rate}, "
         f"width={self.sample_width}, channels={self.channels})"
       )
 
       self._session_started = True
+      self._open_archive()
 
     except Exception:
       logger.exception(f"Failed to begin transcription session {self.session_id}")
+      self._complete(False)
       self._cleanup()
       raise
 
@@ -91,28 +209,32 @@ class StreamingTranscriptionSession:
     if not self._session_started or not self._write_io:
       logger.error(f"Session {self.session_id} not started, cannot add chunk")
       return
+    if self._audio_stopped:
+      logger.debug(f"Session {self.session_id}: Audio already finished, ignoring chunk")
+      return
 
     try:
       # Send audio chunk to Wyoming
-      write_event(
-        WyomingAudioChunk(
-          rate=self.rate, width=self.sample_width, channels=self.channels, audio=chunk.data
-        ).event(),
-        self._write_io,
-      )
-
-      # Buffer for WAV file if needed
-      if self.save_wav:
-        self._wav_buffer.append(chunk.data)
-
-      logger.debug(
-        f"Session {self.session_id}: Added chunk {len(chunk.data)} bytes at {chunk.timestamp_delta:.0f}ms"
-      )
+      if self._encoder and self._socket:
+        send_buffers(self._socket, self._encoder.buffers(chunk.data))
+      else:
+        write_event(self._audio_chunk_event(chunk), self._write_io)
+      self._chunk_sent(chunk)
 
     except Exception:
       logger.exception(f"Error adding chunk to session {self.session_id}")
       raise
 
+  def finish_audio(self) -> None:
+    """Tell the server the audio is complete, so it can start transcribing. Later chunks are ignored."""
+    if not self._session_started or self._audio_stopped:
+      return
+
+    self._mark_audio_stopped()
+    if self._write_io:
+      write_event(AudioStop().event(), self._write_io)
+      logger.debug(f"Session {self.session_id}: Sent AudioStop event")
+
   def end_session(self) -> str | None:
     """End the transcription session and get the transcript"""
     if not self._session_started:
@@ -120,32 +242,26 @@ class StreamingTranscriptionSession:
       return None
 
     try:
-      # Send AudioStop event
-      if self._write_io:
-        write_event(AudioStop().event(), self._write_io)
-        logger.debug(f"Session {self.session_id}: Sent AudioStop event")
+      # Send AudioStop event, unless the audio was already finished early
+      self.finish_audio()
 
-      # Save WAV file if requested
-      if self.save_wav and self.wav_filepath and self._wav_buffer:
-        self._save_wav_file()
+      # The rest of the audio file is written in the background
+      archive = self._archive
+      self._close_archive()
 
       # Read transcript response
       transcript = None
       if self._read_io:
-        transcript_event = read_event(self._read_io)
-        if transcript_event and Transcript.is_type(transcript_event.type):
-          transcript_obj = Transcript.from_event(transcript_event)
-          transcript = transcript_obj.text.strip()
-          logger.info(f"Session {self.session_id}: Received transcript: '{transcript}'")
-        else:
-          logger.warning(
-            f"Session {self.session_id}: Unexpected event from Wyoming server: {transcript_event}"
-          )
+        transcript = self._parse_transcript(read_event(self._read_io))
 
+      if archive:
+        # This session blocks anyway, so it returns with the file complete
+        archive.closed.wait(self.write_timeout)
       return transcript
 
     except Exception:
       logger.exception(f"Error ending transcription session {self.session_id}")
+      self._complete(False)
       return None
     finally:
       self._cleanup()
@@ -155,29 +271,6 @@ class StreamingTranscriptionSession:
     logger.info(f"Cancelling transcription session {self.session_id}")
     self._cleanup()
 
-  def _save_wav_file(self) -> None:
-    """Save buffered audio chunks to WAV file"""
-    if not self.wav_filepath or not self._wav_buffer:
-      return
-
-    try:
-      with wave.open(self.wav_filepath, "wb") as wav_file:
-        wav_file.setnchannels(self.channels)
-        wav_file.setsampwidth(self.sample_width)
-        wav_file.setframerate(self.rate)
-
-        for chunk in self._wav_buffer:
-          wav_file.writeframes(chunk)
-
-      total_bytes = sum(len(chunk) for chunk in self._wav_buffer)
-      logger.info(
-        f"Session {self.session_id}: Saved {len(self._wav_buffer)} chunks ({total_bytes} bytes) "
-        f"to {self.wav_filepath}"
-      )
-
-    except Exception:
-      logger.exception(f"Error saving WAV file for session {self.session_id}")
-
   def _cleanup(self) -> None:
     """Clean up socket and file resources"""
     if self._write_io:
@@ -201,12 +294,328 @@ class StreamingTranscriptionSession:
         pass
       self._socket = None
 
+    self._close_archive(discard=True)  # Only still open if the session didn't finish
+    self._session_started = False
+    self._audio_stopped = False
+    self._complete(True)  # Cancelled, or never started; not the server's fault
+    logger.debug(f"Session {self.session_id}: Cleaned up resources")
+
+
+class AsyncStreamingTranscriptionSession(BaseTranscriptionSession):
+  """
+  A StreamingTranscriptionSession built on asyncio streams, for use on the event loop.
+
+  Connecting, every write and the wait for the transcript are bounded by the session's
+  timeouts, so a slow or unresponsive server can't stall the loop. Chunks added while the
+  connection is still being made wait for it, and are sent in the order they were added.
+  With a `pool`, the session starts on one of its pre-opened connections.
+
+  With a `hedge`, the audio is kept, and if there's no transcript `hedge_after_ms` after the
+  audio ends, it's replayed to the session `hedge` returns. Whichever transcript arrives
+  first is used and the other request is cancelled.
+
+  The server's events are read while the audio is still being sent. Servers that stream
+  interim results have the text so far passed to `on_transcript(text, False)` as it grows,
+  and the final transcript is passed as `on_transcript(text, True)`.
+  """
+
+  def __init__(
+    self,
+    *args,
+    pool: "WyomingConnectionPool | None" = None,
+    hedge: "Callable[[], AsyncStreamingTranscriptionSession | None] | None" = None,
+    hedge_after_ms: float | None = None,
+    on_transcript: Callable[[str, bool], None] | None = None,
+    **kwargs,
+  ):
+    super().__init__(*args, **kwargs)
+    self.pool = pool
+    self.hedge = hedge
+    self.hedge_after_ms = hedge_after_ms
+    self.on_transcript = on_transcript
+    self.keep_audio = hedge is not None
+    self._reader: asyncio.StreamReader | None = None
+    self._writer: asyncio.StreamWriter | None = None
+    self._connecting: asyncio.Future | None = None
+    self._events: asyncio.Task | None = None
+    self._transcript: asyncio.Future | None = None
+
+  async def begin_session(self) -> None:
+    """Begin the transcription session - connect to Wyoming and send initial events"""
+    if self._session_started or self._connecting:
+      logger.warning(f"Session {self.session_id} already started")
+      return
+
+    self._connecting = asyncio.ensure_future(self._connect())
+    try:
+      await self._connecting
+    except asyncio.CancelledError:
+      # Don't leave a half-opened connection behind
+      await self._cleanup()
+      raise
+    except Exception:
+      logger.exception(f"Failed to begin transcription session {self.session_id}")
+      self._complete(False)
+      await self._cleanup()
+      raise
+
+  async def _connect(self) -> None:
+    if self.pool:
+      connection = await self.pool.acquire()
+      self._reader, self._writer = connection.reader, connection.writer
+    else:
+      host, port = self._server_host_port()
+
+      logger.info(f"Connecting to Wyoming server at {host}:{port} for session {self.session_id}")
+      self._reader, self._writer = await asyncio.wait_for(
+        asyncio.open_connection(host, port), timeout=self.connect_timeout
+      )
+
+    await self._write(Transcribe().event())
+    logger.debug(f"Session {self.session_id}: Sent Transcribe event")
+
+    await self._write(self._audio_start_event())
+    logger.debug(
+      f"Session {self.session_id}: Sent AudioStart event (rate={self.rate}, "
+      f"width={self.sample_width}, channels={self.channels})"
+    )
+
+    self._transcript = asyncio.get_running_loop().create_future()
+    self._events = asyncio.create_task(self._read_events())
+    self._session_started = True
+    self._open_archive()
+
+  async def _read_events(self) -> None:
+    """Read the server's events as they arrive, passing interim text on, until the transcript"""
+    assert self._reader is not None and self._transcript is not None
+    partial = ""
+    try:
+      while (event := await async_read_event(self._reader)) is not None:
+        if Transcript.is_type(event.type):
+          break
+        if TranscriptStart.is_type(event.type):
+          partial = ""
+        elif TranscriptChunk.is_type(event.type):
+          partial += TranscriptChunk.from_event(event).text
+          self._emit_transcript(partial, is_final=False)
+        elif not TranscriptStop.is_type(event.type):
+          logger.debug(f"Session {self.session_id}: Ignoring {event.type} event from Wyoming server")
+    except Exception as e:
+      if not self._transcript.done():
+        self._transcript.set_exception(e)
+        self._transcript.exception()  # Raised from end_session, if anything is still waiting for it
+      return
+
+    if not self._transcript.done():
+      self._transcript.set_result(event)
+
+  def _emit_transcript(self, text: str, is_final: bool) -> None:
+    if self.on_transcript:
+      try:
+        self.on_transcript(text, is_final)
+      except Exception:
+        logger.exception(f"Session {self.session_id}: Error in transcript callback")
+
+  async def _write(self, event: Event) -> None:
+    assert self._writer is not None
+    await asyncio.wait_for(async_write_event(event, self._writer), timeout=self.write_timeout)
+
+  async def _wait_connected(self) -> bool:
+    """Wait out a connection in progress, returning whether the session is usable"""
+    if self._connecting and not self._connecting.done():
+      try:
+        await asyncio.shield(self._connecting)
+      except Exception:
+        return False
+    return self._session_started and self._writer is not None
+
+  async def add_chunk(self, chunk: AudioChunk) -> None:
+    """Add an audio chunk to the transcription session"""
+    if not await self._wait_connected():
+      logger.error(f"Session {self.session_id} not started, cannot add chunk")
+      return
+    if self._audio_stopped:
+      logger.debug(f"Session {self.session_id}: Audio already finished, ignoring chunk")
+      return
+
+    try:
+      if self._encoder and self._writer:
+        self._writer.writelines(self._encoder.buffers(chunk.data))
+        await asyncio.wait_for(self._writer.drain(), timeout=self.write_timeout)
+      else:
+        await self._write(self._audio_chunk_event(chunk))
+      self._chunk_sent(chunk)
+
+    except Exception:
+      logger.exception(f"Error adding chunk to session {self.session_id}")
+      raise
+
+  async def finish_audio(self) -> None:
+    """Tell the server the audio is complete, so it can start transcribing. Later chunks are ignored."""
+    if not await self._wait_connected() or self._audio_stopped:
+      return
+
+    self._mark_audio_stopped()
+    await self._write(AudioStop().event())
+    logger.debug(f"Session {self.session_id}: Sent AudioStop event")
+
+  async def end_session(self) -> str | None:
+    """End the transcription session and get the transcript"""
+    if not await self._wait_connected():
+      logger.warning(f"Session {self.session_id} not started, cannot end")
+      return None
+
+    try:
+      # Send AudioStop event, unless the audio was already finished early
+      await self.finish_audio()
+
+      # The rest of the audio file is written in the background
+      self._close_archive()
+
+      transcript = await self._await_transcript()
+      if transcript is not None:
+        self._emit_transcript(transcript, is_final=True)
+      return transcript
+
+    except asyncio.TimeoutError:
+      logger.error(f"Session {self.session_id}: Timed out waiting for the Wyoming server")
+      self._complete(False)
+      return None
+    except Exception:
+      logger.exception(f"Error ending transcription session {self.session_id}")
+      self._complete(False)
+      return None
+    finally:
+      await self._cleanup()
+
+  async def _await_transcript(self) -> str | None:
+    """Wait for the transcript, hedging to a second server if this one is too slow"""
+    assert self._transcript is not None
+    final = asyncio.shield(self._transcript)
+    read = asyncio.ensure_future(asyncio.wait_for(final, timeout=self.read_timeout))
+    if self.hedge is None or self.hedge_after_ms is None:
+      return self._parse_transcript(await read)
+
+    done, _ = await asyncio.wait([read], timeout=self.hedge_after_ms / 1000)
+    hedge_session = None if done else self.hedge()
+    if hedge_session is None:
+      return self._parse_transcript(await read)
+
+    logger.info(
+      f"Session {self.session_id}: No transcript after {self.hedge_after_ms:.0f}ms, "
+      f"replaying audio to {hedge_session.wyoming_server_address}"
+    )
+    metrics.counter("transcription.hedges").inc()
+    hedged = asyncio.ensure_future(hedge_session.transcribe(self._recorded_chunks()))
+
+    pending = {read, hedged}
+    try:
+      while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+          if task is hedged:
+            transcript = hedged.result()  # Errors are handled inside the hedge session
+            if transcript is not None:
+              logger.info(
+                f"Session {self.session_id}: Hedged request to {hedge_session.wyoming_server_address} won"
+              )
+              metrics.counter("transcription.hedge_wins").inc()
+              self._complete(True, responded=True)  # Slow, not failed
+              return transcript
+          else:
+            try:
+              transcript = self._parse_transcript(read.result())
+            except Exception:
+              logger.exception(f"Session {self.session_id}: No transcript from {self.wyoming_server_address}")
+              self._complete(False)
+              transcript = None
+            if transcript is not None:
+              return transcript
+      return None
+    finally:
+      for task in pending:
+        task.cancel()
+
+  def _recorded_chunks(self) -> Iterator[AudioChunk]:
+    """The audio sent so far, read back chunk by chunk and stamped from the start of the session"""
+    bytes_per_ms = self.rate * self.sample_width * self.channels / 1000
+    sent_bytes = 0
+    for data in self._sent_audio or ():
+      sent_bytes += len(data)
+      yield AudioChunk(data=data, timestamp_delta=sent_bytes / bytes_per_ms)
+
+  async def transcribe(self, chunks: Iterable[AudioChunk]) -> str | None:
+    """Run the whole session over audio that's already been recorded"""
+    try:
+      await self.begin_session()
+    except Exception:
+      return None
+    try:
+      for chunk in chunks:
+        await self.add_chunk(chunk)
+      return await self.end_session()
+    except Exception:
+      self._complete(False)  # add_chunk has logged it
+      return None
+    finally:
+      # Closes the connection and reports the outcome if this was cancelled part way, as a
+      # hedge is once the other server answers; a no-op after end_session
+      await self._cleanup()
+
+  async def cancel_session(self) -> None:
+    """Cancel the transcription session without getting transcript"""
+    logger.info(f"Cancelling transcription session {self.session_id}")
+    if self._connecting and not self._connecting.done():
+      self._connecting.cancel()
+    await self._cleanup()
+
+  async def _cleanup(self) -> None:
+    """Stop reading and close the connection"""
+    if self._events:
+      events, self._events = self._events, None
+      events.cancel()
+      try:
+        await events
+      except asyncio.CancelledError:
+        pass
+    if self._transcript and not self._transcript.done():
+      self._transcript.cancel()
+    self._transcript = None
+
+    if self._writer:
+      writer, self._writer = self._writer, None
+      try:
+        if writer.transport.get_write_buffer_size():
+          # Cancelled mid-write; there's no point waiting for the server to take the rest
+          writer.transport.abort()
+        else:
+          writer.close()
+        await asyncio.wait_for(writer.wait_closed(), timeout=self.write_timeout)
+      except Exception:
+        pass
+
+    self._reader = None
+    self._connecting = None
+    self._close_archive(discard=True)  # Only still open if the session didn't finish
+    if self._sent_audio:
+      self._sent_audio.close()
+      self._sent_audio = None
     self._session_started = False
+    self._audio_stopped = False
+    self._complete(True)  # Cancelled, or never started; not the server's fault
     logger.debug(f"Session {self.session_id}: Cleaned up resources")
 
 
 class TranscriptionService:
-  """Service for managing streaming transcription sessions with Wyoming ASR protocol"""
+  """
+  Service for managing streaming transcription sessions with Wyoming ASR protocol
+
+  `wyoming_server_address` may list several comma-separated servers, in which case each
+  session goes to the one picked by a WyomingLoadBalancer using `routing`.
+
+  Saved recordings are written as `archive_format` ("wav" or "flac") under `wav_output_path`,
+  unless it names a .wav or .flac file itself.
+  """
 
   def __init__(
     self,
@@ -216,31 +625,155 @@ class TranscriptionService:
     channels: int = 1,
     save_wav_files: bool = False,
     wav_output_path: str | None = None,
+    connect_timeout: float | None = 5.0,
+    write_timeout: float | None = 5.0,
+    read_timeout: float | None = 30.0,
+    pool_size: int = 0,
+    routing: str = "least_outstanding",
+    hedge_quantile: float | None = None,
+    hedge_after_ms: float = 2000.0,
+    hedge_min_samples: int = 20,
+    fast_encoder: bool = False,
+    archive_format: str = "wav",
+    max_audio_memory: int = 16 * 1024 * 1024,
   ):
+    if archive_format not in ARCHIVE_FORMATS:
+      raise ValueError(f"Unknown archive format {archive_format!r}, expected one of {ARCHIVE_FORMATS}")
+
     self.wyoming_server_address = wyoming_server_address
+    self.server_addresses = [
+      address.strip() for address in wyoming_server_address.split(",") if address.strip()
+    ]
     self.rate = rate
     self.sample_width = sample_width
     self.channels = channels
     self.save_wav_files = save_wav_files
     self.wav_output_path = wav_output_path
+    self.archive_format = archive_format
+    self.archiver = AudioArchiver() if save_wav_files else None
+    self.connect_timeout = connect_timeout
+    self.write_timeout = write_timeout
+    self.read_timeout = read_timeout
+    self.pool_size = pool_size
+    self.pools: dict[str, "WyomingConnectionPool"] = {}
+    # Hedge once a transcript is later than this quantile of the server's response times,
+    # or than `hedge_after_ms` until it has `hedge_min_samples` of them
+    self.hedge_quantile = hedge_quantile
+    self.hedge_after_ms = hedge_after_ms
+    self.hedge_min_samples = hedge_min_samples
+    self.fast_encoder = fast_encoder
+    self.max_audio_memory = max_audio_memory  # Per session, before its kept audio moves to disk
+
+    self.balancer: "WyomingLoadBalancer | None" = None
+    if len(self.server_addresses) > 1:
+      from .load_balancer import WyomingLoadBalancer
+
+      self.balancer = WyomingLoadBalancer(self.server_addresses, strategy=routing)
+    elif hedge_quantile:
+      logger.warning("Hedging needs more than one Wyoming server, so it's disabled")
 
     logger.info(f"TranscriptionService initialized for {wyoming_server_address}")
 
-  def create_session(self, session_id: str) -> StreamingTranscriptionSession:
-    """Create a new streaming transcription session"""
+  async def start(self) -> None:
+    """Start pre-connecting to the servers if pooling is enabled, and probing them if there are several"""
+    if self.pool_size > 0 and not self.pools:
+      from .connection_pool import WyomingConnectionPool
+
+      for address in self.server_addresses:
+        self.pools[address] = WyomingConnectionPool(
+          address, size=self.pool_size, connect_timeout=self.connect_timeout
+        )
+        await self.pools[address].start()
+
+    if self.balancer:
+      await self.balancer.start()
+
+  async def close(self) -> None:
+    """Close any pre-opened connections, stop health checks and finish writing saved recordings"""
+    pools, self.pools = self.pools, {}
+    for pool in pools.values():
+      await pool.close()
+    if self.balancer:
+      await self.balancer.close()
+
+    if self.archiver:
+      await asyncio.to_thread(self.archiver.close)
+
+  def _choose_server(self, exclude: "list[WyomingServer] | None" = None) -> "WyomingServer | None":
+    """Pick a server for a new session and count it as outstanding there"""
+    if not self.balancer:
+      return None
+    server = self.balancer.choose(exclude or ())
+    if server:
+      self.balancer.session_started(server)
+    return server
+
+  def _session_kwargs(
+    self, session_id: str, server: "WyomingServer | None" = None, save_wav: bool = True
+  ) -> dict:
     wav_filepath = None
-    if self.save_wav_files and self.wav_output_path:
-      if self.wav_output_path.endswith(".wav"):
+    if save_wav and self.save_wav_files and self.wav_output_path:
+      if self.wav_output_path.endswith((".wav", ".flac")):
         wav_filepath = self.wav_output_path
       else:
-        wav_filepath = f"{self.wav_output_path}/recording_{session_id}.wav"
+        wav_filepath = f"{self.wav_output_path}/recording_{session_id}.{self.archive_format}"
 
-    return StreamingTranscriptionSession(
+    address = self.wyoming_server_address
+    on_complete = None
+    if server:
+      address = server.address
+      logger.debug(f"Routing session {session_id} to {address}")
+
+      def on_complete(ok: bool, response_ms: float | None) -> None:
+        assert self.balancer is not None
+        self.balancer.session_finished(server, ok, response_ms)
+
+    return dict(
       session_id=session_id,
-      wyoming_server_address=self.wyoming_server_address,
+      wyoming_server_address=address,
       rate=self.rate,
       sample_width=self.sample_width,
       channels=self.channels,
-      save_wav=self.save_wav_files,
+      save_wav=save_wav and self.save_wav_files,
       wav_filepath=wav_filepath,
+      connect_timeout=self.connect_timeout,
+      write_timeout=self.write_timeout,
+      read_timeout=self.read_timeout,
+      on_complete=on_complete,
+      fast_encoder=self.fast_encoder,
+      archiver=self.archiver,
+      max_audio_memory=self.max_audio_memory,
     )
+
+  def create_session(self, session_id: str) -> StreamingTranscriptionSession:
+    """Create a new streaming transcription session"""
+    return StreamingTranscriptionSession(**self._session_kwargs(session_id, self._choose_server()))
+
+  def create_async_session(
+    self, session_id: str, on_transcript: Callable[[str, bool], None] | None = None
+  ) -> AsyncStreamingTranscriptionSession:
+    """Create a new streaming transcription session for use on the event loop"""
+    server = self._choose_server()
+    kwargs = self._session_kwargs(session_id, server)
+    kwargs["on_transcript"] = on_transcript
+    if server and self.hedge_quantile:
+      hedge_after_ms = self.hedge_after_ms
+      if server.response_ms.count >= self.hedge_min_samples:
+        hedge_after_ms = server.response_ms.quantile(self.hedge_quantile)
+
+      def hedge() -> AsyncStreamingTranscriptionSession | None:
+        other = self._choose_server(exclude=[server])
+        if other is None:
+          return None
+        return AsyncStreamingTranscriptionSession(
+          **self._session_kwargs(f"{session_id}-hedge", other, save_wav=False),
+          pool=self.pools.get(other.address),
+        )
+
+      kwargs.update(hedge=hedge, hedge_after_ms=hedge_after_ms)
+
+    return AsyncStreamingTranscriptionSession(**kwargs, pool=self.pools.get(kwargs["wyoming_server_address"]))
+
+  def server_stats(self) -> dict[str, dict]:
+    """Per-server routing state and latency, when sessions are spread over several servers"""
+    return self.balancer.stats() if self.balancer else {}
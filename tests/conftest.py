@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Fixtures shared between test modules.
+"""
+
+import asyncio
+
+import pytest
+from wyoming.asr import Transcript
+from wyoming.event import Event, async_read_event, async_write_event
+
+
+class FakeWyomingServer:
+  """
+  A Wyoming ASR server on a local port, recording the events and connections it receives.
+
+  Describe is answered with Info (unless `answer_describe` is false), or with the raw bytes of
+  `describe_reply` followed by hanging up, and AudioStop with a Transcript of `text` after `delay` seconds;
+  with `text` None, AudioStop is never answered.
+  Use it as an async context manager to stop it.
+  """
+
+  def __init__(
+    self,
+    text: str | None = "ok",
+    delay: float = 0.0,
+    answer_describe: bool = True,
+    describe_reply: bytes | None = None,
+  ):
+    self.text = text
+    self.delay = delay
+    self.answer_describe = answer_describe
+    self.describe_reply = describe_reply
+    self.received: list[Event] = []
+    self.connections: list[asyncio.StreamWriter] = []
+    self.address = ""
+    self._server: asyncio.Server | None = None
+
+  async def start(self) -> "FakeWyomingServer":
+    self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+    self.address = f"127.0.0.1:{self._server.sockets[0].getsockname()[1]}"
+    return self
+
+  async def close(self) -> None:
+    if self._server is not None:
+      self._server.close()
+      await self._server.wait_closed()
+
+  async def wait_for_connections(self, count: int) -> None:
+    """Wait until at least `count` connections have been accepted"""
+    while len(self.connections) < count:
+      await asyncio.sleep(0.01)
+
+  async def __aenter__(self) -> "FakeWyomingServer":
+    return self
+
+  async def __aexit__(self, *exc_info) -> None:
+    await self.close()
+
+  async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    self.connections.append(writer)
+    while (event := await async_read_event(reader)) is not None:
+      self.received.append(event)
+      if event.type == "describe" and self.describe_reply is not None:
+        writer.write(self.describe_reply)
+        await writer.drain()
+        break
+      elif event.type == "describe" and self.answer_describe:
+        await async_write_event(Event(type="info"), writer)
+      elif event.type == "audio-stop" and self.text is not None:
+        await asyncio.sleep(self.delay)
+        await async_write_event(Transcript(text=self.text).event(), writer)
+    writer.close()
+
+
+@pytest.fixture
+def wyoming_server():
+  """Starts fake Wyoming servers: `server = await wyoming_server(text="ok", delay=0.0)`"""
+
+  async def start(**kwargs) -> FakeWyomingServer:
+    return await FakeWyomingServer(**kwargs).start()
+
+  return start
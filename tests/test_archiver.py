@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for archiving recordings on the writer thread.
+"""
+
+import os
+import wave
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from lmnop_transcribe.archiver import AudioArchiver
+
+
+class TestAudioArchiver:
+  """Test recordings written incrementally in WAV and FLAC."""
+
+  def test_wav_written_incrementally(self, tmp_path):
+    """Test that a WAV file is readable while it's written, and complete once closed."""
+    path = str(tmp_path / "recording.wav")
+    archiver = AudioArchiver()
+    archive = archiver.open(path, rate=16000, sample_width=2, channels=1)
+
+    assert archive.opened.wait(timeout=1)  # Created on the writer thread
+    with wave.open(path, "rb") as wav_file:
+      assert wav_file.getframerate() == 16000
+      assert wav_file.getnframes() == 0
+
+    archive.write(b"\x01\x00" * 160)
+    archive.write(b"\x02\x00" * 160)
+    archive.close()
+    assert archive.closed.wait(timeout=1)
+    archiver.close()
+
+    with wave.open(path, "rb") as wav_file:
+      assert wav_file.readframes(wav_file.getnframes()) == b"\x01\x00" * 160 + b"\x02\x00" * 160
+
+  def test_flac(self, tmp_path):
+    """Test that a .flac path is compressed losslessly."""
+    path = str(tmp_path / "recording.flac")
+    samples = (np.sin(np.arange(16000) / 10) * 10000).astype(np.int16)
+    archiver = AudioArchiver()
+    archive = archiver.open(path, rate=16000, sample_width=2, channels=1)
+    for block in np.split(samples, 10):
+      archive.write(block.tobytes())
+    archive.close()
+    archiver.close()
+
+    decoded, rate = sf.read(path, dtype="int16")
+    assert rate == 16000
+    np.testing.assert_array_equal(decoded, samples)
+    assert os.path.getsize(path) < samples.nbytes
+
+  def test_discard(self, tmp_path):
+    """Test that a discarded archive is deleted."""
+    path = str(tmp_path / "cancelled.wav")
+    archiver = AudioArchiver()
+    archive = archiver.open(path, rate=16000, sample_width=2, channels=1)
+    archive.write(b"\x00\x00" * 160)
+    archive.close(discard=True)
+    archiver.close()
+
+    assert not os.path.exists(path)
+
+  def test_full_queue_drops_chunks(self, tmp_path):
+    """Test that chunks are dropped, not waited on, when the writer is behind, but closing never is."""
+    archiver = AudioArchiver(max_queued=2)
+    archive = archiver.open(str(tmp_path / "first.wav"), rate=16000, sample_width=2, channels=1)
+    archiver.close()  # Nothing is draining the queue now
+
+    for _ in range(5):
+      archive.write(b"\x00\x00")
+    assert archive.dropped_chunks == 3
+    archive.close()  # Queued past the limit without blocking
+    assert archiver._queue.qsize() == 3
+    archive._finish(discard=True)
+
+  def test_flac_needs_16_bit(self, tmp_path):
+    """Test that FLAC archives refuse sample widths they can't be written with."""
+    with pytest.raises(ValueError):
+      AudioArchiver().open(str(tmp_path / "recording.flac"), rate=16000, sample_width=4, channels=1)
+
+
+if __name__ == "__main__":
+  pytest.main([__file__, "-v"])
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Tests for the file and synthetic AudioSource backends.
+"""
+
+import asyncio
+import time
+import wave
+
+import numpy as np
+import pytest
+
+from lmnop_transcribe.audio_backends import FileAudioSource, SyntheticAudioSource
+from lmnop_transcribe.common import AudioConfig
+
+
+def _write_wav(path, samples: np.ndarray, rate: int = 16000) -> None:
+  with wave.open(str(path), "wb") as wav_file:
+    wav_file.setnchannels(samples.shape[1])
+    wav_file.setsampwidth(2)
+    wav_file.setframerate(rate)
+    wav_file.writeframes(samples.astype("<i2").tobytes())
+
+
+async def _record(source, seconds_of_audio: float, timeout: float = 5.0) -> list:
+  """Run one recording until `seconds_of_audio` have been captured"""
+  chunks = []
+  subscription = source.create_audio_observable().subscribe(on_next=chunks.append)
+  source.start_recording()
+  deadline = time.monotonic() + timeout
+  while not chunks or chunks[-1].timestamp_delta < seconds_of_audio * 1000:
+    assert time.monotonic() < deadline, "Timed out waiting for audio"
+    await asyncio.sleep(0.005)
+  source.stop_recording()
+  subscription.dispose()
+  return chunks
+
+
+class TestSimulatedAudioSource:
+  """Test the base for in-process backends."""
+
+  def test_backend_must_implement_everything(self):
+    """Test that a backend missing part of the interface can't be created."""
+    from lmnop_transcribe.audio_backends import SimulatedAudioSource
+
+    class NoName(SimulatedAudioSource):
+      native_samplerate = 16000
+
+      def _read_frames(self, frames: int) -> np.ndarray:
+        return np.zeros((frames, 1), dtype=np.int16)
+
+    with pytest.raises(TypeError, match="device_name"):
+      NoName(AudioConfig())
+
+
+class TestFileAudioSource:
+  """Test replaying audio files."""
+
+  def test_wav_is_memory_mapped(self, tmp_path):
+    """Test that 16-bit WAV files are memory-mapped rather than read."""
+    path = tmp_path / "ramp.wav"
+    _write_wav(path, np.arange(8000, dtype=np.int16).reshape(-1, 1))
+
+    source = FileAudioSource(str(path), AudioConfig())
+
+    assert isinstance(source._samples, np.memmap)
+    assert source.native_samplerate == 16000
+    assert source.duration_ms == 500
+
+  @pytest.mark.asyncio
+  async def test_replay_matches_file(self, tmp_path):
+    """Test that replayed chunks carry the file's samples with live-style timestamps."""
+    path = tmp_path / "ramp.wav"
+    samples = np.arange(8000, dtype=np.int16).reshape(-1, 1)
+    _write_wav(path, samples)
+
+    source = FileAudioSource(str(path), AudioConfig(blocksize=1600, delivery="push"), speed=None)
+    chunks = await _record(source, 0.5)
+
+    data = np.frombuffer(b"".join(chunk.data for chunk in chunks), dtype=np.int16)
+    assert np.array_equal(data[:8000], samples[:, 0])
+    assert [chunk.timestamp_delta for chunk in chunks[:5]] == [100, 200, 300, 400, 500]
+
+    # A second recording replays the file from the start
+    again = await _record(source, 0.1)
+    assert again[0].data == chunks[0].data
+
+  def test_stereo_flac_is_downmixed(self, tmp_path):
+    """Test that formats other than PCM WAV are decoded and fitted to the configured channels."""
+    import soundfile as sf
+
+    path = tmp_path / "stereo.flac"
+    stereo = np.stack([np.full(1600, 1000), np.full(1600, 3000)], axis=1).astype(np.int16)
+    sf.write(str(path), stereo, 16000)
+
+    source = FileAudioSource(str(path), AudioConfig(channels=1))
+    block = source._read_frames(2000)
+
+    assert block.shape == (2000, 1)
+    assert block.dtype == np.int16
+    assert np.all(block[:1600] == 2000)
+    assert np.all(block[1600:] == 0)  # Silence after the end of the file
+
+  def test_loop(self, tmp_path):
+    """Test that looping replays wrap around to the start of the file."""
+    path = tmp_path / "short.wav"
+    _write_wav(path, np.arange(100, dtype=np.int16).reshape(-1, 1))
+
+    source = FileAudioSource(str(path), AudioConfig(), loop=True)
+    block = source._read_frames(250)
+
+    assert block[:, 0].tolist() == list(range(100)) * 2 + list(range(50))
+
+
+class TestSyntheticAudioSource:
+  """Test generated test signals."""
+
+  def test_speech_bursts(self):
+    """Test that the speech-like signal alternates between bursts and pauses."""
+    source = SyntheticAudioSource("speech", AudioConfig(), burst_ms=1000, pause_ms=500)
+    block = source._read_frames(48000).astype(np.float32)[:, 0]
+
+    rms = np.sqrt(np.mean(block.reshape(-1, 1600) ** 2, axis=1))  # 100ms frames
+    assert rms[1:9].min() > 300
+    assert rms[10:15].max() == 0
+    assert rms[16:24].min() > 300
+
+  def test_tone_level(self):
+    """Test that the tone peaks at the requested amplitude."""
+    source = SyntheticAudioSource("tone", AudioConfig(), amplitude=0.5)
+    block = source._read_frames(16000)
+
+    assert abs(int(np.abs(block).max()) - 16384) < 10
+
+  def test_rewind_is_deterministic(self):
+    """Test that noise restarts from the same seed on every recording."""
+    source = SyntheticAudioSource("noise", AudioConfig())
+    first = source._read_frames(1000)
+    source.rewind()
+
+    assert np.array_equal(source._read_frames(1000), first)
+
+  def test_unknown_signal(self):
+    """Test that unknown signal names are rejected."""
+    with pytest.raises(ValueError):
+      SyntheticAudioSource("chirp")
+
+  @pytest.mark.asyncio
+  async def test_real_time_pacing(self):
+    """Test that speed=1.0 paces blocks at real time and speed=None does not."""
+    start = time.monotonic()
+    await _record(SyntheticAudioSource("tone", AudioConfig(blocksize=800, delivery="push")), 0.3)
+    assert time.monotonic() - start >= 0.25
+
+    start = time.monotonic()
+    await _record(SyntheticAudioSource("tone", AudioConfig(blocksize=800, delivery="push"), speed=None), 3.0)
+    assert time.monotonic() - start < 1.0
+
+
+if __name__ == "__main__":
+  pytest.main([__file__, "-v"])
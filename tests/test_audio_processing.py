@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Tests for the audio processing stages.
+"""
+
+import numpy as np
+import pytest
+from reactivex.subject import Subject
+
+from lmnop_transcribe.audio_processing import (
+  AudioReframer,
+  Endpointer,
+  PolyphaseResampler,
+  SampleTrimmer,
+  Segmenter,
+  SilenceGate,
+  VoiceActivityDetector,
+  chunk_levels,
+  reframe_audio_chunks,
+  trim_audio_samples,
+)
+from lmnop_transcribe.common import AudioChunk
+
+
+def _chunk(ms: int, end_ms: float, rate: int = 16000) -> AudioChunk:
+  """Build a chunk of `ms` milliseconds of 16-bit mono silence ending at `end_ms`"""
+  return AudioChunk(data=bytes(rate * ms // 1000 * 2), timestamp_delta=end_ms)
+
+
+class TestAudioReframer:
+  """Test regrouping small blocks into network frames."""
+
+  def test_combines_small_blocks(self):
+    """Test that 10ms blocks are combined into 50ms frames."""
+    reframer = AudioReframer(frame_ms=50)
+
+    frames = []
+    for i in range(1, 11):
+      frames.extend(reframer.process(_chunk(10, i * 10)))
+
+    assert [len(frame.data) for frame in frames] == [1600, 1600]
+    assert [frame.timestamp_delta for frame in frames] == [50, 100]
+    assert reframer.flush() == []
+
+  def test_splits_large_blocks(self):
+    """Test that a block spanning several frames is split with interpolated timestamps."""
+    reframer = AudioReframer(frame_ms=40)
+
+    frames = reframer.process(_chunk(100, 100))
+
+    assert [len(frame.data) for frame in frames] == [1280, 1280]
+    assert [round(frame.timestamp_delta, 3) for frame in frames] == [40, 80]
+
+    tail = reframer.flush()
+    assert len(tail) == 1
+    assert len(tail[0].data) == 640
+    assert tail[0].timestamp_delta == 100
+
+  def test_operator_flushes_on_completion(self):
+    """Test that the Rx operator emits the partial last frame when the source completes."""
+    source = Subject()
+    results = []
+    source.pipe(reframe_audio_chunks(30)).subscribe(results.append)
+
+    for i in range(1, 5):
+      source.on_next(_chunk(20, i * 20))
+    assert [frame.timestamp_delta for frame in results] == [30, 60]
+
+    source.on_completed()
+    assert [frame.timestamp_delta for frame in results] == [30, 60, 80]
+    assert sum(len(frame.data) for frame in results) == 4 * 640
+
+
+class TestSampleTrimmer:
+  """Test trimming at exact sample offsets."""
+
+  @staticmethod
+  def _ramp_chunk(start_sample: int, frames: int) -> AudioChunk:
+    """Samples numbered by their position in the recording, ending at the right timestamp"""
+    data = np.arange(start_sample, start_sample + frames, dtype=np.int16).tobytes()
+    return AudioChunk(data=data, timestamp_delta=(start_sample + frames) / 16)
+
+  @pytest.mark.parametrize("block", [160, 1600, 16000])
+  def test_head_cut_is_independent_of_block_size(self, block):
+    """Test that the first kept sample is the one at head_ms, whatever the block size."""
+    trimmer = SampleTrimmer(head_ms=500)
+
+    output = []
+    for start in range(0, 16000, block):
+      output.extend(trimmer.process(self._ramp_chunk(start, block)))
+    samples = np.frombuffer(b"".join(chunk.data for chunk in output), dtype=np.int16)
+
+    assert samples[0] == 8000
+    assert len(samples) == 8000
+    assert output[-1].timestamp_delta == 1000
+
+  def test_tail_is_held_back_and_dropped(self):
+    """Test that the last tail_ms never leaves the trimmer."""
+    trimmer = SampleTrimmer(head_ms=0, tail_ms=50)
+
+    first = trimmer.process(self._ramp_chunk(0, 1600))
+    second = trimmer.process(self._ramp_chunk(1600, 1600))
+
+    assert len(first[0].data) // 2 == 800
+    assert first[0].timestamp_delta == 50
+    assert len(second[0].data) // 2 == 1600
+    assert second[0].timestamp_delta == 150
+    assert trimmer.flush() == []
+
+  def test_operator(self):
+    """Test trimming both ends through the Rx operator."""
+    source = Subject()
+    results = []
+    source.pipe(trim_audio_samples(25, 25)).subscribe(results.append)
+
+    for start in range(0, 3200, 800):
+      source.on_next(self._ramp_chunk(start, 800))
+    source.on_completed()
+
+    samples = np.frombuffer(b"".join(chunk.data for chunk in results), dtype=np.int16)
+    assert samples[0] == 400
+    assert samples[-1] == 2799
+
+
+class TestPolyphaseResampler:
+  """Test native-rate to 16kHz conversion."""
+
+  @staticmethod
+  def _tone(rate: int, freq: float, seconds: float = 1.0) -> np.ndarray:
+    t = np.arange(int(rate * seconds)) / rate
+    return (np.sin(2 * np.pi * freq * t) * 10000).astype(np.int16)
+
+  @pytest.mark.parametrize("in_rate", [44100, 48000])
+  def test_output_length_and_level(self, in_rate):
+    """Test that a 1kHz tone keeps its level and comes out at 16kHz."""
+    output = PolyphaseResampler(in_rate).resample(self._tone(in_rate, 1000))
+
+    assert len(output) == 16000
+    assert output.dtype == np.int16
+    assert 9500 < np.abs(output[200:-200]).max() < 10500
+
+  def test_streaming_matches_single_block(self):
+    """Test that carried state makes block-by-block output identical to one-shot output."""
+    tone = self._tone(44100, 440)
+    whole = PolyphaseResampler(44100).resample(tone)
+
+    resampler = PolyphaseResampler(44100)
+    step = 441 * 3 + 7  # Deliberately not aligned to the resampling ratio
+    streamed = np.concatenate([resampler.resample(tone[i : i + step]) for i in range(0, len(tone), step)])
+
+    assert np.array_equal(whole, streamed)
+
+  def test_rejects_aliasing(self):
+    """Test that content above the output Nyquist frequency is filtered out."""
+    output = PolyphaseResampler(48000).resample(self._tone(48000, 11000))
+    assert np.abs(output[200:]).max() < 50
+
+  def test_downmixes_chunks(self):
+    """Test that stereo chunks are downmixed to mono and keep their timestamps."""
+    tone = self._tone(48000, 1000, seconds=0.02)
+    stereo = np.stack([tone, np.zeros_like(tone)], axis=1)
+    resampler = PolyphaseResampler(48000, channels=2)
+
+    [chunk] = resampler.process(AudioChunk(data=stereo.tobytes(), timestamp_delta=20.0))
+
+    assert len(chunk.data) == 320 * 2
+    assert chunk.timestamp_delta == 20.0
+    assert np.abs(np.frombuffer(chunk.data, dtype=np.int16)[100:]).max() < 5500
+
+
+class TestVoiceActivityDetector:
+  """Test dropping non-speech audio."""
+
+  @staticmethod
+  def _voiced(seconds: float, rate: int = 16000) -> np.ndarray:
+    """A 150Hz harmonic series, loud and spectrally peaky like voiced speech"""
+    t = np.arange(int(rate * seconds)) / rate
+    return sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 6)) * 4000
+
+  @staticmethod
+  def _noise(seconds: float, level: float, rate: int = 16000, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(0, level, int(rate * seconds))
+
+  @staticmethod
+  def _run(vad: VoiceActivityDetector, signal: np.ndarray, block: int = 1600) -> list[AudioChunk]:
+    samples = np.clip(signal, -32768, 32767).astype(np.int16)
+    output = []
+    for start in range(0, len(samples), block):
+      data = samples[start : start + block]
+      output.extend(vad.process(AudioChunk(data=data.tobytes(), timestamp_delta=(start + len(data)) / 16)))
+    return output + vad.flush()
+
+  def test_trims_silence_with_padding(self):
+    """Test that silence is dropped except for the padding around speech."""
+    signal = np.concatenate([self._noise(1, 30), self._voiced(1), self._noise(1, 30, seed=1)])
+    signal[16000:32000] += self._noise(1, 30, seed=2)
+    vad = VoiceActivityDetector(hangover_ms=100, padding_ms=200)
+
+    output = self._run(vad, signal)
+
+    # Speech runs 1000-2000ms; 200ms padding before, 100ms hangover + 200ms padding after
+    assert output[0].timestamp_delta == pytest.approx(1100)
+    assert len(output[0].data) // 2 == 16000 * 300 // 1000  # Leading padding joined to the first block
+    assert output[-1].timestamp_delta == pytest.approx(2300)
+    assert sum(len(chunk.data) for chunk in output) // 2 == 16000 * 1500 // 1000
+    assert vad.kept_ms == 1500
+    assert vad.dropped_ms == 1500
+
+  def test_ignores_loud_noise(self):
+    """Test that loud but spectrally flat noise isn't mistaken for speech."""
+    vad = VoiceActivityDetector()
+    output = self._run(vad, np.concatenate([self._noise(0.5, 30), self._noise(1, 3000, seed=1)]))
+
+    assert output == []
+    assert vad.dropped_ms == 1500
+
+  def test_keeps_pause_shorter_than_hangover(self):
+    """Test that a short pause inside speech isn't cut out."""
+    signal = np.concatenate([self._voiced(0.5), np.zeros(1600), self._voiced(0.5)])
+    vad = VoiceActivityDetector(hangover_ms=300, padding_ms=0)
+
+    output = self._run(vad, signal)
+
+    assert sum(len(chunk.data) for chunk in output) // 2 == len(signal)
+
+
+class TestSilenceGate:
+  """Test holding back recordings with nothing speech-like in them."""
+
+  @staticmethod
+  def _chunk(samples: np.ndarray, ms: float) -> AudioChunk:
+    return AudioChunk(data=np.clip(samples, -32768, 32767).astype(np.int16).tobytes(), timestamp_delta=ms)
+
+  def test_chunk_levels(self):
+    """Test RMS and peak levels of a full-scale square wave and of silence."""
+    rms_db, peak_db = chunk_levels(self._chunk(np.tile([16384, -16384], 800), 100))
+    assert rms_db == pytest.approx(-6.02, abs=0.01)
+    assert peak_db == pytest.approx(-6.02, abs=0.01)
+    assert chunk_levels(self._chunk(np.zeros(1600), 100))[0] < -90
+
+  def test_releases_held_chunks_once_speech_like(self):
+    """Test that quiet chunks are held until a loud one arrives, then everything passes."""
+    gate = SilenceGate()
+    quiet = np.random.default_rng(0).normal(0, 30, 1600)
+    voiced = TestVoiceActivityDetector._voiced(0.1)
+
+    assert gate.process(self._chunk(quiet, 100)) == []
+    released = gate.process(self._chunk(voiced, 200))
+    assert [chunk.timestamp_delta for chunk in released] == [100, 200]
+    assert len(gate.process(self._chunk(quiet, 300))) == 1
+    assert gate.is_open
+
+  def test_drops_click_and_silence(self):
+    """Test that a lone key click doesn't count as speech, and nothing is released on flush."""
+    gate = SilenceGate()
+    click = np.zeros(16000)
+    click[8000:8010] = 20000
+
+    assert gate.process(self._chunk(np.zeros(16000), 1000)) == []
+    assert gate.process(self._chunk(click, 2000)) == []
+    assert gate.flush() == []
+    assert not gate.is_open
+    assert gate.max_peak_db > -5
+
+
+class TestEndpointer:
+  """Test detecting the end of an utterance."""
+
+  def test_endpoint_after_trailing_silence(self):
+    """Test that the endpoint is reached once silence has lasted long enough after speech."""
+    endpointer = Endpointer(silence_ms=500)
+    voiced = np.clip(TestVoiceActivityDetector._voiced(1), -32768, 32767).astype(np.int16)
+    signal = np.concatenate([np.zeros(8000, dtype=np.int16), voiced, np.zeros(16000, dtype=np.int16)])
+
+    at_endpoint = []
+    for start in range(0, len(signal), 1600):
+      chunk = AudioChunk(data=signal[start : start + 1600].tobytes(), timestamp_delta=(start + 1600) / 16)
+      at_endpoint.append((chunk.timestamp_delta, endpointer.update(chunk)))
+
+    # Speech ends at 1500ms, so the first endpoint is at 2000ms
+    assert [ms for ms, reached in at_endpoint if reached][0] == 2000
+    assert all(not reached for ms, reached in at_endpoint if ms < 2000)
+    assert endpointer.speech_ms == 1000
+
+  def test_no_endpoint_without_speech(self):
+    """Test that leading silence alone never counts as an endpoint."""
+    endpointer = Endpointer(silence_ms=100)
+    silence = np.zeros(1600, dtype=np.int16).tobytes()
+
+    chunks = [AudioChunk(data=silence, timestamp_delta=(i + 1) * 100) for i in range(20)]
+
+    assert not any(endpointer.update(chunk) for chunk in chunks)
+
+
+class TestSegmenter:
+  """Test choosing where to cut a recording into windows."""
+
+  @staticmethod
+  def _feed(segmenter, blocks):
+    """Feed 100ms blocks, returning the timestamps of the chunks that close a window"""
+    cuts = []
+    for i, block in enumerate(blocks):
+      chunk = AudioChunk(data=block.tobytes(), timestamp_delta=(i + 1) * 100)
+      if segmenter.update(chunk):
+        cuts.append(chunk.timestamp_delta)
+    return cuts
+
+  def test_short_pause_is_not_cut_before_minimum(self):
+    """Test that a pause early in a window doesn't close it."""
+    voiced = np.clip(TestVoiceActivityDetector._voiced(0.1), -32768, 32767).astype(np.int16)
+    silence = np.zeros(1600, dtype=np.int16)
+    segmenter = Segmenter(max_segment_ms=10000, min_segment_ms=2000, pause_ms=300)
+
+    # Pauses at 500ms and at 2500ms; only the second is late enough
+    blocks = [voiced] * 2 + [silence] * 4 + [voiced] * 16 + [silence] * 4
+    assert self._feed(segmenter, blocks) == [2500]
+    assert segmenter.segments == 1
+
+  def test_cut_at_maximum_without_pauses(self):
+    """Test that continuous speech is cut at the window limit."""
+    voiced = np.clip(TestVoiceActivityDetector._voiced(0.1), -32768, 32767).astype(np.int16)
+    segmenter = Segmenter(max_segment_ms=1000, min_segment_ms=500, pause_ms=300)
+
+    assert self._feed(segmenter, [voiced] * 35) == [1000, 2000, 3000]
+
+
+if __name__ == "__main__":
+  pytest.main([__file__, "-v"])
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-session audio store.
+"""
+
+import pytest
+
+from lmnop_transcribe.audio_store import SessionAudioStore
+
+
+class TestSessionAudioStore:
+  """Test chunk storage in memory and spilled to disk."""
+
+  def test_in_memory(self):
+    """Test that audio under the ceiling stays in memory and reads back by chunk."""
+    store = SessionAudioStore(max_memory_bytes=1024)
+    store.append(b"ab")
+    store.append(b"cde")
+
+    assert not store.spilled
+    assert len(store) == 2
+    assert store.nbytes == 5
+    assert list(store) == [b"ab", b"cde"]
+    assert store[-1] == b"cde"
+    assert store.read(1, 4) == b"bcd"
+
+  def test_spills_past_the_ceiling(self, tmp_path):
+    """Test that audio moves to a temporary file past the ceiling, and stays readable as it grows."""
+    store = SessionAudioStore(max_memory_bytes=10, spill_dir=str(tmp_path))
+    chunks = [bytes([i]) * 4 for i in range(5)]
+    for chunk in chunks[:3]:
+      store.append(chunk)
+
+    assert store.spilled
+    assert list(store) == chunks[:3]
+
+    for chunk in chunks[3:]:
+      store.append(chunk)
+    assert list(store) == chunks
+    assert store.read(2, 6) == b"\x00\x00\x01\x01"
+
+    store.close()
+    assert len(store) == 0
+    assert list(tmp_path.iterdir()) == []  # The temporary file was never linked
+
+  def test_index_out_of_range(self):
+    """Test that chunks past the end aren't read."""
+    store = SessionAudioStore()
+    store.append(b"ab")
+    with pytest.raises(IndexError):
+      store[1]
+
+
+if __name__ == "__main__":
+  pytest.main([__file__, "-v"])
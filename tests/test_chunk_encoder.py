@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for the pre-serialized audio-chunk encoder.
+"""
+
+import asyncio
+import io
+
+import pytest
+from wyoming.asr import Transcript
+from wyoming.audio import AudioChunk as WyomingAudioChunk
+from wyoming.event import async_read_event, async_write_event, write_event
+
+from lmnop_transcribe.chunk_encoder import AudioChunkEncoder, send_buffers
+from lmnop_transcribe.common import AudioChunk
+from lmnop_transcribe.transcription_service import TranscriptionService
+
+
+class TestAudioChunkEncoder:
+  """Test that the fast path puts the same bytes on the wire as write_event."""
+
+  @pytest.mark.parametrize("payload_length", [1, 320, 32000])
+  def test_matches_write_event(self, payload_length):
+    """Test byte-for-byte equality with the stock encoder."""
+    payload = bytes(range(256)) * (payload_length // 256) + bytes(payload_length % 256)
+    stock = io.BytesIO()
+    write_event(WyomingAudioChunk(rate=16000, width=2, channels=1, audio=payload).event(), stock)
+
+    assert b"".join(AudioChunkEncoder(16000, 2, 1).buffers(payload)) == stock.getvalue()
+
+  def test_payload_is_not_copied(self):
+    """Test that the payload buffer is passed through untouched."""
+    payload = b"\x01\x02" * 100
+    assert AudioChunkEncoder(16000, 2, 1).buffers(payload)[1] is payload
+
+  def test_send_buffers_resumes_partial_sends(self):
+    """Test that a short vectored write carries on from where it stopped."""
+
+    class TrickleSocket:
+      def __init__(self):
+        self.received = b""
+
+      def sendmsg(self, buffers):
+        data = b"".join(bytes(buffer) for buffer in buffers)[:3]
+        self.received += data
+        return len(data)
+
+    sock = TrickleSocket()
+    send_buffers(sock, [b"header\n", b"payload"])  # type: ignore[arg-type]
+    assert sock.received == b"header\npayload"
+
+
+class TestFastEncoderSession:
+  """Test a session sending with the fast encoder."""
+
+  @pytest.mark.asyncio
+  async def test_server_reads_fast_chunks(self):
+    """Test that a Wyoming server parses chunks sent through the fast path."""
+    payloads = []
+
+    async def handle(reader, writer):
+      while (event := await async_read_event(reader)) is not None:
+        if event.type == "audio-chunk":
+          payloads.append(event.payload)
+        elif event.type == "audio-stop":
+          await async_write_event(Transcript(text="ok").event(), writer)
+      writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    async with server:
+      address = f"127.0.0.1:{server.sockets[0].getsockname()[1]}"
+      session = TranscriptionService(address, rate=16000, fast_encoder=True).create_async_session("s1")
+      await session.begin_session()
+      await session.add_chunk(AudioChunk(data=b"\x01\x00" * 160, timestamp_delta=10))
+      await session.add_chunk(AudioChunk(data=b"\x02\x00" * 160, timestamp_delta=20))
+
+      assert await session.end_session() == "ok"
+      assert payloads == [b"\x01\x00" * 160, b"\x02\x00" * 160]
+
+
+if __name__ == "__main__":
+  pytest.main([__file__, "-v"])
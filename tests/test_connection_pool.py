@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for the pre-connected Wyoming connection pool.
+"""
+
+import asyncio
+
+import pytest
+
+from lmnop_transcribe.common import AudioChunk
+from lmnop_transcribe.connection_pool import WyomingConnectionPool
+from lmnop_transcribe.transcription_service import TranscriptionService
+
+
+async def wait_for_idle(pool: WyomingConnectionPool, count: int) -> None:
+  while pool.idle_count < count:
+    await asyncio.sleep(0.01)
+
+
+class TestWyomingConnectionPool:
+  """Test keeping connections open ahead of sessions."""
+
+  @pytest.mark.asyncio
+  async def test_acquire_hands_out_idle_connection_and_replaces_it(self, wyoming_server):
+    """Test that a pre-opened connection is handed out and a new one opened in its place."""
+    server = await wyoming_server()
+    async with server:
+      pool = WyomingConnectionPool(server.address, size=2)
+      await pool.start()
+      await asyncio.wait_for(wait_for_idle(pool, 2), timeout=2)
+
+      connection = await pool.acquire()
+      assert connection.is_usable
+      assert pool.hits == 1
+      await asyncio.wait_for(wait_for_idle(pool, 2), timeout=2)
+      assert len(server.connections) == 3
+
+      await connection.close()
+      await pool.close()
+      assert pool.idle_count == 0
+
+  @pytest.mark.asyncio
+  async def test_connects_directly_when_nothing_is_idle(self, wyoming_server):
+    """Test that acquire still works before the pool has filled."""
+    server = await wyoming_server()
+    async with server:
+      pool = WyomingConnectionPool(server.address)
+
+      connection = await pool.acquire()
+      assert connection.is_usable
+      assert pool.misses == 1
+      await connection.close()
+
+  @pytest.mark.asyncio
+  async def test_unhealthy_connections_are_replaced(self, wyoming_server):
+    """Test that idle connections the server stops answering on are dropped."""
+    server = await wyoming_server(answer_describe=False)
+    async with server:
+      pool = WyomingConnectionPool(server.address, health_check_interval=0.05, probe_timeout=0.05)
+      await pool.start()
+      await asyncio.wait_for(wait_for_idle(pool, 1), timeout=2)
+
+      while len(server.connections) < 2:
+        await asyncio.sleep(0.01)
+      await pool.close()
+
+  @pytest.mark.asyncio
+  @pytest.mark.parametrize(
+    "reply",
+    [b"not json\n", b'{"type": "info", "data_length": 64}\n{"truncated"'],
+    ids=["malformed", "truncated"],
+  )
+  async def test_bad_probe_answers_are_replaced(self, wyoming_server, reply):
+    """Test that a garbled answer to a probe drops the connection and keeps the pool maintained."""
+    server = await wyoming_server(describe_reply=reply)
+    async with server:
+      pool = WyomingConnectionPool(server.address, health_check_interval=0.05, probe_timeout=0.5)
+      await pool.start()
+
+      # Each check replaces the connection, so this only gets far if maintenance carries on
+      await asyncio.wait_for(server.wait_for_connections(4), timeout=2)
+      assert pool._task is not None and not pool._task.done()
+      await pool.close()
+
+  @pytest.mark.asyncio
+  async def test_session_uses_pooled_connection(self, wyoming_server):
+    """Test that async sessions start on a pooled connection."""
+    server = await wyoming_server()
+    async with server:
+      service = TranscriptionService(server.address, rate=16000, pool_size=1)
+      await service.start()
+      pool = service.pools[server.address]
+      await asyncio.wait_for(wait_for_idle(pool, 1), timeout=2)
+
+      session = service.create_async_session("test123")
+      await session.begin_session()
+      await session.add_chunk(AudioChunk(data=b"\x00\x00", timestamp_delta=100))
+      result = await session.end_session()
+
+      assert result == "ok"
+      assert pool.hits == 1
+      await service.close()
+
+
+if __name__ == "__main__":
+  pytest.main([__file__, "-v"])
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Tests for the cached audio device registry.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from lmnop_transcribe.device_registry import AudioDeviceRegistry
+
+DEVICES = [
+  {
+    "name": "HDA Intel PCH: ALC295 Analog (hw:0,0)",
+    "index": 0,
+    "hostapi": 0,
+    "max_input_channels": 2,
+    "default_samplerate": 48000.0,
+    "default_low_input_latency": 0.005,
+    "default_high_input_latency": 0.03,
+  },
+  {
+    "name": "HDMI 0 (hw:0,3)",
+    "index": 1,
+    "hostapi": 0,
+    "max_input_channels": 0,
+    "default_samplerate": 48000.0,
+    "default_low_input_latency": -1,
+    "default_high_input_latency": -1,
+  },
+  {
+    "name": "Blue Yeti: USB Audio (hw:2,0)",
+    "index": 2,
+    "hostapi": 0,
+    "max_input_channels": 2,
+    "default_samplerate": 44100.0,
+    "default_low_input_latency": 0.008,
+    "default_high_input_latency": 0.04,
+  },
+  {
+    "name": "default",
+    "index": 3,
+    "hostapi": 0,
+    "max_input_channels": 32,
+    "default_samplerate": 44100.0,
+    "default_low_input_latency": 0.008,
+    "default_high_input_latency": 0.03,
+  },
+]
+
+
+@pytest.fixture
+def mock_sd():
+  """Provide a mock sounddevice module"""
+  sd = MagicMock()
+  sd.query_devices.return_value = DEVICES
+  sd.default.device = [3, 3]
+  with patch.dict("sys.modules", {"sounddevice": sd}):
+    yield sd
+
+
+@pytest.fixture
+def snd_dir(tmp_path):
+  """A stand-in for /dev/snd"""
+  (tmp_path / "pcmC0D0c").touch()
+  return tmp_path
+
+
+class TestAudioDeviceRegistry:
+  """Test AudioDeviceRegistry behavior."""
+
+  def test_enumerates_input_devices_once(self, mock_sd, snd_dir):
+    """Test that only input devices are listed and PortAudio is queried once."""
+    registry = AudioDeviceRegistry(hotplug_path=str(snd_dir))
+
+    names = [device.name for device in registry.devices()]
+    registry.devices()
+    registry.find("default")
+
+    assert "HDMI 0 (hw:0,3)" not in names
+    assert len(names) == 3
+    assert mock_sd.query_devices.call_count == 1
+
+  def test_refreshes_only_on_hotplug(self, mock_sd, snd_dir):
+    """Test that PortAudio is re-initialized only when device nodes change."""
+    registry = AudioDeviceRegistry(hotplug_path=str(snd_dir))
+    registry.devices()
+
+    assert registry.refresh() is False
+    mock_sd._terminate.assert_not_called()
+
+    (snd_dir / "pcmC2D0c").touch()
+    assert registry.refresh() is True
+    mock_sd._terminate.assert_called_once()
+    mock_sd._initialize.assert_called_once()
+    assert mock_sd.query_devices.call_count == 2
+
+  def test_keeps_devices_without_reinitialize(self, mock_sd, snd_dir):
+    """Test that the cached devices are kept when PortAudio can't be re-initialized."""
+    del mock_sd._terminate
+    registry = AudioDeviceRegistry(hotplug_path=str(snd_dir))
+    names = [device.name for device in registry.devices()]
+
+    (snd_dir / "pcmC2D0c").touch()
+    assert registry.refresh() is False
+    assert registry.refresh() is False
+    assert [device.name for device in registry.devices()] == names
+    assert mock_sd.query_devices.call_count == 1
+
+  def test_find(self, mock_sd, snd_dir):
+    """Test lookup by index, exact name, substring and PortAudio default."""
+    registry = AudioDeviceRegistry(hotplug_path=str(snd_dir))
+
+    assert registry.find(2).name.startswith("Blue Yeti")
+    assert registry.find("default").index == 3
+    assert registry.find("alc295").index == 0
+    assert registry.find(None).index == 3
+    with pytest.raises(ValueError):
+      registry.find("Nonexistent")
+
+  def test_select_by_patterns(self, mock_sd, snd_dir):
+    """Test that patterns are tried in order before falling back."""
+    registry = AudioDeviceRegistry(hotplug_path=str(snd_dir))
+
+    assert registry.select((r"yeti", r"ALC\d+")).index == 2
+    assert registry.select((r"^USB headset", r"ALC\d+")).index == 0
+    assert registry.select((r"^USB headset",), fallback="default").index == 3
+
+  def test_supported_samplerates_are_cached(self, mock_sd, snd_dir):
+    """Test that sample rates are probed once per device."""
+
+    def check_input_settings(device=None, samplerate=None):
+      if samplerate not in (16000, 48000):
+        raise ValueError("Invalid sample rate")
+
+    mock_sd.check_input_settings.side_effect = check_input_settings
+    registry = AudioDeviceRegistry(hotplug_path=str(snd_dir))
+    device = registry.find(0)
+
+    assert registry.supported_samplerates(device) == (16000, 48000)
+    probes = mock_sd.check_input_settings.call_count
+    assert registry.supported_samplerates(device) == (16000, 48000)
+    assert mock_sd.check_input_settings.call_count == probes
+
+
+if __name__ == "__main__":
+  pytest.main([__file__, "-v"])
@@ -1,17 +1,52 @@
 #!/usr/bin/env python3
 """
 Integration tests for transcription service with the pipeline.
-Tests the actual integration without requiring Wyoming server.
+Tests the actual integration without requiring a real Wyoming server.
 """
 
 import asyncio
+import contextlib
 import os
 import tempfile
 from unittest.mock import Mock, patch
 
 import pytest
+from reactivex.subject import Subject
+
+from lmnop_transcribe.pipeline import KeyPressEvent, async_main
+
+
+async def _record_synthetic_speech(server, config, seconds: float, **options) -> None:
+  """Run async_main on synthetic speech against `server`, holding the key for `seconds`"""
+  from lmnop_transcribe import pipeline as pipeline_module
+
+  with (
+    patch.object(pipeline_module, "config", config),
+    patch.object(pipeline_module, "key_press_events", Subject()),
+  ):
+    ready = asyncio.Event()
+    main = asyncio.create_task(
+      async_main(
+        use_real_audio=True,
+        synthetic_audio="speech",
+        wyoming_server=server.address,
+        capture_block_ms=20,
+        on_ready=ready.set,
+        **options,
+      )
+    )
+    await ready.wait()
 
-from lmnop_transcribe.pipeline import async_main
+    pipeline_module.key_press_events.on_next(KeyPressEvent(key="play_key", timestamp_delta=0))
+    await asyncio.sleep(seconds)
+    pipeline_module.key_press_events.on_next(KeyPressEvent(key="stop_key", timestamp_delta=seconds * 1000))
+    for _ in range(50):
+      if any(event.type == "audio-stop" for event in server.received):
+        break
+      await asyncio.sleep(0.1)
+    main.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+      await main
 
 
 class TestTranscriptionIntegration:
@@ -71,6 +106,65 @@ class TestTranscriptionIntegration:
               # Also expected in mock mode
               pass
 
+  @pytest.mark.asyncio
+  async def test_pipeline_sends_reframed_tail(self, wyoming_server):
+    """Test that the partial frame the reframer flushes at the key release still reaches the server."""
+    from lmnop_transcribe import pipeline as pipeline_module
+
+    async with await wyoming_server() as server:
+      # A 300ms frame is far more than the mock recording's audio, so it's all in the flushed frame
+      with (
+        patch.object(pipeline_module, "config", pipeline_module.Config(minimum_recording_ms=0)),
+        patch.object(pipeline_module, "key_press_events", Subject()),
+        patch.object(pipeline_module, "audio_chunks", Subject()),
+      ):
+        await async_main(use_real_audio=False, wyoming_server=server.address, network_frame_ms=300)
+
+    types = [event.type for event in server.received if event.type != "describe"]
+    assert types[:2] == ["transcribe", "audio-start"] and types[-1] == "audio-stop"
+    audio = [event.payload for event in server.received if event.type == "audio-chunk"]
+    assert audio and set(audio) == {b"".join(f"chunk_{i}".encode() for i in range(5))}
+
+  @pytest.mark.asyncio
+  async def test_pipeline_sends_flushed_vad_tail(self, wyoming_server):
+    """Test that the audio the VAD and reframer hold back until the key release reaches the server."""
+    from lmnop_transcribe import pipeline as pipeline_module
+    from lmnop_transcribe.audio_processing import VoiceActivityDetector
+
+    detectors: list[VoiceActivityDetector] = []
+
+    class TrackedDetector(VoiceActivityDetector):
+      def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        detectors.append(self)
+
+    # The frame that releases the buffer is streamed too; trimming it from the release sends it once
+    config = pipeline_module.Config(minimum_recording_ms=0, trim_duration_ms=1000)
+    async with await wyoming_server() as server:
+      with patch("lmnop_transcribe.audio_processing.VoiceActivityDetector", TrackedDetector):
+        # Released mid-burst, so the detector still has speech pending when the recording ends
+        await _record_synthetic_speech(server, config, 0.9, network_frame_ms=300, vad=True)
+
+    sent = sum(len(event.payload) for event in server.received if event.type == "audio-chunk")
+    assert len(detectors) == 1 and detectors[0].kept_samples > 0
+    assert sent == detectors[0].kept_samples * 2
+
+  @pytest.mark.asyncio
+  async def test_pipeline_reports_audio_after_endpoint(self, wyoming_server):
+    """Test that what's recorded after an endpoint, and so never sent, is reported at the key release."""
+    from lmnop_transcribe import pipeline as pipeline_module
+    from lmnop_transcribe.telemetry import RESPONSE_BUCKETS_MS, metrics
+
+    left_out = metrics.histogram("transcription.after_endpoint_ms", RESPONSE_BUCKETS_MS)
+    left_out.reset()
+    config = pipeline_module.Config(minimum_recording_ms=0, trim_duration_ms=0)
+    async with await wyoming_server() as server:
+      # The first 1200ms burst is followed by a pause long enough to end-point on
+      await _record_synthetic_speech(server, config, 2.0, endpoint_silence_ms=300)
+
+    assert left_out.count == 1
+    assert 0 < left_out.max < 1000
+
   def test_transcription_service_session_creation(self):
     """Test that TranscriptionService creates sessions properly."""
     mock_wyoming_modules = {
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Tests for routing sessions across several Wyoming servers.
+"""
+
+import asyncio
+import contextlib
+
+import pytest
+
+from lmnop_transcribe.common import AudioChunk
+from lmnop_transcribe.load_balancer import WyomingLoadBalancer
+from lmnop_transcribe.transcription_service import TranscriptionService
+
+
+class TestWyomingLoadBalancer:
+  """Test server selection and ejection."""
+
+  def test_least_outstanding(self):
+    """Test that sessions go to the server with the fewest in flight."""
+    balancer = WyomingLoadBalancer(["a:1", "b:2"])
+
+    first = balancer.choose()
+    balancer.session_started(first)
+    second = balancer.choose()
+    balancer.session_started(second)
+
+    assert {first.address, second.address} == {"a:1", "b:2"}
+    balancer.session_finished(second, ok=True, response_ms=200)
+    assert balancer.choose() is second
+
+  def test_latency_weighted(self):
+    """Test that a much faster server takes more sessions than a slow one."""
+    balancer = WyomingLoadBalancer(["fast:1", "slow:2"], strategy="latency")
+    fast, slow = balancer.servers
+    fast.observe_response(100)
+    slow.observe_response(1000)
+
+    fast.outstanding = 3
+    assert balancer.choose() is fast  # 4 x 100ms beats 1 x 1000ms
+    fast.outstanding = 10
+    assert balancer.choose() is slow
+
+  def test_ejects_failing_server_until_healthy(self):
+    """Test that repeated failures take a server out of rotation and success brings it back."""
+    balancer = WyomingLoadBalancer(["a:1", "b:2"], eject_after=2)
+    a, b = balancer.servers
+    b.outstanding = 5
+
+    for _ in range(2):
+      balancer.session_started(a)
+      balancer.session_finished(a, ok=False)
+
+    assert a.is_ejected
+    assert balancer.choose() is b
+    assert balancer.stats()["a:1"]["ejected"]
+
+    balancer._record_result(a, ok=True)
+    assert balancer.choose() is a
+
+  def test_unknown_strategy(self):
+    """Test that a misspelt routing strategy is rejected."""
+    with pytest.raises(ValueError):
+      WyomingLoadBalancer(["a:1"], strategy="random")
+
+
+class TestProbing:
+  """Test the background health probes."""
+
+  @pytest.mark.asyncio
+  async def test_bad_answer_only_fails_that_server(self, wyoming_server):
+    """Test that a server answering probes with garbage is ejected while the others stay probed."""
+    async with await wyoming_server(describe_reply=b'{"type": "info", "data_length": 64}\n') as bad:
+      async with await wyoming_server() as good:
+        balancer = WyomingLoadBalancer([bad.address, good.address], probe_interval=0.02, eject_after=2)
+        await balancer.start()
+        await asyncio.wait_for(good.wait_for_connections(3), timeout=2)
+
+        assert balancer._task is not None and not balancer._task.done()
+        bad_server, good_server = balancer.servers
+        assert bad_server.is_ejected
+        assert not good_server.is_ejected and good_server.probe_ms.count >= 3
+        await balancer.close()
+
+
+class TestTranscriptionServiceRouting:
+  """Test sessions spread over live servers."""
+
+  @pytest.mark.asyncio
+  async def test_sessions_spread_and_failures_tracked(self, wyoming_server):
+    """Test that concurrent sessions use both servers, and a down server gets ejected by probes."""
+    server_a = await wyoming_server()
+    server_b = await wyoming_server()
+    address_a, address_b = server_a.address, server_b.address
+    async with server_a, server_b:
+      service = TranscriptionService(f"{address_a}, {address_b}", rate=16000)
+      assert service.server_addresses == [address_a, address_b]
+
+      sessions = [service.create_async_session(f"s{i}") for i in range(2)]
+      assert {session.wyoming_server_address for session in sessions} == {address_a, address_b}
+
+      for session in sessions:
+        await session.begin_session()
+        await session.add_chunk(AudioChunk(data=b"\x00\x00", timestamp_delta=100))
+      assert [await session.end_session() for session in sessions] == ["ok", "ok"]
+
+      stats = service.server_stats()
+      assert stats[address_a]["outstanding"] == stats[address_b]["outstanding"] == 0
+      assert stats[address_a]["response_ms"]["count"] >= 1
+
+    # Both servers are down now; probes fail until they're ejected
+    assert service.balancer is not None
+    for _ in range(service.balancer.eject_after):
+      assert not await service.balancer.probe(service.balancer.servers[0])
+    assert service.server_stats()[address_a]["ejected"]
+
+
+class TestHedging:
+  """Test replaying audio to a second server when the first is slow."""
+
+  @pytest.mark.asyncio
+  async def test_slow_server_is_hedged(self, wyoming_server):
+    """Test that the second server's transcript wins when the first stalls."""
+    from lmnop_transcribe.telemetry import metrics
+
+    slow = await wyoming_server(text="slow", delay=0.5)
+    fast = await wyoming_server(text="fast")
+    slow_address, fast_address = slow.address, fast.address
+    async with slow, fast:
+      service = TranscriptionService(
+        f"{slow_address},{fast_address}", rate=16000, hedge_quantile=0.95, hedge_after_ms=50
+      )
+      wins = metrics.counter("transcription.hedge_wins").value
+
+      session = service.create_async_session("s1")
+      assert session.wyoming_server_address == slow_address
+      await session.begin_session()
+      await session.add_chunk(AudioChunk(data=b"\x00\x00" * 160, timestamp_delta=10))
+
+      assert await asyncio.wait_for(session.end_session(), timeout=0.4) == "fast"
+      assert metrics.counter("transcription.hedge_wins").value == wins + 1
+      # The slow server was charged for its wait, and nothing is left in flight
+      stats = service.server_stats()
+      assert stats[slow_address]["response_ms"]["count"] >= 1
+      assert stats[slow_address]["outstanding"] == stats[fast_address]["outstanding"] == 0
+
+  @pytest.mark.asyncio
+  async def test_hedge_losing_mid_replay_is_cleaned_up(self, wyoming_server):
+    """Test that a hedge cancelled while still replaying closes its connection and isn't left in flight."""
+    stalled_connections = []
+    finished = asyncio.Event()
+
+    async def stalled(reader, writer):
+      # Accepts the connection but never reads, so the replay backs up
+      stalled_connections.append(reader)
+      with contextlib.suppress(asyncio.TimeoutError):
+        await asyncio.wait_for(finished.wait(), timeout=5)
+
+    primary = await wyoming_server(text="primary", delay=0.2)
+    primary_address = primary.address
+    hedge = await asyncio.start_server(stalled, "127.0.0.1", 0)
+    hedge_address = f"127.0.0.1:{hedge.sockets[0].getsockname()[1]}"
+    async with primary, hedge:
+      service = TranscriptionService(
+        f"{primary_address},{hedge_address}", rate=16000, hedge_quantile=0.95, hedge_after_ms=50
+      )
+      session = service.create_async_session("s1")
+      assert session.wyoming_server_address == primary_address
+      await session.begin_session()
+      # Far more than the socket buffers hold, so the replay is still being written
+      await session.add_chunk(AudioChunk(data=bytes(32 * 1024 * 1024), timestamp_delta=10))
+
+      assert await asyncio.wait_for(session.end_session(), timeout=2) == "primary"
+      assert service.server_stats()[primary_address]["outstanding"] == 0
+      # The cancelled hedge finishes in the background
+      for _ in range(100):
+        if service.server_stats()[hedge_address]["outstanding"] == 0:
+          break
+        await asyncio.sleep(0.01)
+      assert service.server_stats()[hedge_address]["outstanding"] == 0
+
+      # and its connection was closed
+      assert stalled_connections
+      with contextlib.suppress(ConnectionResetError):
+        await asyncio.wait_for(stalled_connections[0].read(), timeout=2)
+      finished.set()
+
+  @pytest.mark.asyncio
+  async def test_prompt_server_is_not_hedged(self, wyoming_server):
+    """Test that nothing is replayed when the transcript arrives before the deadline."""
+    from lmnop_transcribe.telemetry import metrics
+
+    first = await wyoming_server(text="first")
+    second = await wyoming_server(text="second")
+    first_address, second_address = first.address, second.address
+    async with first, second:
+      service = TranscriptionService(f"{first_address},{second_address}", rate=16000, hedge_quantile=0.95)
+      hedges = metrics.counter("transcription.hedges").value
+
+      session = service.create_async_session("s1")
+      await session.begin_session()
+      await session.add_chunk(AudioChunk(data=b"\x00\x00", timestamp_delta=10))
+
+      assert await session.end_session() == "first"
+      assert metrics.counter("transcription.hedges").value == hedges
+
+
+if __name__ == "__main__":
+  pytest.main([__file__, "-v"])
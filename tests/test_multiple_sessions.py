@@ -20,7 +20,7 @@ with patch.dict("sys.modules", mock_wyoming_modules):
   from reactivex.subject import Subject
 
   from lmnop_transcribe.common import KeyPressEvent
-  from lmnop_transcribe.pipeline import active_sessions, create_pipeline
+  from lmnop_transcribe.pipeline import create_pipeline
   from lmnop_transcribe.transcription_service import TranscriptionService
 
 
@@ -31,9 +31,6 @@ async def test_multiple_sessions():
 
   print("🧪 Testing multiple transcription sessions...")
 
-  # Clear any existing sessions
-  active_sessions.clear()
-
   # Create mocks for Wyoming
   with (
     patch("lmnop_transcribe.transcription_service.socket.create_connection") as mock_conn,
@@ -70,6 +67,8 @@ async def test_multiple_sessions():
         scheduler, transcription_service, key_events_source=key_press_events, use_real_audio=False
       )
 
+      active_sessions = pipeline["sessions"]
+
       # Subscribe to events for debugging
       pipeline["recording_state"].subscribe(lambda state: print(f"📊 State: {state}"), scheduler=scheduler)
 
@@ -88,7 +87,7 @@ async def test_multiple_sessions():
 
       print(f"🔢 Active sessions after first play: {len(active_sessions)}")
       assert len(active_sessions) == 1, f"Expected 1 session, got {len(active_sessions)}"
-      first_session_id = list(active_sessions.keys())[0]
+      first_session_id = next(iter(active_sessions)).id
       print(f"✅ First session created: {first_session_id}")
 
       # Stop first session
@@ -105,7 +104,7 @@ async def test_multiple_sessions():
 
       print(f"🔢 Active sessions after second play: {len(active_sessions)}")
       assert len(active_sessions) == 1, f"Expected 1 session, got {len(active_sessions)}"
-      second_session_id = list(active_sessions.keys())[0]
+      second_session_id = next(iter(active_sessions)).id
       print(f"✅ Second session created: {second_session_id}")
 
       # Verify sessions have different IDs
@@ -130,7 +129,7 @@ async def test_multiple_sessions():
       print(f"🔢 Active sessions with overlap: {len(active_sessions)}")
       assert len(active_sessions) == 2, f"Expected 2 overlapping sessions, got {len(active_sessions)}"
 
-      session_ids = list(active_sessions.keys())
+      session_ids = [managed.id for managed in active_sessions]
       print(f"✅ Overlapping sessions: {session_ids}")
 
       # Clean up
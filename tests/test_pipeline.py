@@ -36,6 +36,25 @@ class _TestRecordingStateType(TypedDict):
   action: str | None
 
 
+def _voiced_and_silent_blocks(rate: int = 16000):
+  """100ms of a voiced, speech-like harmonic series and 100ms of silence, as int16 blocks"""
+  import numpy as np
+
+  t = np.arange(rate // 10) / rate
+  voiced = (sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 6)) * 4000).astype(np.int16)
+  return voiced, np.zeros(rate // 10, dtype=np.int16)
+
+
+def _record_blocks(key_press_events: Subject, blocks: list, stop_at: float) -> None:
+  """Press the key, feed `blocks` to the mock audio source as consecutive 100ms chunks, release it"""
+  from lmnop_transcribe import pipeline as pipeline_module
+
+  key_press_events.on_next(KeyPressEvent(key="play_key", timestamp_delta=0))
+  for i, block in enumerate(blocks):
+    pipeline_module.audio_chunks.on_next(AudioChunk(data=block.tobytes(), timestamp_delta=(i + 1) * 100))
+  key_press_events.on_next(KeyPressEvent(key="stop_key", timestamp_delta=stop_at))
+
+
 class TestAudioPipeline:
   """Test suite for the audio transcription pipeline."""
 
@@ -337,6 +356,137 @@ class TestAudioPipeline:
     assert "transcription_stream" in pipeline
     assert pipeline["audio_source_instance"] is None  # Mock mode
 
+  @pytest.mark.asyncio
+  async def test_vad_drops_silence_and_reports_savings(self):
+    """Test that the VAD stage leaves out silence and reports it when the recording ends."""
+    from unittest.mock import patch
+
+    from lmnop_transcribe import pipeline as pipeline_module
+
+    scheduler = AsyncIOScheduler(asyncio.get_event_loop())
+    with (
+      patch.object(pipeline_module.config, "vad_enabled", True),
+      patch.object(pipeline_module.config, "minimum_recording_ms", 0),
+      patch.object(pipeline_module.config, "trim_duration_ms", 0),
+    ):
+      pipeline = create_pipeline(
+        scheduler, Mock(), key_events_source=self.key_press_events, use_real_audio=False
+      )
+      events = []
+      pipeline["transcription_stream"].subscribe(events.append)
+
+      voiced, silence = _voiced_and_silent_blocks()
+
+      _record_blocks(self.key_press_events, [silence] * 10 + [voiced] * 10 + [silence] * 10, stop_at=3000)
+
+    sent = [chunk for e in events if e["type"] == "buffer_release" for chunk in e["chunks"]]
+    sent += [e["chunk"] for e in events if e["type"] == "stream_chunk"]
+    summary, end = events[-2:]
+
+    assert end["type"] == "recording_end"
+    assert summary["type"] == "vad_summary"
+    assert summary["recording_id"] == 0
+    assert summary["kept_ms"] == 1700  # 1s of speech, 200ms padding, 300ms hangover + 200ms padding
+    assert summary["dropped_ms"] == 1300
+    # Nothing from the leading or trailing silence beyond the padding was sent
+    assert min(chunk.timestamp_delta for chunk in sent) == 1100
+    assert max(chunk.timestamp_delta for chunk in sent) == 2500
+
+  @pytest.mark.asyncio
+  async def test_endpoint_stops_streaming_on_trailing_silence(self):
+    """Test that sustained silence after speech ends the stream with an endpoint event."""
+    from unittest.mock import patch
+
+    from lmnop_transcribe import pipeline as pipeline_module
+
+    scheduler = AsyncIOScheduler(asyncio.get_event_loop())
+    with (
+      patch.object(pipeline_module.config, "endpoint_silence_ms", 500),
+      patch.object(pipeline_module.config, "minimum_recording_ms", 0),
+      patch.object(pipeline_module.config, "trim_duration_ms", 0),
+    ):
+      pipeline = create_pipeline(
+        scheduler, Mock(), key_events_source=self.key_press_events, use_real_audio=False
+      )
+      events = []
+      pipeline["transcription_stream"].subscribe(events.append)
+
+      voiced, silence = _voiced_and_silent_blocks()
+
+      _record_blocks(self.key_press_events, [voiced] * 10 + [silence] * 10, stop_at=3000)
+
+    streamed = [e["chunk"].timestamp_delta for e in events if e["type"] == "stream_chunk"]
+    endpoint = events[-2]
+
+    assert endpoint["type"] == "endpoint"
+    assert endpoint["timestamp_delta"] == 1500
+    assert endpoint["recording_id"] == 0
+    # Silence after the endpoint isn't streamed
+    assert max(streamed) == 1400
+
+  @pytest.mark.asyncio
+  async def test_segment_boundaries_at_pauses(self):
+    """Test that a long recording is cut into windows at the pauses between phrases."""
+    from unittest.mock import patch
+
+    from lmnop_transcribe import pipeline as pipeline_module
+
+    scheduler = AsyncIOScheduler(asyncio.get_event_loop())
+    with (
+      patch.object(pipeline_module.config, "segment_max_ms", 3000),
+      patch.object(pipeline_module.config, "segment_min_ms", 1000),
+      patch.object(pipeline_module.config, "segment_pause_ms", 300),
+      patch.object(pipeline_module.config, "minimum_recording_ms", 0),
+      patch.object(pipeline_module.config, "trim_duration_ms", 0),
+    ):
+      pipeline = create_pipeline(
+        scheduler, Mock(), key_events_source=self.key_press_events, use_real_audio=False
+      )
+      events = []
+      pipeline["transcription_stream"].subscribe(events.append)
+
+      voiced, silence = _voiced_and_silent_blocks()
+
+      # A phrase and a pause, then speech with no pause at all
+      blocks = [voiced] * 12 + [silence] * 4 + [voiced] * 40
+      _record_blocks(self.key_press_events, blocks, stop_at=6000)
+
+    boundaries = [e for e in events if e["type"] == "segment_boundary"]
+    # Cut once the pause reaches 300ms, then at the 3s limit
+    assert [(b["segment"], b["timestamp_delta"]) for b in boundaries] == [(1, 1500), (2, 4500)]
+    # Every chunk is still streamed, and each boundary follows the chunk it closes
+    assert len([e for e in events if e["type"] == "stream_chunk"]) == len(blocks)
+    for boundary in boundaries:
+      before = events[events.index(boundary) - 1]
+      assert before["chunk"].timestamp_delta == boundary["timestamp_delta"]
+
+  @pytest.mark.asyncio
+  async def test_silent_recording_sends_nothing(self):
+    """Test that a recording with nothing speech-like in it is held back entirely."""
+    from unittest.mock import patch
+
+    import numpy as np
+
+    from lmnop_transcribe import pipeline as pipeline_module
+
+    scheduler = AsyncIOScheduler(asyncio.get_event_loop())
+    with (
+      patch.object(pipeline_module.config, "skip_silent_recordings", True),
+      patch.object(pipeline_module.config, "minimum_recording_ms", 0),
+    ):
+      pipeline = create_pipeline(
+        scheduler, Mock(), key_events_source=self.key_press_events, use_real_audio=False
+      )
+      events = []
+      pipeline["transcription_stream"].subscribe(events.append)
+
+      hiss = np.random.default_rng(0).normal(0, 20, 1600).astype(np.int16)
+      _record_blocks(self.key_press_events, [hiss] * 20, stop_at=2000)
+
+    assert [e["type"] for e in events] == ["level_summary", "recording_end"]
+    assert events[0]["speech_like"] is False
+    assert events[0]["max_rms_db"] < -45
+
   @pytest.mark.asyncio
   async def test_streaming_transcription_logic(self):
     """Test the streaming transcription buffer release and streaming logic."""
@@ -475,6 +625,116 @@ class TestAudioSource:
     # No chunks should be emitted without starting recording
     assert not subscription_called
 
+  @pytest.mark.asyncio
+  async def test_audio_source_push_delivery(self):
+    """Test that push delivery emits chunks as soon as the callback fires."""
+    import time
+
+    import numpy as np
+
+    from lmnop_transcribe.audio_source import AudioConfig, AudioSource
+
+    audio_source = AudioSource(AudioConfig(delivery="push"))
+    received = []
+    audio_source.create_audio_observable().subscribe(on_next=received.append)
+
+    # Simulate an active recording without opening a device
+    audio_source._is_recording = True
+    audio_source._recording_start_time = time.time() * 1000
+    audio_source._audio_callback(np.zeros((160, 1), dtype=np.int16), 160, None, None)
+
+    assert received == []
+    await asyncio.sleep(0)
+    assert len(received) == 1
+    assert len(received[0].data) == 320
+
+  @pytest.mark.asyncio
+  async def test_audio_source_sample_counter_timestamps(self):
+    """Test that chunk timestamps come from the sample count, anchored to the ADC time."""
+    from types import SimpleNamespace
+
+    import numpy as np
+
+    from lmnop_transcribe.audio_source import AudioConfig, AudioSource
+
+    audio_source = AudioSource(AudioConfig(delivery="push"))
+    received = []
+    audio_source.create_audio_observable().subscribe(on_next=received.append)
+
+    # Key press at stream time 10.0s; first sample reaches the ADC 20ms later
+    audio_source._stream = Mock(active=True, time=10.0)
+    audio_source.start_recording()
+
+    block = np.zeros((160, 1), dtype=np.int16)
+    audio_source._audio_callback(block, 160, SimpleNamespace(inputBufferAdcTime=10.02), None)
+    # Callback delivery time doesn't matter, only the ADC anchor and sample count
+    audio_source._audio_callback(block, 160, SimpleNamespace(inputBufferAdcTime=99.0), None)
+    await asyncio.sleep(0)
+
+    assert [round(chunk.timestamp_delta, 3) for chunk in received] == [30.0, 40.0]
+
+  @pytest.mark.asyncio
+  async def test_audio_source_warm_stream_preroll(self):
+    """Test that a warm stream prepends the pre-roll to the next recording."""
+    import numpy as np
+
+    from lmnop_transcribe.audio_source import AudioConfig, AudioSource
+    from lmnop_transcribe.ring_buffer import AudioRingBuffer
+
+    audio_source = AudioSource(AudioConfig(delivery="push", keep_stream_open=True, preroll_ms=10))
+    received = []
+    audio_source.create_audio_observable().subscribe(on_next=received.append)
+
+    # Pretend the stream is open and running at 16kHz
+    audio_source._stream = Mock(active=True)
+    audio_source._samplerate = 16000
+    audio_source._preroll = AudioRingBuffer(160)
+
+    block = np.ones((100, 1), dtype=np.int16)
+    for _ in range(3):
+      audio_source._audio_callback(block, 100, None, None)
+    await asyncio.sleep(0)
+    assert received == []  # Idle audio only feeds the pre-roll
+
+    audio_source.start_recording()
+    audio_source._audio_callback(block * 2, 100, None, None)
+    await asyncio.sleep(0)
+
+    assert [len(chunk.data) // 2 for chunk in received] == [160, 100]
+    assert received[0].timestamp_delta < received[1].timestamp_delta
+
+    audio_source.stop_recording()
+    audio_source._stream.stop.assert_not_called()
+    audio_source._stream.close.assert_not_called()
+
+  def test_audio_source_capture_telemetry(self):
+    """Test that overflow flags and ring overflows show up in the recording's capture stats."""
+    from types import SimpleNamespace
+
+    import numpy as np
+
+    from lmnop_transcribe.audio_source import AudioConfig, AudioSource
+
+    audio_source = AudioSource(AudioConfig(ring_buffer_ms=20))
+    audio_source._stream = Mock(active=True, time=0.0)
+    audio_source._samplerate = 16000
+    audio_source._ensure_ring_buffer(16000)
+    audio_source.start_recording()
+
+    block = np.zeros((160, 1), dtype=np.int16)
+    overflow = SimpleNamespace(input_overflow=True, input_underflow=False)
+    audio_source._audio_callback(block, 160, None, overflow)
+    for _ in range(2):
+      audio_source._audio_callback(block, 160, None, None)
+    audio_source._collect_telemetry()
+
+    stats = audio_source.telemetry.recording
+    assert stats.callbacks == 3
+    assert stats.input_overflows == 1
+    assert stats.dropped_frames == 160  # The 20ms ring only holds two blocks
+    assert stats.callback_duration_ms.count == 3
+    assert stats.queue_depth.max == 2
+
 
 class TestKeyboardBridge:
   """Test suite for keyboard bridge functionality."""
@@ -635,6 +895,20 @@ class TestCommandLineArguments:
       assert args.save_wav == "/my/recordings"
       assert args.wyoming_server == "localhost:10300"  # Default value
 
+  def test_ring_buffer_option(self):
+    """Test that --ring-buffer-ms reaches the capture configuration, and 0 leaves it off."""
+    from unittest.mock import patch
+
+    import lmnop_transcribe.pipeline as pipeline_module
+    from lmnop_transcribe.pipeline import create_audio_config, parse_args
+
+    with patch("sys.argv", ["pipeline.py", "--ring-buffer-ms", "500"]):
+      assert parse_args().ring_buffer_ms == 500
+
+    assert create_audio_config().ring_buffer_ms is None
+    with patch.object(pipeline_module.config, "ring_buffer_ms", 500):
+      assert create_audio_config().ring_buffer_ms == 500
+
   @pytest.mark.asyncio
   async def test_main_function_with_wav_saving(self):
     """Test main function configuration with WAV saving enabled."""
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for the lock-free audio ring buffer.
+"""
+
+import numpy as np
+import pytest
+
+from lmnop_transcribe.ring_buffer import AudioRingBuffer
+
+
+def _frames(start: int, count: int, channels: int = 1) -> np.ndarray:
+  """Build a (count, channels) block of ascending int16 samples"""
+  return np.arange(start, start + count, dtype=np.int16).reshape(-1, 1).repeat(channels, axis=1)
+
+
+class TestAudioRingBuffer:
+  """Test AudioRingBuffer behavior."""
+
+  def test_write_and_read(self):
+    """Test that written frames come back out in order."""
+    ring = AudioRingBuffer(capacity_frames=8)
+
+    assert ring.write(_frames(0, 5)) == 5
+    assert ring.available == 5
+    assert ring.free == 3
+
+    out = ring.read()
+    assert out.shape == (5, 1)
+    assert out[:, 0].tolist() == [0, 1, 2, 3, 4]
+    assert ring.available == 0
+
+  def test_peek_is_zero_copy_and_wraps(self):
+    """Test that peek returns views into the ring, split in two when wrapping."""
+    ring = AudioRingBuffer(capacity_frames=8)
+    ring.write(_frames(0, 6))
+    ring.advance(6)
+    ring.write(_frames(6, 5))
+
+    views = ring.peek()
+    assert len(views) == 2
+    assert all(np.shares_memory(view, ring._buffer) for view in views)
+    assert np.concatenate(views)[:, 0].tolist() == [6, 7, 8, 9, 10]
+
+    ring.advance(sum(len(view) for view in views))
+    assert ring.available == 0
+
+  def test_overflow_drops_and_counts(self):
+    """Test that a full ring drops frames instead of growing."""
+    ring = AudioRingBuffer(capacity_frames=4)
+
+    assert ring.write(_frames(0, 3)) == 3
+    assert ring.write(_frames(3, 3)) == 1
+    assert ring.dropped_frames == 2
+    assert ring.read()[:, 0].tolist() == [0, 1, 2, 3]
+
+  def test_multichannel(self):
+    """Test that channel layout is preserved."""
+    ring = AudioRingBuffer(capacity_frames=4, channels=2)
+    ring.write(_frames(0, 3, channels=2))
+
+    out = ring.read(max_frames=2)
+    assert out.shape == (2, 2)
+    assert ring.available == 1
+
+  def test_clear(self):
+    """Test that clear discards pending frames."""
+    ring = AudioRingBuffer(capacity_frames=4)
+    ring.write(_frames(0, 3))
+    ring.clear()
+
+    assert ring.available == 0
+    assert ring.peek() == ()
+
+  def test_write_latest_keeps_newest(self):
+    """Test that write_latest discards the oldest frames when full."""
+    ring = AudioRingBuffer(capacity_frames=4)
+    ring.write_latest(_frames(0, 3))
+    ring.write_latest(_frames(3, 3))
+
+    assert ring.dropped_frames == 0
+    assert ring.read()[:, 0].tolist() == [2, 3, 4, 5]
+
+    ring.write_latest(_frames(10, 6))
+    assert ring.read()[:, 0].tolist() == [12, 13, 14, 15]
+
+  def test_invalid_capacity(self):
+    """Test that a non-positive capacity is rejected."""
+    with pytest.raises(ValueError):
+      AudioRingBuffer(capacity_frames=0)
+
+
+if __name__ == "__main__":
+  pytest.main([__file__, "-v"])
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-session ordered send queue.
+"""
+
+import asyncio
+
+import pytest
+
+from lmnop_transcribe.common import AudioChunk
+from lmnop_transcribe.send_queue import SessionSendQueue
+
+
+class RecordingSession:
+  """Stands in for a session, recording what it was sent; sends wait until `released` is set"""
+
+  def __init__(self):
+    self.session_id = "s1"
+    self.sent = []
+    self.released = asyncio.Event()
+
+  async def begin_session(self):
+    await self.released.wait()
+    self.sent.append("begin")
+
+  async def add_chunk(self, chunk: AudioChunk):
+    await self.released.wait()
+    self.sent.append(chunk.data)
+
+
+def chunk(i: int) -> AudioChunk:
+  return AudioChunk(data=bytes([i]) * 4, timestamp_delta=i * 100)
+
+
+class TestSessionSendQueue:
+  """Test ordering, backpressure and overflow."""
+
+  @pytest.mark.asyncio
+  async def test_order_with_begin_first(self):
+    """Test that the start, chunks and calls run in the order queued, start first."""
+    session = RecordingSession()
+    queue = SessionSendQueue(session)
+    queue.put_nowait(chunk(1))
+
+    async def finish():
+      session.sent.append("finish")
+      return "done"
+
+    finished = queue.call(finish)
+    queue.put_nowait(chunk(2))
+    session.released.set()
+
+    assert await finished == "done"
+    await queue.join()
+    assert session.sent == ["begin", chunk(1).data, "finish", chunk(2).data]
+
+  @pytest.mark.asyncio
+  async def test_spill_keeps_order(self):
+    """Test that chunks past the depth are spilled, and still sent in order."""
+    session = RecordingSession()
+    queue = SessionSendQueue(session, max_depth=2, overflow="spill")
+    for i in range(6):
+      assert queue.put_nowait(chunk(i))
+
+    assert queue.depth == 2
+    assert queue.spilled == 4
+    session.released.set()
+    await queue.join()
+    assert session.sent == ["begin"] + [chunk(i).data for i in range(6)]
+
+  @pytest.mark.asyncio
+  @pytest.mark.parametrize(
+    "overflow, expected",
+    [("drop_newest", [0, 1]), ("drop_oldest", [2, 3])],
+  )
+  async def test_drop_policies(self, overflow, expected):
+    """Test that a full queue drops the incoming or the oldest waiting chunk."""
+    session = RecordingSession()
+    queue = SessionSendQueue(session, max_depth=2, overflow=overflow)
+    kept = [queue.put_nowait(chunk(i)) for i in range(4)]
+
+    assert kept == [True, True, False, False]
+    assert queue.dropped == 2
+    session.released.set()
+    await queue.join()
+    assert session.sent == ["begin"] + [chunk(i).data for i in expected]
+
+  @pytest.mark.asyncio
+  async def test_put_waits_for_room(self):
+    """Test that awaiting put applies backpressure instead of the overflow policy."""
+    session = RecordingSession()
+    queue = SessionSendQueue(session, max_depth=1, overflow="drop_newest")
+    await queue.put(chunk(0))
+
+    second = asyncio.create_task(queue.put(chunk(1)))
+    await asyncio.sleep(0.01)
+    assert not second.done()
+
+    session.released.set()
+    await second
+    await queue.join()
+    assert queue.dropped == 0
+    assert session.sent == ["begin", chunk(0).data, chunk(1).data]
+
+  @pytest.mark.asyncio
+  async def test_failed_send_drops_the_rest(self):
+    """Test that after a chunk fails to send, later chunks are dropped but calls still run."""
+    session = RecordingSession()
+    session.released.set()
+    attempts = []
+
+    async def add_chunk(chunk: AudioChunk):
+      attempts.append(chunk.data)
+      raise TimeoutError
+
+    session.add_chunk = add_chunk
+    queue = SessionSendQueue(session)
+    for i in range(3):
+      queue.put_nowait(chunk(i))
+
+    async def finish():
+      return "done"
+
+    finished = queue.call(finish)
+    await queue.join()
+    assert attempts == [chunk(0).data]
+    assert queue.failed and queue.dropped == 2
+    assert finished.result() == "done"
+
+  @pytest.mark.asyncio
+  async def test_cancel_skips_the_backlog(self):
+    """Test that cancelling stops a stalled send and cancels the calls behind it."""
+    session = RecordingSession()
+    queue = SessionSendQueue(session, max_depth=2)
+    for i in range(4):
+      queue.put_nowait(chunk(i))
+
+    async def finish():
+      session.sent.append("finish")
+
+    finished = queue.call(finish)
+    await asyncio.sleep(0.01)
+    queue.cancel()
+
+    assert finished.cancelled()
+    assert queue.depth == 0
+    assert not queue.put_nowait(chunk(5))
+    with pytest.raises(asyncio.CancelledError):
+      await queue.join()
+    assert session.sent == []
+
+
+if __name__ == "__main__":
+  pytest.main([__file__, "-v"])
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for the session manager and its per-session state machine.
+"""
+
+import pytest
+
+from lmnop_transcribe.session_manager import SessionManager
+
+
+class TestSessionManager:
+  """Test session states, lookups and the concurrency limit."""
+
+  def test_states_in_order(self):
+    """Test that a session moves from connecting to done, timestamping each state."""
+    sessions = SessionManager()
+    managed = sessions.open(1500.0)
+    assert managed is not None
+    assert managed.state == "connecting"
+
+    managed.connected()
+    assert managed.state == "buffering"
+    managed.released()
+    assert managed.state == "streaming"
+    managed.finishing()
+    sessions.close(managed)
+
+    assert managed.state == "done"
+    assert list(managed.timestamps) == ["connecting", "buffering", "streaming", "finishing", "done"]
+    latencies = managed.latencies()
+    assert latencies["connect_ms"] is not None and latencies["connect_ms"] >= 0
+    assert latencies["first_partial_ms"] is None
+    assert latencies["total_ms"] is not None
+    assert len(sessions) == 0
+
+  def test_released_while_connecting(self):
+    """Test that audio released before the connection is made streams once it is."""
+    managed = SessionManager().open(0.0)
+    assert managed is not None
+    managed.released()
+    assert managed.state == "connecting"
+
+    managed.connected()
+    assert managed.state == "streaming"
+
+  def test_lookups(self):
+    """Test that sessions are found by id and by recording, and forgotten once closed."""
+    sessions = SessionManager()
+    first = sessions.open(0.0)
+    second = sessions.open(250.0)
+    assert first is not None and second is not None
+    assert first.id != second.id
+
+    assert sessions.get(second.id) is second
+    assert sessions.for_recording(0.0) is first
+    sessions.close(first, cancelled=True)
+
+    assert first.state == "cancelled"
+    assert first.id not in sessions
+    assert sessions.for_recording(0.0) is None
+    assert sessions.for_recording(250.0) is second
+
+  def test_limit(self):
+    """Test that recordings past the limit get no session until one finishes."""
+    sessions = SessionManager(max_sessions=2)
+    first = sessions.open(0.0)
+    assert first is not None
+    assert sessions.open(100.0) is not None
+    assert sessions.open(200.0) is None
+
+    sessions.close(first)
+    assert sessions.open(300.0) is not None
+
+  def test_rejected_remembered(self):
+    """Test that a recording turned away at the limit is remembered as rejected."""
+    sessions = SessionManager(max_sessions=1)
+    assert sessions.open(0.0) is not None
+    assert sessions.open(100.0) is None
+
+    assert sessions.rejected(100.0)
+    assert not sessions.rejected(0.0)
+    assert not sessions.rejected(200.0)
+
+  def test_skipped(self):
+    """Test that a recording with nothing to transcribe ends skipped rather than done."""
+    sessions = SessionManager()
+    managed = sessions.open(0.0)
+    assert managed is not None
+    managed.connected()
+    managed.finishing()
+    sessions.close(managed, skipped=True)
+
+    assert managed.state == "skipped"
+    assert managed.finished
+    assert managed.latencies()["total_ms"] is not None
+    assert len(sessions) == 0
+
+  def test_no_going_back(self):
+    """Test that a finished session can't be reopened."""
+    managed = SessionManager().open(0.0)
+    assert managed is not None
+    managed.end(cancelled=True)
+
+    managed.connected()
+    assert managed.state == "cancelled"
+    with pytest.raises(ValueError):
+      managed._advance("streaming")
+
+
+if __name__ == "__main__":
+  pytest.main([__file__, "-v"])
@@ -21,11 +21,10 @@ async def test_session_creation():
   }
 
   with patch.dict("sys.modules", mock_wyoming_modules):
-    from lmnop_transcribe.pipeline import active_sessions
+    from lmnop_transcribe.session_manager import SessionManager
     from lmnop_transcribe.transcription_service import TranscriptionService
 
-    # Clear sessions
-    active_sessions.clear()
+    active_sessions = SessionManager()
 
     # Mock the socket operations that cause hanging
     with (
@@ -53,19 +52,19 @@ async def test_session_creation():
       session.begin_session()
       print("✅ Session started successfully")
 
-      # Test adding to active_sessions manually
-      active_sessions["test_session_1"] = session
+      # Test tracking sessions in the manager
+      first = active_sessions.open(1000.0)
       print(f"📝 Active sessions: {len(active_sessions)}")
 
       # Create second session
-      session2 = service.create_session("test_session_2")
-      active_sessions["test_session_2"] = session2
+      service.create_session("test_session_2")
+      active_sessions.open(2000.0)
 
       print(f"📝 Active sessions after second: {len(active_sessions)}")
-      print(f"🔑 Session IDs: {list(active_sessions.keys())}")
+      print(f"🔑 Session IDs: {[managed.id for managed in active_sessions]}")
 
       # Test cleanup
-      del active_sessions["test_session_1"]
+      active_sessions.close(first, cancelled=True)
       print(f"📝 Active sessions after cleanup: {len(active_sessions)}")
 
       print("✅ Session creation test passed!")
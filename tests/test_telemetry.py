@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for capture telemetry.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from lmnop_transcribe.telemetry import CaptureTelemetry, Histogram, MetricsRegistry
+
+
+class TestHistogram:
+  """Test fixed-bucket histograms."""
+
+  def test_observe_and_summarize(self):
+    """Test count, mean, extremes and bucketed quantiles."""
+    histogram = Histogram("latency", buckets=(1, 10, 100))
+    for value in [0.5, 2, 3, 4, 50]:
+      histogram.observe(value)
+
+    assert histogram.count == 5
+    assert histogram.mean == pytest.approx(11.9)
+    assert histogram.min == 0.5
+    assert histogram.max == 50
+    assert histogram.counts == [1, 3, 1, 0]
+    assert histogram.quantile(0.5) == 10
+    assert histogram.quantile(1.0) == 50
+
+  def test_overflow_bucket(self):
+    """Test that observations past the last bucket are kept."""
+    histogram = Histogram("latency", buckets=(1,))
+    histogram.observe(5)
+
+    assert histogram.counts == [0, 1]
+    assert histogram.quantile(0.99) == 5
+
+
+class TestMetricsRegistry:
+  """Test the shared metrics registry."""
+
+  def test_metrics_are_shared_by_name(self):
+    """Test that looking up a name twice returns the same metric."""
+    registry = MetricsRegistry()
+    registry.counter("sessions").inc()
+    registry.counter("sessions").inc(2)
+    registry.histogram("latency").observe(3)
+
+    snapshot = registry.snapshot()
+    assert snapshot["sessions"] == 3
+    assert snapshot["latency"]["count"] == 1
+
+
+class TestCaptureTelemetry:
+  """Test capture-thread health tracking."""
+
+  def test_callback_timing(self):
+    """Test interval, jitter and duration tracking against the expected block period."""
+    telemetry = CaptureTelemetry(MetricsRegistry())
+
+    # 160 frames at 16kHz should arrive every 10ms; the third arrives 5ms late
+    for started in [1.000, 1.010, 1.025]:
+      telemetry.record_callback(started, 160, 16000, None)
+      telemetry.record_duration(started)
+    assert telemetry.recording.callbacks == 0  # Nothing is counted up on the audio thread
+    telemetry.collect()
+
+    stats = telemetry.recording
+    assert stats.callbacks == 3
+    assert stats.frames == 480
+    assert stats.callback_interval_ms.count == 2
+    assert stats.callback_jitter_ms.max == pytest.approx(5)
+    assert stats.callback_duration_ms.count == 3
+
+    # The interval to the previous collection's last callback still counts
+    telemetry.record_callback(1.035, 160, 16000, None)
+    telemetry.record_duration(1.035)
+    telemetry.collect()
+    assert stats.callback_interval_ms.count == 3
+
+  def test_overflows_and_drops(self):
+    """Test that status flags and drops count per recording and in the registry."""
+    registry = MetricsRegistry()
+    telemetry = CaptureTelemetry(registry)
+
+    telemetry.record_callback(1.0, 160, 16000, SimpleNamespace(input_overflow=True, input_underflow=False))
+    telemetry.record_dropped(160)
+    telemetry.record_duration(1.0)
+    assert telemetry.collect() == (1, 0)
+    assert telemetry.recording.input_overflows == 1
+    assert telemetry.recording.dropped_frames == 160
+
+    telemetry.begin_recording()
+    assert telemetry.recording.input_overflows == 0
+    assert registry.snapshot()["capture.input_overflows"] == 1
+    assert registry.snapshot()["capture.dropped_frames"] == 160
+
+  def test_keeps_latest_callbacks(self):
+    """Test that callbacks past the slot capacity between collections replace the oldest."""
+    telemetry = CaptureTelemetry(MetricsRegistry(), capacity=4)
+    for i in range(6):
+      telemetry.record_callback(1.0 + i * 0.01, 160, 16000, None)
+      telemetry.record_queue_depth(i)
+      telemetry.record_duration(1.0)
+    telemetry.collect()
+
+    stats = telemetry.recording
+    assert stats.callbacks == 3
+    assert stats.queue_depth.min == 3 and stats.queue_depth.max == 5
+    assert telemetry.collect() == (0, 0)
+    assert stats.callbacks == 3
+
+
+if __name__ == "__main__":
+  pytest.main([__file__, "-v"])
@@ -3,6 +3,7 @@
 Tests for the transcription service module.
 """
 
+import asyncio
 import os
 import tempfile
 import wave
@@ -96,7 +97,7 @@ class TestStreamingTranscriptionSession:
           result = session.end_session()
 
           assert result == "Hello world"
-          mock_create_connection.assert_called_once_with(("localhost", 10300))
+          mock_create_connection.assert_called_once_with(("localhost", 10300), timeout=5.0)
           # Should have: Transcribe, AudioStart, 2 AudioChunks, AudioStop
           assert mock_write_event.call_count == 5
 
@@ -201,6 +202,36 @@ class TestStreamingTranscriptionSession:
           mock_file_rb.close.assert_called_once()
           mock_socket.close.assert_called_once()
 
+  def test_finish_audio_before_end(self):
+    """Test that audio can be finished early, with AudioStop sent once and later chunks ignored."""
+    with patch.dict("sys.modules", setup_wyoming_mocks()):
+      from lmnop_transcribe.common import AudioChunk
+      from lmnop_transcribe.transcription_service import StreamingTranscriptionSession
+
+      with patch("lmnop_transcribe.transcription_service.socket.create_connection") as mock_conn:
+        mock_socket = Mock()
+        mock_socket.makefile.side_effect = [Mock(), Mock()]
+        mock_conn.return_value = mock_socket
+
+        session = StreamingTranscriptionSession(
+          session_id="test123", wyoming_server_address="localhost:10300"
+        )
+
+        with (
+          patch("lmnop_transcribe.transcription_service.write_event") as mock_write_event,
+          patch("lmnop_transcribe.transcription_service.read_event", return_value=None),
+          patch("lmnop_transcribe.transcription_service.AudioStop") as mock_audio_stop,
+        ):
+          session.begin_session()
+          session.add_chunk(AudioChunk(data=b"before", timestamp_delta=100))
+          session.finish_audio()
+          session.add_chunk(AudioChunk(data=b"after", timestamp_delta=200))
+          session.end_session()
+
+          # Transcribe, AudioStart, one chunk and a single AudioStop
+          assert mock_write_event.call_count == 4
+          mock_audio_stop.assert_called_once()
+
 
 class TestTranscriptionService:
   """Test the TranscriptionService class."""
@@ -295,5 +326,106 @@ class TestTranscriptionService:
       assert session1 is not session2  # Different instances
 
 
+class TestAsyncStreamingTranscriptionSession:
+  """Test the asyncio session against a local Wyoming server."""
+
+  @pytest.mark.asyncio
+  async def test_session_flow(self, wyoming_server):
+    """Test that chunks added before the connection is up are still sent, in order."""
+    from lmnop_transcribe.common import AudioChunk
+    from lmnop_transcribe.transcription_service import TranscriptionService
+
+    server = await wyoming_server(text=" Hello world ")
+    async with server:
+      session = TranscriptionService(server.address, rate=16000).create_async_session("test123")
+
+      begin = asyncio.create_task(session.begin_session())
+      first = asyncio.create_task(session.add_chunk(AudioChunk(data=b"\x01\x00", timestamp_delta=100)))
+      second = asyncio.create_task(session.add_chunk(AudioChunk(data=b"\x02\x00", timestamp_delta=200)))
+      await asyncio.gather(begin, first, second)
+      result = await session.end_session()
+
+    assert result == "Hello world"
+    assert [event.type for event in server.received] == [
+      "transcribe",
+      "audio-start",
+      "audio-chunk",
+      "audio-chunk",
+      "audio-stop",
+    ]
+    assert [event.payload for event in server.received[2:4]] == [b"\x01\x00", b"\x02\x00"]
+    assert session.chunks_sent == 2
+
+  @pytest.mark.asyncio
+  async def test_read_timeout(self, wyoming_server):
+    """Test that a server that never answers can't hold the session open."""
+    from lmnop_transcribe.transcription_service import TranscriptionService
+
+    server = await wyoming_server(text=None)
+    async with server:
+      session = TranscriptionService(server.address, read_timeout=0.1).create_async_session("test123")
+      await session.begin_session()
+
+      assert await asyncio.wait_for(session.end_session(), timeout=1) is None
+
+  @pytest.mark.asyncio
+  async def test_partial_transcripts(self):
+    """Test that interim results arrive while audio is still being sent, then the final transcript."""
+    from wyoming.asr import Transcript, TranscriptChunk, TranscriptStart, TranscriptStop
+    from wyoming.event import async_read_event, async_write_event
+
+    from lmnop_transcribe.common import AudioChunk
+    from lmnop_transcribe.transcription_service import TranscriptionService
+
+    async def handle(reader, writer):
+      while (event := await async_read_event(reader)) is not None:
+        if event.type == "audio-start":
+          await async_write_event(TranscriptStart().event(), writer)
+        elif event.type == "audio-chunk":
+          await async_write_event(TranscriptChunk(text=event.payload.decode()).event(), writer)
+        elif event.type == "audio-stop":
+          await async_write_event(TranscriptStop().event(), writer)
+          await async_write_event(Transcript(text="Hello world").event(), writer)
+      writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    async with server:
+      address = f"127.0.0.1:{server.sockets[0].getsockname()[1]}"
+      updates = []
+      partial = asyncio.Event()
+
+      def on_transcript(text, is_final):
+        updates.append((text, is_final))
+        partial.set()
+
+      session = TranscriptionService(address, rate=16000).create_async_session("s1", on_transcript)
+      await session.begin_session()
+      await session.add_chunk(AudioChunk(data=b"He", timestamp_delta=10))
+      await asyncio.wait_for(partial.wait(), timeout=1)
+      assert updates == [("He", False)]
+
+      await session.add_chunk(AudioChunk(data=b"ll", timestamp_delta=20))
+      assert await session.end_session() == "Hello world"
+
+    assert updates == [("He", False), ("Hell", False), ("Hello world", True)]
+
+  @pytest.mark.asyncio
+  async def test_connection_error(self, wyoming_server):
+    """Test that a refused connection is raised from begin_session and later calls are no-ops."""
+    from lmnop_transcribe.common import AudioChunk
+    from lmnop_transcribe.transcription_service import TranscriptionService
+
+    server = await wyoming_server()
+    await server.close()
+
+    session = TranscriptionService(server.address).create_async_session("test123")
+    with pytest.raises(OSError):
+      await session.begin_session()
+
+    await session.add_chunk(AudioChunk(data=b"\x00\x00", timestamp_delta=100))
+    assert await session.end_session() is None
+    assert session.chunks_sent == 0
+
+
 if __name__ == "__main__":
   pytest.main([__file__])